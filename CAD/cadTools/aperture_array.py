@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Patrones de agujeros (rejillas iónicas, PCD de tornillos, pasamuros) con
+# NumPy y corte por lotes.
+#
+# Los centros se generan vectorizados; la geometría se crea sin un boolean
+# por agujero:
+#   - perforated_disc(): placa plana = cara con N agujeros (FaceMakerBullseye)
+#     extruida una sola vez; sin booleans (rejillas de 5000+ aperturas).
+#   - cut_holes(): un único cut contra el compound de todas las herramientas
+#     (sólidos arbitrarios: bridas, bulkheads, radiadores).
+# Unidades: mm.
+
+import numpy as np
+
+import lod
+import profiling
+
+# -----------------------------
+# Centros (arrays (N, 2))
+# -----------------------------
+def hex_points(radius, pitch, hole_d=0.0, margin=0.0, center=(0.0, 0.0), offset=(0.0, 0.0)):
+    # Malla hexagonal (triangular) de paso pitch dentro de un círculo de radio radius.
+    # Solo se conservan los agujeros completos: |p| + hole_d/2 + margin <= radius
+    limit = radius - hole_d / 2.0 - margin
+    if limit < 0 or pitch <= 0:
+        return np.empty((0, 2))
+    dy = pitch * np.sqrt(3.0) / 2.0
+    nr, nc = int(np.ceil(limit / dy)) + 1, int(np.ceil(limit / pitch)) + 1
+    rows = np.arange(-nr, nr + 1)
+    cols = np.arange(-nc, nc + 1)
+    r, c = np.meshgrid(rows, cols, indexing="ij")
+    x = c * pitch + (r % 2) * (pitch / 2.0)
+    y = r * dy
+    pts = np.column_stack([x.ravel(), y.ravel()]) + np.asarray(offset, dtype=float)
+    pts = pts[np.hypot(pts[:, 0], pts[:, 1]) <= limit + 1e-9]
+    return pts + np.asarray(center, dtype=float)
+
+def rect_points(width, height, pitch_x, pitch_y=None, hole_d=0.0, margin=0.0,
+                center=(0.0, 0.0), offset=(0.0, 0.0), radius=None):
+    # Malla rectangular centrada; radius opcional recorta a un círculo
+    pitch_y = pitch_x if pitch_y is None else pitch_y
+    half_w = width / 2.0 - hole_d / 2.0 - margin
+    half_h = height / 2.0 - hole_d / 2.0 - margin
+    if half_w < 0 or half_h < 0:
+        return np.empty((0, 2))
+    xs = np.arange(-np.floor(half_w / pitch_x), np.floor(half_w / pitch_x) + 1) * pitch_x
+    ys = np.arange(-np.floor(half_h / pitch_y), np.floor(half_h / pitch_y) + 1) * pitch_y
+    x, y = np.meshgrid(xs, ys)
+    pts = np.column_stack([x.ravel(), y.ravel()]) + np.asarray(offset, dtype=float)
+    if radius is not None:
+        limit = radius - hole_d / 2.0 - margin
+        pts = pts[np.hypot(pts[:, 0], pts[:, 1]) <= limit + 1e-9]
+    return pts + np.asarray(center, dtype=float)
+
+def pcd_points(n, pcd_diam, center=(0.0, 0.0), start_deg=0.0):
+    # n agujeros equiespaciados en un círculo primitivo (PCD)
+    ang = np.radians(start_deg) + 2.0 * np.pi * np.arange(n) / n
+    return np.column_stack([center[0] + (pcd_diam / 2.0) * np.cos(ang),
+                            center[1] + (pcd_diam / 2.0) * np.sin(ang)])
+
+def corner_points(x0, x1, y0, y1):
+    # 4 esquinas (orden: x0y0, x0y1, x1y0, x1y1)
+    return np.array([(x, y) for x in (x0, x1) for y in (y0, y1)], dtype=float)
+
+def open_area_fraction(points, hole_d, radius):
+    # Transparencia geométrica de la rejilla (área abierta / área del disco)
+    return len(points) * (hole_d / 2.0) ** 2 / radius ** 2
+
+# -----------------------------
+# Geometría (OCC)
+# -----------------------------
+# Ejes del plano de agujeros: (eje normal, índices de las 2 coordenadas en el plano)
+_PLANES = {"Z": ((0, 0, 1), (0, 1)), "Y": ((0, 1, 0), (0, 2)), "X": ((1, 0, 0), (1, 2))}
+
+def _point3(u, v, w, axis):
+    normal, (iu, iv) = _PLANES[axis]
+    xyz = [0.0, 0.0, 0.0]
+    xyz[iu], xyz[iv] = float(u), float(v)
+    xyz[normal.index(1)] = float(w)
+    return xyz
+
+def cylinders(points, dia, w0, depth, axis="Z"):
+    # Compound de cilindros (uno por centro) normales al plano, de w0 a w0 + depth;
+    # sirve como herramienta de corte o como pernos/standoffs
+    import FreeCAD as App
+    import Part
+    normal = App.Vector(*_PLANES[axis][0])
+    tools = [Part.makeCylinder(dia / 2.0, depth, App.Vector(*_point3(u, v, w0, axis)), normal)
+             for u, v in np.asarray(points, dtype=float).reshape(-1, 2)]
+    return Part.makeCompound(tools)
+
+def cut_holes(shape, points, dia, w0, depth, axis="Z"):
+    # Un único boolean para todos los agujeros
+    if len(points) == 0 or lod.skip_hole(dia):
+        return shape
+    return profiling.cut(shape, cylinders(points, dia, w0, depth, axis))
+
+def perforated_disc(outer_d, thickness, points, hole_d, center=(0.0, 0.0), z0=0.0):
+    # Disco perforado: cara con todos los agujeros extruida una vez (sin booleans)
+    import FreeCAD as App
+    import Part
+    cx, cy = center
+    outer = Part.Wire(Part.makeCircle(outer_d / 2.0, App.Vector(cx, cy, z0)))
+    if len(points) == 0 or lod.skip_hole(hole_d):
+        return Part.Face(outer).extrude(App.Vector(0, 0, thickness))
+    holes = [Part.Wire(Part.makeCircle(hole_d / 2.0, App.Vector(float(x), float(y), z0)))
+             for x, y in np.asarray(points, dtype=float)]
+    try:
+        face = Part.makeFace([outer] + holes, "Part::FaceMakerBullseye")
+    except Exception:
+        # Respaldo: disco macizo + un único cut con todas las herramientas
+        disc = Part.Face(outer).extrude(App.Vector(0, 0, thickness))
+        return cut_holes(disc, points, hole_d, z0 - 0.1, thickness + 0.2)
+    return profiling.timed_call("primitive", "extrude", face.extrude, App.Vector(0, 0, thickness))
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# Banco de pruebas de rendimiento de los modelos por etapas de modelado.
+# Cada caso (modelo x escala) se ejecuta en un proceso nuevo (memoria pico
+# aislada y sin caché BREP), se repite N veces y se guarda en JSON para
+# comparar entre commits.
+#
+# Ejemplos:
+#   python benchmark.py -o bench_main.json
+#   python benchmark.py -m cubesat_pro cubesat2u --scales 0.5,1,2,4 --repeat 5 -o bench.json
+#   python benchmark.py --compare bench_main.json bench.json --threshold 0.15
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import headless
+import memory
+import profiling
+from model_registry import MODELS, REPO_DIR, load_model
+
+DEFAULT_SCALES = (0.5, 1.0, 2.0)
+
+# Parámetros que no son longitudes (recuentos, fracciones, densidades...)
+FIXED_KEYS = {
+    "navefusion": ("RAD_WASTE_KW", "RAD_TEMP_K", "RAD_SINK_K", "RAD_EMISSIVITY", "RAD_FIN_EFF"),
+    "cubesat_pro": ("feed_holes", "pcd_n", "grid_opening", "rad_L_frac", "nozzle_eps", "nozzle_throat_frac",
+                    "rad_waste_W", "rad_temp_K", "rad_sink_K", "rad_emissivity", "rad_fin_eff",
+                    "coil_NI", "ion_beam_V", "ion_beam_A", "ion_accel_ratio"),
+    "cubesat_hall": ("coil_NI",),
+    "cubesat2u": ("n_pcbs", "materials"),
+}
+
+def scaled_params(name, defaults, scale):
+    # Escala geométrica uniforme de todas las longitudes del modelo
+    fixed = FIXED_KEYS.get(name, ())
+    out = {}
+    for key, value in defaults.items():
+        if key in fixed or isinstance(value, (bool, str)) or value is None:
+            continue
+        if isinstance(value, dict):
+            for sub, v in value.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    out[f"{key}.{sub}"] = v * scale
+        elif isinstance(value, (list, tuple)):
+            out[key] = [v * scale for v in value]
+        elif isinstance(value, (int, float)):
+            out[key] = value * scale
+    return out
+
+def peak_rss_mb():
+    return memory.peak_mb()
+
+# -----------------------------
+# Un caso (proceso hijo)
+# -----------------------------
+def run_case(name, scale, repeat=3, export=".step", freecad_lib=None):
+    App = headless.load_freecad(freecad_lib)
+    model = load_model(name)
+    params = scaled_params(name, model.P, scale)
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(repeat):
+            doc = memory.batch_document(App, f"Bench_{name}_{i}")
+            t0 = time.perf_counter()
+            try:
+                with profiling.recording() as timer:
+                    root, objs = model.build(doc, params)
+                    profiling.recompute(doc)
+                    if export:
+                        profiling.export(objs.values(), os.path.join(tmp, f"{name}{export}"))
+                wall = time.perf_counter() - t0
+            finally:
+                memory.close_document(App, doc)
+            runs.append({"wall_s": wall, "objects": len(objs),
+                         "stages": {k: {"calls": c, "s": s} for k, (c, s) in timer.totals.items()}})
+
+    stages = {}
+    for stage in sorted({k for r in runs for k in r["stages"]}):
+        secs = [r["stages"][stage]["s"] for r in runs if stage in r["stages"]]
+        stages[stage] = {
+            "calls": runs[0]["stages"].get(stage, {}).get("calls", 0),
+            "min_s": min(secs),
+            "median_s": statistics.median(secs),
+        }
+    walls = [r["wall_s"] for r in runs]
+    return {
+        "model": name,
+        "scale": scale,
+        "repeat": repeat,
+        "objects": runs[0]["objects"],
+        "wall_min_s": min(walls),
+        "wall_median_s": statistics.median(walls),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def run_case_subprocess(name, scale, repeat, export, freecad_lib=None, level="full"):
+    cmd = [sys.executable, os.path.abspath(__file__), "--case", name, str(scale),
+           "--repeat", str(repeat), "--export", export or "none"]
+    if freecad_lib:
+        cmd += ["--freecad-lib", freecad_lib]
+    env = dict(os.environ, BREP_CACHE="0", CAD_LOD=level)   # construcción real, no la caché
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        err = (proc.stderr or proc.stdout).strip().splitlines()
+        return {"model": name, "scale": scale, "error": err[-1] if err else f"código {proc.returncode}"}
+    return json.loads(lines[-1])
+
+# -----------------------------
+# Suite y comparación
+# -----------------------------
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def run_suite(models, scales, repeat=3, export=".step", freecad_lib=None, progress=None, level="full"):
+    cases = []
+    for name in models:
+        for scale in scales:
+            case = run_case_subprocess(name, scale, repeat, export, freecad_lib, level)
+            cases.append(case)
+            if progress:
+                progress(case)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "export": export,
+            "lod": level,
+        },
+        "cases": cases,
+    }
+
+def _index(results):
+    out = {}
+    for case in results["cases"]:
+        if "error" in case:
+            continue
+        key = (case["model"], float(case["scale"]))
+        out[(key, "wall")] = case["wall_min_s"]
+        for stage, st in case["stages"].items():
+            out[(key, stage)] = st["min_s"]
+    return out
+
+def compare(old, new, threshold=0.10, min_s=0.005):
+    # Lista de (modelo, escala, etapa, antes, después, ratio) que empeoran más de threshold
+    a, b = _index(old), _index(new)
+    regressions = []
+    for key in sorted(set(a) & set(b), key=str):
+        (name, scale), stage = key
+        before, after = a[key], b[key]
+        if max(before, after) < min_s:
+            continue   # ruido de temporizador
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1.0 + threshold:
+            regressions.append((name, scale, stage, before, after, ratio))
+    return regressions
+
+def format_case(case):
+    if "error" in case:
+        return f"{case['model']:<18} x{case['scale']:<5} ERROR {case['error']}"
+    stages = ", ".join(f"{k} {v['min_s']:.3f}" for k, v in
+                       sorted(case["stages"].items(), key=lambda kv: -kv[1]["min_s"]))
+    rss = f"{case['peak_rss_mb']:.0f} MB" if case.get("peak_rss_mb") else "n/d"
+    return f"{case['model']:<18} x{case['scale']:<5} {case['wall_min_s']:.3f} s  pico {rss}  [{stages}]"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark por etapas de los modelos.")
+    ap.add_argument("-m", "--models", nargs="+", default=list(MODELS), choices=list(MODELS))
+    ap.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                    help="factores de escala geométrica separados por comas")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--export", default=".step", help="extensión exportada en cada repetición ('none' = sin exportar)")
+    ap.add_argument("-o", "--output", default=None, help="JSON de resultados")
+    ap.add_argument("--compare", nargs=2, metavar=("ANTES", "DESPUES"), help="compara dos JSON y sale con 1 si hay regresiones")
+    ap.add_argument("--threshold", type=float, default=0.10, help="empeoramiento relativo tolerado")
+    ap.add_argument("--lod", choices=("full", "preview"), default="full", help="nivel de detalle (lod.py)")
+    ap.add_argument("--freecad-lib", default=None)
+    ap.add_argument("--case", nargs=2, metavar=("MODELO", "ESCALA"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    export = None if args.export.lower() == "none" else args.export
+
+    if args.case:
+        case = run_case(args.case[0], float(args.case[1]), args.repeat, export, args.freecad_lib)
+        print(json.dumps(case))
+        return 0
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        for name, scale, stage, before, after, ratio in regressions:
+            print(f"REGRESIÓN {name} x{scale} {stage}: {before:.3f} s -> {after:.3f} s ({ratio:.2f}x)")
+        if not regressions:
+            print(f"Sin regresiones por encima del {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    results = run_suite(args.models, scales, args.repeat, export, args.freecad_lib,
+                        progress=lambda case: print(format_case(case), flush=True), level=args.lod)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# Fusión booleana de muchas piezas a la vez.
+# En lugar de thruster = thruster.fuse(shp) pieza a pieza (coste creciente):
+#   1) se agrupan los operandos cuyos BoundBox se solapan (sweep-and-prune en X),
+#   2) cada grupo se fusiona con una sola llamada multiFuse (o árbol equilibrado),
+#   3) los grupos disjuntos se juntan en un compound, sin boolean.
+# Los grupos independientes se pueden fusionar en paralelo (procesos + BREP).
+#
+#   python boolean_fuse.py --parts 24 --repeat 3     # compara con el bucle secuencial
+
+import os
+import time
+
+import headless
+from profiling import timed_call
+
+# -----------------------------
+# Agrupación por solape de cajas
+# -----------------------------
+def bounds(shape, tol=0.0):
+    bb = shape.BoundBox
+    return (bb.XMin - tol, bb.YMin - tol, bb.ZMin - tol, bb.XMax + tol, bb.YMax + tol, bb.ZMax + tol)
+
+def _boxes_overlap(a, b):
+    return all(a[i] <= b[i + 3] and b[i] <= a[i + 3] for i in range(3))
+
+def overlap_groups(boxes):
+    # Componentes conexas del grafo "las cajas se tocan"; O(n log n + k)
+    n = len(boxes)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    order = sorted(range(n), key=lambda i: boxes[i][0])
+    active = []
+    for i in order:
+        xmin = boxes[i][0]
+        active = [j for j in active if boxes[j][3] >= xmin]
+        for j in active:
+            if _boxes_overlap(boxes[i], boxes[j]):
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[ri] = rj
+        active.append(i)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values())
+
+# -----------------------------
+# Fusión de un grupo
+# -----------------------------
+def fuse_tree(shapes):
+    # Reducción por parejas: log2(n) niveles de operandos de tamaño parecido
+    level = list(shapes)
+    while len(level) > 1:
+        nxt = [level[i].fuse(level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+def fuse_cluster(shapes, method="general"):
+    if len(shapes) == 1:
+        return shapes[0]
+    if method == "tree":
+        return fuse_tree(shapes)
+    if method == "general":
+        return shapes[0].multiFuse(list(shapes[1:]))
+    raise ValueError(f"Método de fusión desconocido: {method}")
+
+def _fuse_brep(breps, method):
+    # Trabajador: recibe y devuelve BREP en texto (las formas no se serializan)
+    import Part
+    shapes = []
+    for text in breps:
+        s = Part.Shape()
+        s.importBrepFromString(text)
+        shapes.append(s)
+    return fuse_cluster(shapes, method).exportBrepToString()
+
+def _init_worker(freecad_lib):
+    headless.load_freecad(freecad_lib)
+
+def _fuse_parallel(clusters, method, workers, freecad_lib):
+    import multiprocessing
+    import Part
+    from concurrent.futures import ProcessPoolExecutor
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(freecad_lib,)) as pool:
+        futures = [pool.submit(_fuse_brep, [s.exportBrepToString() for s in c], method) for c in clusters]
+        out = []
+        for fut in futures:
+            s = Part.Shape()
+            s.importBrepFromString(fut.result())
+            out.append(s)
+    return out
+
+def fuse_all(shapes, method="general", tol=1e-6, parallel=False, workers=None, freecad_lib=None):
+    # Equivalente a fusionar todas las piezas en secuencia
+    import Part
+    shapes = [s for s in shapes if s is not None]
+    if not shapes:
+        raise ValueError("fuse_all necesita al menos una forma")
+    if len(shapes) == 1:
+        return shapes[0]
+
+    groups = overlap_groups([bounds(s, tol) for s in shapes])
+    clusters = [[shapes[i] for i in g] for g in groups if len(g) > 1]
+    singles = [shapes[g[0]] for g in groups if len(g) == 1]
+
+    if parallel and len(clusters) > 1:
+        workers = min(workers or os.cpu_count() or 1, len(clusters))
+        fused = timed_call("fuse", "fuse_parallel", _fuse_parallel, clusters, method, workers, freecad_lib)
+    else:
+        fused = [timed_call("fuse", "multiFuse", fuse_cluster, c, method) for c in clusters]
+
+    results = fused + singles
+    if len(results) == 1:
+        return results[0]
+    return Part.makeCompound(results)
+
+def fuse_sequential(shapes):
+    # Bucle original (referencia para comparar)
+    out = shapes[0]
+    for shp in shapes[1:]:
+        out = out.fuse(shp)
+    return out
+
+# -----------------------------
+# Comparación de tiempos
+# -----------------------------
+def compare(shapes, repeat=3, methods=("general", "tree")):
+    def best(fn):
+        t_best, result = None, None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = fn()
+            dt = time.perf_counter() - t0
+            t_best = dt if t_best is None else min(t_best, dt)
+        return t_best, result.Volume
+
+    rows = [("sequential",) + best(lambda: fuse_sequential(shapes))]
+    for m in methods:
+        rows.append((f"fuse_all[{m}]",) + best(lambda m=m: fuse_all(shapes, method=m)))
+    return rows
+
+def _demo_parts(n):
+    # Grupos de cilindros solapados, separados entre sí (como piezas de un ensamblaje)
+    import Part
+    from FreeCAD import Vector
+    parts = []
+    per_group = 4
+    for i in range(n):
+        g, k = divmod(i, per_group)
+        parts.append(Part.makeCylinder(10.0, 30.0, Vector(g * 100.0 + k * 6.0, 0, k * 5.0)))
+    return parts
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Compara fuse_all con la fusión secuencial")
+    ap.add_argument("--parts", type=int, default=24)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--freecad-lib", default=None)
+    args = ap.parse_args()
+
+    headless.load_freecad(args.freecad_lib)
+    parts = _demo_parts(args.parts)
+    rows = compare(parts, repeat=args.repeat)
+    t_ref = rows[0][1]
+    for name, dt, vol in rows:
+        print(f"{name:<20} {dt * 1000:9.1f} ms  x{t_ref / dt:5.2f}  V={vol:.1f} mm^3")
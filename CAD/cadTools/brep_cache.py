@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+# Caché en disco de formas BREP para los constructores de piezas.
+# Clave = hash(nombre del constructor + argumentos + globales que lee + su código
+# + fuente de los módulos de cadTools que usa), así que cambiar un parámetro,
+# editar la función o un ayudante de otro módulo (nozzle_contour.profile,
+# fillets.fillet...) invalida la entrada.
+# Expulsión LRU por tamaño total (mtime = último uso).
+#
+# Variables de entorno:
+#   BREP_CACHE=0          desactiva la caché
+#   BREP_CACHE_DIR=...    carpeta (por defecto ~/.cache/propulsive_brep)
+#   BREP_CACHE_MAX_MB=... tamaño máximo (por defecto 512)
+
+import functools
+import hashlib
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+
+# Módulos cuya fuente entra en la clave (cadTools y design/)
+ROOTS = (os.path.dirname(os.path.abspath(__file__)),)
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "propulsive_brep")
+DEFAULT_MAX_MB = 512.0
+SUFFIX = ".brep"
+
+class Uncacheable(TypeError):
+    pass
+
+# -----------------------------
+# Clave canónica
+# -----------------------------
+def canonical(value):
+    # Representación estable (texto) de un argumento; 100 y 100.0 dan lo mismo
+    if value is None or isinstance(value, (bool, str)):
+        return repr(value)
+    if isinstance(value, (int, float)):
+        return repr(float(value))
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(canonical(v) for v in value) + ")"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{canonical(k)}:{canonical(value[k])}" for k in sorted(value, key=str)) + "}"
+    if all(hasattr(value, a) for a in ("x", "y", "z")) and not hasattr(value, "w"):
+        return "V" + canonical((value.x, value.y, value.z))  # App.Vector
+    if hasattr(value, "Base") and hasattr(value, "Rotation"):
+        return "P" + canonical((value.Base, tuple(value.Rotation.Q)))  # App.Placement
+    raise Uncacheable(f"argumento no cacheable: {type(value).__name__}")
+
+def _code_fingerprint(code, h):
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_fingerprint(const, h)
+        else:
+            h.update(repr(const).encode("utf-8"))
+
+_sources = {}   # ruta -> (mtime_ns, tamaño, sha256 de la fuente)
+
+def _source_hash(path):
+    st = os.stat(path)
+    hit = _sources.get(path)
+    if hit is None or hit[:2] != (st.st_mtime_ns, st.st_size):
+        with open(path, "rb") as fh:
+            hit = (st.st_mtime_ns, st.st_size, hashlib.sha256(fh.read()).hexdigest())
+        _sources[path] = hit
+    return hit[2]
+
+def _tools_module(mod):
+    path = getattr(mod, "__file__", None)
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    return path if any(path.startswith(root + os.sep) for root in ROOTS) else None
+
+def _module_fingerprint(mod, h, seen):
+    # Fuente completa de un módulo de cadTools y, recursivamente, de los de
+    # cadTools que importa: las llamadas a través del módulo
+    # (nozzle_contour.profile) no aparecen en el código de la función
+    if mod is None or mod in seen:
+        return
+    seen.add(mod)
+    path = _tools_module(mod)
+    if path is None:
+        return
+    h.update(f"{mod.__name__}#{_source_hash(path)};".encode("utf-8"))
+    for name in sorted(vars(mod)):
+        value = vars(mod)[name]
+        if isinstance(value, types.ModuleType):
+            _module_fingerprint(value, h, seen)
+        elif isinstance(value, (types.FunctionType, type)):
+            _module_fingerprint(sys.modules.get(value.__module__), h, seen)
+
+def _function_fingerprint(fn, h, seen):
+    # Código de la función + valores de los globales escalares que usa
+    # (y, recursivamente, de las funciones a las que llama) + fuente de los
+    # módulos de cadTools que usa
+    if fn in seen:
+        return
+    seen.add(fn)
+    fn = getattr(fn, "__wrapped__", fn)
+    code = fn.__code__
+    _code_fingerprint(code, h)
+    g = fn.__globals__
+    for name in sorted(set(code.co_names)):
+        if name not in g:
+            continue
+        value = g[name]
+        if isinstance(value, types.FunctionType):
+            if value.__module__ != fn.__module__:
+                _module_fingerprint(sys.modules.get(value.__module__), h, seen)
+            _function_fingerprint(value, h, seen)
+            continue
+        if isinstance(value, types.ModuleType):
+            _module_fingerprint(value, h, seen)
+            continue
+        try:
+            h.update(f"{name}={canonical(value)};".encode("utf-8"))
+        except Uncacheable:
+            pass  # módulos, clases, documentos...
+
+# Estado global que cambia la geometría sin pasar por los argumentos
+# (p. ej. el nivel de detalle de lod.py): cada función devuelve un texto,
+# vacío en el estado por defecto para no invalidar las entradas existentes
+_CONTEXT = []
+
+def register_context(fn):
+    if fn not in _CONTEXT:
+        _CONTEXT.append(fn)
+    return fn
+
+def make_key(fn, args, kwargs):
+    h = hashlib.sha256()
+    h.update(f"{fn.__module__}.{fn.__qualname__}".encode("utf-8"))
+    for ctx in _CONTEXT:
+        tag = ctx()
+        if tag:
+            h.update(f"[{tag}]".encode("utf-8"))
+    h.update(canonical(list(args)).encode("utf-8"))
+    h.update(canonical(kwargs).encode("utf-8"))
+    _function_fingerprint(fn, h, set())
+    return h.hexdigest()
+
+# -----------------------------
+# Caché
+# -----------------------------
+class BrepCache:
+    def __init__(self, root=None, max_bytes=None, enabled=True):
+        self.root = root or os.environ.get("BREP_CACHE_DIR", DEFAULT_DIR)
+        if max_bytes is None:
+            max_bytes = float(os.environ.get("BREP_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "uncacheable": 0, "errors": 0}
+        self._size = None  # tamaño aproximado en disco (se calcula al primer put)
+
+    def path(self, key):
+        return os.path.join(self.root, key + SUFFIX)
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        import Part
+        try:
+            shape = Part.Shape()
+            shape.importBrep(path)
+        except Exception:
+            self.stats["errors"] += 1
+            return None
+        try:
+            os.utime(path, None)  # marca de uso para el LRU
+        except OSError:
+            pass
+        return shape
+
+    def put(self, key, shape):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=SUFFIX, dir=self.root)
+        os.close(fd)
+        try:
+            shape.exportBrep(tmp)
+            os.replace(tmp, self.path(key))  # atómico: seguro entre procesos
+        except Exception:
+            self.stats["errors"] += 1
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.stats["stores"] += 1
+        if self._size is None:
+            self._size = self.disk_usage()
+        else:
+            self._size += os.path.getsize(self.path(key))
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(SUFFIX) and entry.is_file():
+                st = entry.stat()
+                out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_bytes=None):
+        # Borra las entradas menos usadas hasta quedar por debajo del límite
+        target = self.max_bytes if target_bytes is None else target_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats["evictions"] += 1
+        self._size = total
+
+    def clear(self):
+        self.evict(target_bytes=0)
+
+    def call(self, fn, args, kwargs):
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        try:
+            key = make_key(fn, args, kwargs)
+        except Uncacheable:
+            self.stats["uncacheable"] += 1
+            return fn(*args, **kwargs)
+        shape = self.get(key)
+        if shape is not None:
+            self.stats["hits"] += 1
+            return shape
+        self.stats["misses"] += 1
+        shape = fn(*args, **kwargs)
+        self.put(key, shape)
+        return shape
+
+    def report(self):
+        s = self.stats
+        lookups = s["hits"] + s["misses"]
+        ratio = 100.0 * s["hits"] / lookups if lookups else 0.0
+        return (f"BREP cache: {s['hits']} aciertos / {s['misses']} fallos ({ratio:.0f}%), "
+                f"{s['stores']} guardadas, {s['evictions']} expulsadas, "
+                f"{s['uncacheable']} no cacheables, {s['errors']} errores")
+
+_default = None
+
+def default_cache():
+    global _default
+    if _default is None:
+        enabled = os.environ.get("BREP_CACHE", "1").lower() not in ("0", "false", "no", "off")
+        if importlib.util.find_spec("Part") is None:
+            enabled = False   # sin FreeCAD no hay formas que guardar
+        _default = BrepCache(enabled=enabled)
+    return _default
+
+def cached_builder(fn=None, cache=None):
+    # Uso: @cached_builder  o  @cached_builder(cache=BrepCache(...))
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return (cache or default_cache()).call(func, args, kwargs)
+        return wrapper
+    if fn is not None:
+        return decorate(fn)
+    return decorate
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Información/limpieza de la caché BREP")
+    ap.add_argument("--dir", default=None)
+    ap.add_argument("--clear", action="store_true", help="borra todas las entradas")
+    args = ap.parse_args()
+    cache = BrepCache(root=args.dir)
+    if args.clear:
+        cache.clear()
+    entries = cache._entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"{cache.root}: {len(entries)} entradas, {total / 1024 / 1024:.1f} MB "
+          f"(límite {cache.max_bytes / 1024 / 1024:.0f} MB)")
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+# Campo magnético (Biot–Savart) de las bobinas de los propulsores.
+#
+# Cada bobina (toro del CAD: radio mayor R, menor r, centro, eje, amperios-vuelta
+# NI) se discretiza en n_fil x n_fil filamentos circulares repartidos por la
+# sección y cada filamento en n_seg segmentos rectos. El campo de un segmento
+# recto es exacto, así que el error solo viene de la discretización.
+# Cálculo vectorizado con NumPy por bloques de puntos (memoria acotada) y, para
+# mallas grandes, en procesos. Los mapas se guardan en caché (npz) por
+# configuración de bobinas + malla.
+#
+# Unidades: posiciones en mm (como el CAD), campo en T.
+#
+#   python coil_field.py cubesat_pro --set coil_NI=2000 -o campo.npz --lines 12
+#   python run_model.py cubesat_pro -o pro.FCStd --field campo.csv
+#
+# Variables de entorno:
+#   FIELD_CACHE=0         desactiva la caché
+#   FIELD_CACHE_DIR=...   carpeta (por defecto ~/.cache/propulsive_field)
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from brep_cache import canonical
+
+MU0 = 4e-7 * np.pi
+AXES = {"X": (1.0, 0.0, 0.0), "Y": (0.0, 1.0, 0.0), "Z": (0.0, 0.0, 1.0)}
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "propulsive_field")
+CHUNK_ELEMS = 1 << 18      # puntos x segmentos por bloque (~2 MB por array)
+PARALLEL_MIN = 20000       # puntos a partir de los que se usan procesos
+VERSION = 1                # cambia la clave de caché si cambia el cálculo
+
+# -----------------------------
+# Bobinas y filamentos
+# -----------------------------
+def axis_vector(axis):
+    # "X"/"Y"/"Z" o vector -> vector unitario
+    v = np.asarray(AXES[axis.upper()] if isinstance(axis, str) else axis, dtype=float)
+    return v / np.linalg.norm(v)
+
+def coil(center, axis, R, r, NI):
+    return {"center": tuple(map(float, center)), "axis": tuple(axis_vector(axis)),
+            "R": float(R), "r": float(r), "NI": float(NI)}
+
+def _basis(axis):
+    # (u, v) ortonormales con u x v = axis (corriente positiva según la mano derecha)
+    a = axis_vector(axis)
+    ref = np.array([1.0, 0.0, 0.0]) if abs(a[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    u = np.cross(a, ref)
+    u /= np.linalg.norm(u)
+    return u, np.cross(a, u)
+
+def filaments(c, n_fil=3):
+    # [(radio, desplazamiento axial)] dentro de la sección circular de radio r
+    # (malla n_fil x n_fil recortada al círculo; un solo filamento si r = 0)
+    if c["r"] <= 0 or n_fil <= 1:
+        return [(c["R"], 0.0)]
+    t = (np.arange(n_fil) + 0.5) / n_fil * 2.0 - 1.0
+    dr, dz = np.meshgrid(t * c["r"], t * c["r"])
+    inside = dr ** 2 + dz ** 2 <= c["r"] ** 2
+    return list(zip(c["R"] + dr[inside], dz[inside]))
+
+def segments(coils, n_seg=72, n_fil=3):
+    # (p1, p2, I): extremos (M, 3) [mm] e intensidad (M,) [A] de todos los segmentos
+    th = np.linspace(0.0, 2.0 * np.pi, n_seg + 1)
+    # Polígono con la misma área que el círculo (mismo momento dipolar)
+    k = np.sqrt((2.0 * np.pi / n_seg) / np.sin(2.0 * np.pi / n_seg))
+    p1, p2, cur = [], [], []
+    for c in coils:
+        u, v = _basis(c["axis"])
+        a = axis_vector(c["axis"])
+        fils = filaments(c, n_fil)
+        for rad, dz in fils:
+            ring = (np.asarray(c["center"]) + dz * a +
+                    k * rad * (np.cos(th)[:, None] * u + np.sin(th)[:, None] * v))
+            p1.append(ring[:-1])
+            p2.append(ring[1:])
+            cur.append(np.full(n_seg, c["NI"] / len(fils)))
+    if not p1:
+        return np.empty((0, 3)), np.empty((0, 3)), np.empty(0)
+    return np.vstack(p1), np.vstack(p2), np.concatenate(cur)
+
+# -----------------------------
+# Biot–Savart
+# -----------------------------
+def _field_block(x, p1, p2, cur, core):
+    # Segmento recto de p1 a p2 (Hanson & Hirshman):
+    #   B = μ0·I/4π · (a x b)·(|a|+|b|) / (|a||b|(|a||b| + a·b)),  a = p1 - x, b = p2 - x
+    # Por componentes (arrays (K, M)) para no crear arrays (K, M, 3)
+    ax, ay, az = ((p1[None, :, i] - x[:, i, None]) * 1e-3 for i in range(3))
+    bx, by, bz = ((p2[None, :, i] - x[:, i, None]) * 1e-3 for i in range(3))
+    na = np.sqrt(ax * ax + ay * ay + az * az)
+    nb = np.sqrt(bx * bx + by * by + bz * bz)
+    den = na * nb * (na * nb + ax * bx + ay * by + az * bz)
+    # Puntos sobre un filamento (den -> 0): contribución nula
+    ok = den > core
+    f = np.where(ok, (na + nb) / np.where(ok, den, 1.0), 0.0) * cur[None, :]
+    out = np.empty((len(x), 3))
+    out[:, 0] = np.einsum("km,km->k", f, ay * bz - az * by)
+    out[:, 1] = np.einsum("km,km->k", f, az * bx - ax * bz)
+    out[:, 2] = np.einsum("km,km->k", f, ax * by - ay * bx)
+    return MU0 / (4.0 * np.pi) * out
+
+def _field_serial(points, p1, p2, cur, core=1e-18):
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    out = np.zeros_like(points)
+    step = max(1, CHUNK_ELEMS // max(1, len(cur)))
+    for k in range(0, len(points), step):
+        out[k:k + step] = _field_block(points[k:k + step], p1, p2, cur, core)
+    return out
+
+def field(points, segs, workers=1):
+    # B [T] en points (..., 3) [mm]; con workers > 1 y muchos puntos, en procesos
+    points = np.asarray(points, dtype=float)
+    flat = points.reshape(-1, 3)
+    p1, p2, cur = segs
+    workers = min(workers or os.cpu_count() or 1, max(1, len(flat) // (PARALLEL_MIN // 4)))
+    if workers > 1 and len(flat) >= PARALLEL_MIN:
+        blocks = np.array_split(flat, workers * 4)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            out = np.vstack(list(pool.map(_field_serial, blocks, *([x] * len(blocks) for x in (p1, p2, cur)))))
+    else:
+        out = _field_serial(flat, p1, p2, cur)
+    return out.reshape(points.shape)
+
+def on_axis(c, z):
+    # Campo analítico en el eje de una espira fina (comprobación) [T]
+    R = c["R"] * 1e-3
+    return MU0 * c["NI"] * R ** 2 / (2.0 * (R ** 2 + (np.asarray(z, dtype=float) * 1e-3) ** 2) ** 1.5)
+
+# -----------------------------
+# Mallas
+# -----------------------------
+def grid_2d(center, axis, r_max, z_min, z_max, nr=81, nz=121):
+    # Plano meridiano que contiene el eje: r en [-r_max, r_max], z a lo largo del eje.
+    # Devuelve (puntos (nz, nr, 3), r (nr,), z (nz,))
+    u, _ = _basis(axis)
+    a = axis_vector(axis)
+    r = np.linspace(-r_max, r_max, nr)
+    z = np.linspace(z_min, z_max, nz)
+    pts = np.asarray(center, dtype=float) + z[:, None, None] * a + r[None, :, None] * u
+    return pts, r, z
+
+def grid_3d(lo, hi, shape=(41, 41, 41)):
+    # Caja alineada con los ejes: puntos (nx, ny, nz, 3)
+    axes = [np.linspace(l, h, n) for l, h, n in zip(lo, hi, shape)]
+    return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+
+# -----------------------------
+# Caché de mapas
+# -----------------------------
+def _cache_dir():
+    if os.environ.get("FIELD_CACHE", "1") == "0":
+        return None
+    return os.environ.get("FIELD_CACHE_DIR", DEFAULT_DIR)
+
+def cache_key(coils, grid, n_seg, n_fil):
+    text = canonical({"coils": coils, "grid": grid, "n_seg": n_seg, "n_fil": n_fil, "v": VERSION})
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def field_map(coils, kind="2d", workers=1, n_seg=72, n_fil=3, cache=True, **grid):
+    # Mapa de campo en una malla 2D (grid_2d, plano meridiano de la primera bobina)
+    # o 3D (grid_3d). Devuelve {"points", "B", "kind", ...coordenadas, "cached"}
+    if kind == "2d":
+        c0 = coils[0]
+        extent = max(c["R"] + c["r"] for c in coils)
+        grid = dict({"center": c0["center"], "axis": c0["axis"], "r_max": 2.0 * extent,
+                     "z_min": -4.0 * extent, "z_max": 6.0 * extent}, **grid)
+    elif kind != "3d":
+        raise ValueError(f"Malla desconocida: {kind} (usa 2d o 3d)")
+    key = cache_key(coils, dict(grid, kind=kind), n_seg, n_fil)
+    folder = _cache_dir() if cache else None
+    path = os.path.join(folder, key + ".npz") if folder else None
+    if path and os.path.exists(path):
+        with np.load(path) as npz:
+            out = {k: npz[k] for k in npz.files}
+        out["kind"] = kind
+        out["cached"] = True
+        return out
+
+    if kind == "2d":
+        pts, r, z = grid_2d(**grid)
+        out = {"points": pts, "r": r, "z": z}
+    else:
+        pts = grid_3d(**grid)
+        out = {"points": pts}
+    out["B"] = field(pts, segments(coils, n_seg, n_fil), workers)
+    if path:
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **out)
+        os.replace(tmp, path)
+    out["kind"] = kind
+    out["cached"] = False
+    return out
+
+# -----------------------------
+# Líneas de campo
+# -----------------------------
+def seeds(c, n=8, frac=0.9):
+    # Semillas en el plano de la bobina, a lo largo del diámetro (dentro del hueco)
+    u, _ = _basis(c["axis"])
+    s = np.linspace(-frac, frac, n) * (c["R"] - c["r"])
+    return np.asarray(c["center"]) + s[:, None] * u
+
+def trace(segs, start, step=1.0, n_steps=400, bounds=None, b_min=1e-9):
+    # Líneas de campo por RK4 sobre la dirección de B, en los dos sentidos y con
+    # todas las semillas a la vez. bounds = (lo, hi) corta las líneas que salen.
+    # Devuelve [array (k, 3)] por semilla
+    start = np.asarray(start, dtype=float).reshape(-1, 3)
+
+    def direction(x):
+        B = _field_serial(x, *segs)
+        n = np.linalg.norm(B, axis=1)
+        return B / np.where(n > b_min, n, np.inf)[:, None], n
+
+    halves = []
+    for sign in (1.0, -1.0):
+        x = start.copy()
+        alive = np.ones(len(x), dtype=bool)
+        path = [x.copy()]
+        for _ in range(n_steps):
+            if not alive.any():
+                break
+            xa = x[alive]
+            k1, nb = direction(xa)
+            k2, _ = direction(xa + 0.5 * sign * step * k1)
+            k3, _ = direction(xa + 0.5 * sign * step * k2)
+            k4, _ = direction(xa + sign * step * k3)
+            xa = xa + sign * step / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+            stop = nb <= b_min
+            if bounds is not None:
+                stop |= np.any((xa < bounds[0]) | (xa > bounds[1]), axis=1)
+            x[alive] = xa
+            idx = np.flatnonzero(alive)
+            alive[idx[stop]] = False
+            path.append(np.where(alive[:, None], x, np.nan))
+        halves.append(np.stack(path, axis=1))
+    lines = []
+    for i in range(len(start)):
+        fwd = halves[0][i][~np.isnan(halves[0][i][:, 0])]
+        bwd = halves[1][i][~np.isnan(halves[1][i][:, 0])]
+        lines.append(np.vstack([bwd[::-1], fwd[1:]]))
+    return lines
+
+# -----------------------------
+# Exportación
+# -----------------------------
+def save(path, fmap=None, lines=(), segs=None):
+    # .npz: mapa + líneas (concatenadas, con offsets); .csv: puntos de las líneas con B
+    ext = os.path.splitext(path)[1].lower()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if ext == ".npz":
+        data = {k: v for k, v in (fmap or {}).items() if isinstance(v, np.ndarray)}
+        if lines:
+            data["lines"] = np.vstack(lines)
+            data["line_offsets"] = np.cumsum([0] + [len(l) for l in lines])
+        np.savez_compressed(path, **data)
+    elif ext == ".csv":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("line,x_mm,y_mm,z_mm,Bx_T,By_T,Bz_T,B_T\n")
+            for i, line in enumerate(lines):
+                B = field(line, segs) if segs is not None else np.full_like(line, np.nan)
+                for x, b in zip(line, B):
+                    f.write(f"{i},{x[0]:.4f},{x[1]:.4f},{x[2]:.4f},{b[0]:.6e},{b[1]:.6e},{b[2]:.6e},"
+                            f"{np.linalg.norm(b):.6e}\n")
+    else:
+        raise ValueError(f"Formato de campo no soportado: {ext} (usa .npz o .csv)")
+    return path
+
+def add_to_doc(doc, lines, name="FieldLines"):
+    # Líneas de campo como compuesto de polilíneas en el documento (junto al CAD)
+    import FreeCAD as App
+    import Part
+    import profiling as prof
+    wires = [Part.makePolygon([App.Vector(*map(float, x)) for x in line]) for line in lines if len(line) > 1]
+    if not wires:
+        return None
+    return prof.add_feature(doc, Part.makeCompound(wires), name)
+
+def solve(coils, n_lines=8, workers=1, n_seg=72, n_fil=3, cache=True, step=None, **grid):
+    # Mapa 2D + líneas de campo sembradas en el hueco de cada bobina
+    t0 = time.perf_counter()
+    fmap = field_map(coils, "2d", workers, n_seg, n_fil, cache, **grid)
+    segs = segments(coils, n_seg, n_fil)
+    pts = fmap["points"].reshape(-1, 3)
+    bounds = (pts.min(axis=0) - 1e-6, pts.max(axis=0) + 1e-6)
+    # En el plano meridiano el grosor es nulo: se deja margen fuera del plano
+    pad = np.where(bounds[1] - bounds[0] < 1e-3, np.inf, 0.0)
+    bounds = (bounds[0] - pad, bounds[1] + pad)
+    step = step or 0.05 * min(c["R"] for c in coils)
+    lines = []
+    if n_lines:
+        start = np.vstack([seeds(c, n_lines) for c in coils])
+        lines = trace(segs, start, step, bounds=bounds)
+    return {"map": fmap, "lines": lines, "segments": segs, "wall_s": time.perf_counter() - t0}
+
+def main(argv=None):
+    from model_registry import load_model, parse_overrides
+    ap = argparse.ArgumentParser(description="Campo Biot–Savart de las bobinas de un modelo")
+    ap.add_argument("model", help="modelo con coils(p) (p. ej. cubesat_pro, cubesat_hall)")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VAL")
+    ap.add_argument("-o", "--output", default=None, help=".npz (mapa + líneas) o .csv (líneas)")
+    ap.add_argument("--lines", type=int, default=8, help="líneas de campo por bobina")
+    ap.add_argument("--nr", type=int, default=81)
+    ap.add_argument("--nz", type=int, default=121)
+    ap.add_argument("--segments", type=int, default=72, help="segmentos por filamento")
+    ap.add_argument("--filaments", type=int, default=3, help="filamentos por lado de la sección")
+    ap.add_argument("-j", "--workers", type=int, default=None)
+    ap.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args(argv)
+
+    model = load_model(args.model)
+    if not hasattr(model, "coils"):
+        print(f"{args.model}: el modelo no define bobinas (coils)")
+        return 1
+    coils = model.coils(model.resolve_params(parse_overrides(args.set)))
+    res = solve(coils, args.lines, args.workers, args.segments, args.filaments, not args.no_cache,
+                nr=args.nr, nz=args.nz)
+    fmap = res["map"]
+    Bn = np.linalg.norm(fmap["B"], axis=-1)
+    c = coils[0]
+    b0 = np.linalg.norm(field(np.asarray([c["center"]]), res["segments"])[0])
+    print(f"{len(coils)} bobina(s), {len(res['segments'][2])} segmentos, malla {fmap['points'].shape[:-1]} "
+          f"({'caché' if fmap['cached'] else 'calculada'}) en {res['wall_s']:.2f} s")
+    print(f"  B centro {b0 * 1e3:.3f} mT (espira fina {on_axis(c, 0.0) * 1e3:.3f} mT), "
+          f"máx. en malla {Bn.max() * 1e3:.3f} mT")
+    if args.output:
+        save(args.output, fmap, res["lines"], res["segments"])
+        print(f"Campo en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
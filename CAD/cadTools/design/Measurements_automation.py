@@ -2,15 +2,32 @@
 # Macro: NaveFusionParametrica
 # Unidades: mm (FreeCAD internamente usa mm). Masas en kg usando densidades [kg/m^3].
 
-import FreeCAD as App
-import Part
-from FreeCAD import Vector
+import os
+import sys
+
+# cadTools/ (utilidades compartidas) en el path
+_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _TOOLS_DIR not in sys.path:
+    sys.path.insert(0, _TOOLS_DIR)
+
+import docless
+import headless
+import mass_properties as mp
+import profiling as prof
+import radiator_sizing
+from param_graph import DependencyGraph
 
 try:
-    import FreeCADGui as Gui
-    GUI_AVAILABLE = True
-except Exception:
-    GUI_AVAILABLE = False
+    import FreeCAD as App
+    import Part
+    from FreeCAD import Vector
+    FREECAD_AVAILABLE = True
+except ImportError:
+    # Sin FreeCAD solo quedan disponibles las tablas (P, TOL, MAT...)
+    FREECAD_AVAILABLE = False
+
+# La GUI se importa de forma perezosa (solo en main y con FreeCAD gráfico)
+GUI_AVAILABLE = headless.gui_available()
 
 DOC_NAME = "NaveFusion"
 
@@ -40,6 +57,16 @@ P = {
     "RAD_CENTER_Y": 800.0,
     "RAD_BASE_Z": 200.0,
     "RAD_H": 1000.0,
+    # Dimensionado térmico (radiator_sizing.py): con RAD_WASTE_KW > 0, RAD_LEN
+    # (hasta FUSION_LEN) y, si no basta, RAD_W salen del calor residual
+    "RAD_WASTE_KW": 0.0,
+    "RAD_TEMP_K": 900.0,
+    "RAD_SINK_K": 4.0,
+    "RAD_EMISSIVITY": 0.85,
+    # Eficiencia de aleta: None = de RAD_T, el paso de caloductos y la
+    # conductividad del material de los radiadores (MAT_MAP)
+    "RAD_FIN_EFF": None,
+    "RAD_PIPE_PITCH": 50.0,
 
     "PV_THICK_X": 30.0,
     "PV_H": 1200.0,
@@ -96,6 +123,17 @@ MAT_MAP = {
     "Tobera": ("Inconel", 1.0),
 }
 
+# Pares que se tocan o se anidan por diseño (interference.py no los reporta);
+# admiten comodines
+MATES = (
+    ("Bus", "FusionShell"),
+    ("Bus", "Domo"),
+    ("Bus", "PanelSolar_*"),
+    ("FusionShell", "Domo"),
+    ("FusionShell", "Reactor"),   # el reactor va dentro de la envolvente
+    ("FusionShell", "Tanque"),
+)
+
 EXTRA_MASS = {
     "Tanque_Propelente_kg": 1200.0,  # masa húmeda adicional (propelente)
 }
@@ -103,30 +141,74 @@ EXTRA_MASS = {
 # -----------------------------
 # Utilidades
 # -----------------------------
-def ensure_doc():
+def ensure_doc(name=DOC_NAME):
     doc = App.ActiveDocument
-    if not doc or doc.Name != DOC_NAME:
+    if not doc or doc.Name != name:
         if doc:
             App.closeDocument(doc.Name)
-        doc = App.newDocument(DOC_NAME)
+        doc = App.newDocument(name)
     return doc
 
+def resolve_params(params=None):
+    # P por defecto + sobrescrituras (solo claves conocidas)
+    p = dict(P)
+    for key, value in (params or {}).items():
+        if key not in P:
+            raise KeyError(f"Parámetro desconocido: {key}")
+        p[key] = float(value) if mp.np.isscalar(value) else mp.np.asarray(value, dtype=float)
+    if p["RAD_FIN_EFF"] is None:
+        p["RAD_FIN_EFF"] = radiator_fin_eff(p)
+    size_radiators(p)
+    return p
+
+def radiator_fin_eff(p):
+    # Aleta entre caloductos (semiancho RAD_PIPE_PITCH/2), dos caras
+    k = radiator_sizing.material_conductivity(MAT_MAP["Radiador_L"][0])
+    eff = radiator_sizing.fin_efficiency(p["RAD_T"], p["RAD_PIPE_PITCH"] / 2.0, p["RAD_TEMP_K"],
+                                         p["RAD_EMISSIVITY"], k, sides=2)
+    return float(eff) if eff.ndim == 0 else eff
+
+def size_radiators(p):
+    # 2 radiadores de 2 caras; solo donde RAD_WASTE_KW > 0 (admite arrays)
+    waste = mp.np.asarray(p["RAD_WASTE_KW"], dtype=float)
+    if not mp.np.any(waste > 0.0):
+        return p
+    r = radiator_sizing.size(waste * 1e3, p["RAD_TEMP_K"], p["RAD_W"], p["RAD_SINK_K"], p["RAD_EMISSIVITY"],
+                             p["RAD_FIN_EFF"], sides=2, n_panels=2, max_len=p["FUSION_LEN"])
+    for key, value in (("RAD_LEN", r["length_mm"]), ("RAD_W", r["width_mm"])):
+        value = mp.np.where(waste > 0.0, value, p[key])
+        p[key] = float(value) if value.ndim == 0 else value
+    return p
+
 def add_obj(doc, shape, name, color=None):
-    obj = doc.addObject("Part::Feature", name)
-    obj.Shape = shape
-    if GUI_AVAILABLE and color:
+    # Part::Feature con documento; Component (docless.py) sin él
+    obj = docless.add(doc, shape, name)
+    if GUI_AVAILABLE and color and doc is not None:
         obj.ViewObject.ShapeColor = color
     return obj
 
-def set_props(obj, material_key, tol_mm):
-    obj.addProperty("App::PropertyString", "Material", "Design").Material = material_key
+def set_prop(obj, prop_type, name, group, value):
+    # addProperty solo la primera vez (permite reconstrucciones en el mismo documento)
+    if name not in obj.PropertiesList:
+        obj.addProperty(prop_type, name, group)
+    setattr(obj, name, value)
+
+def set_props(obj, material_key, tol_mm, volume_mm3=None):
+    # Mass_geom_kg: volumen analítico (volume_mm3) si la pieza es primitiva, el
+    # mismo número que analytic_mass; Mass_occ_kg: volumen OCC de la geometría
+    # construida, para contrastar el modelo analítico
+    set_prop(obj, "App::PropertyString", "Material", "Design", material_key)
     dens = MAT.get(material_key, 1000.0)
-    obj.addProperty("App::PropertyFloat", "Density_kg_m3", "Design").Density_kg_m3 = dens
-    obj.addProperty("App::PropertyFloat", "Tolerance_mm", "Design").Tolerance_mm = tol_mm
-    vol_m3 = obj.Shape.Volume / 1e9  # mm^3 a m^3
+    set_prop(obj, "App::PropertyFloat", "Density_kg_m3", "Design", dens)
+    set_prop(obj, "App::PropertyFloat", "Tolerance_mm", "Design", tol_mm)
+    occ_mm3 = obj.Shape.Volume
+    if volume_mm3 is None:
+        volume_mm3 = occ_mm3  # sólido arbitrario sin fórmula cerrada
     factor = MAT_MAP.get(obj.Name, (material_key, 1.0))[1]
-    mass = dens * vol_m3 * factor
-    obj.addProperty("App::PropertyFloat", "Mass_geom_kg", "Design").Mass_geom_kg = mass
+    kg_per_mm3 = dens * factor / 1e9  # densidad en kg/mm^3
+    mass = kg_per_mm3 * volume_mm3
+    set_prop(obj, "App::PropertyFloat", "Mass_geom_kg", "Design", mass)
+    set_prop(obj, "App::PropertyFloat", "Mass_occ_kg", "Design", kg_per_mm3 * occ_mm3)
     return mass
 
 def cyl_along_x(radius, length, base_x, center_y, center_z):
@@ -143,137 +225,279 @@ def cone_along_x(r1, r2, length, base_x, center_y, center_z):
     return cone
 
 # -----------------------------
-# Construcción
+# Componentes (cada uno solo lee de p)
 # -----------------------------
-doc = ensure_doc()
-assembly = doc.addObject("App::Part", "Nave")
-
-def add_to_assembly(obj):
-    try:
-        assembly.addObject(obj)
-    except Exception:
-        pass
-
-# Bus
-bus = Part.makeBox(P["BUS_LEN"], P["BUS_W"], P["BUS_H"])
-bus.translate(Vector(P["X_BUS_START"], -P["BUS_W"]/2.0, 0))
-o_bus = add_obj(doc, bus, "Bus", color=(0.80, 0.80, 0.85))
-add_to_assembly(o_bus)
-
-# Carcasa de fusión
-fusion_shell = cyl_along_x(P["FUSION_D"]/2.0, P["FUSION_LEN"], P["X_FUSION_START"], 0.0, P["BUS_H"]/2.0)
-o_fusion = add_obj(doc, fusion_shell, "FusionShell", color=(0.70, 0.70, 0.75))
-add_to_assembly(o_fusion)
-
-# Domo (anillo)
-outer = cyl_along_x(P["DOME_OD"]/2.0, P["DOME_LEN"], P["X_FUSION_START"], 0.0, P["BUS_H"]/2.0)
-inner = cyl_along_x(P["DOME_ID"]/2.0, P["DOME_LEN"], P["X_FUSION_START"], 0.0, P["BUS_H"]/2.0)
-domo = outer.cut(inner)
-o_domo = add_obj(doc, domo, "Domo", color=(0.50, 0.50, 0.52))
-add_to_assembly(o_domo)
-
-# Reactor
-reactor = cyl_along_x(P["REACTOR_D"]/2.0, P["REACTOR_LEN"], P["X_FUSION_START"] + 500.0, 0.0, P["BUS_H"]/2.0)
-o_reactor = add_obj(doc, reactor, "Reactor", color=(0.40, 0.40, 0.45))
-add_to_assembly(o_reactor)
-
-# Tanque
-tank = cyl_along_x(P["TANK_D"]/2.0, P["TANK_LEN"], P["X_TANK_START"], 0.0, P["BUS_H"]/2.0)
-o_tank = add_obj(doc, tank, "Tanque", color=(0.75, 0.80, 0.85))
-add_to_assembly(o_tank)
-
-# Radiadores
-def make_radiator(sign=+1):
-    rad = Part.makeBox(P["RAD_LEN"], P["RAD_W"], P["RAD_T"])
-    x0 = P["X_FUSION_START"] + (P["FUSION_LEN"] - P["RAD_LEN"]) / 2.0
-    y0 = sign * (P["RAD_CENTER_Y"] - P["RAD_W"]/2.0)
-    z0 = P["RAD_BASE_Z"]
+def make_bus(p):
+    bus = Part.makeBox(p["BUS_LEN"], p["BUS_W"], p["BUS_H"])
+    bus.translate(Vector(p["X_BUS_START"], -p["BUS_W"]/2.0, 0))
+    return bus
+
+def make_fusion_shell(p):
+    return cyl_along_x(p["FUSION_D"]/2.0, p["FUSION_LEN"], p["X_FUSION_START"], 0.0, p["BUS_H"]/2.0)
+
+def make_domo(p):
+    # Domo (anillo)
+    outer = cyl_along_x(p["DOME_OD"]/2.0, p["DOME_LEN"], p["X_FUSION_START"], 0.0, p["BUS_H"]/2.0)
+    inner = cyl_along_x(p["DOME_ID"]/2.0, p["DOME_LEN"], p["X_FUSION_START"], 0.0, p["BUS_H"]/2.0)
+    return prof.cut(outer, inner)
+
+def make_reactor(p):
+    return cyl_along_x(p["REACTOR_D"]/2.0, p["REACTOR_LEN"], p["X_FUSION_START"] + 500.0, 0.0, p["BUS_H"]/2.0)
+
+def make_tank(p):
+    return cyl_along_x(p["TANK_D"]/2.0, p["TANK_LEN"], p["X_TANK_START"], 0.0, p["BUS_H"]/2.0)
+
+def make_radiator(p, sign=+1):
+    rad = Part.makeBox(p["RAD_LEN"], p["RAD_W"], p["RAD_T"])
+    x0 = p["X_FUSION_START"] + (p["FUSION_LEN"] - p["RAD_LEN"]) / 2.0
+    y0 = sign * (p["RAD_CENTER_Y"] - p["RAD_W"]/2.0)
+    z0 = p["RAD_BASE_Z"]
     rad.translate(Vector(x0, y0, z0))
     return rad
 
-rad_L = make_radiator(+1)
-rad_R = make_radiator(-1)
-o_rad_L = add_obj(doc, rad_L, "Radiador_L", color=(0.90, 0.20, 0.20))
-o_rad_R = add_obj(doc, rad_R, "Radiador_R", color=(0.90, 0.20, 0.20))
-add_to_assembly(o_rad_L)
-add_to_assembly(o_rad_R)
-
-# Paneles solares (cada ala crece en +Y; la derecha se desplaza hacia -Y)
-pv_span_each = P["PV_HALF_SPAN"] - P["BUS_W"]/2.0  # 4000 - 600 = 3400 mm
-
-def make_pv(sign=+1):
-    pv = Part.makeBox(P["PV_THICK_X"], pv_span_each, P["PV_H"])
-    x0 = P["PV_MOUNT_X"] - P["PV_THICK_X"]/2.0
+def make_pv(p, sign=+1):
+    # Paneles solares (cada ala crece en +Y; la derecha se desplaza hacia -Y)
+    pv_span_each = p["PV_HALF_SPAN"] - p["BUS_W"]/2.0  # 4000 - 600 = 3400 mm
+    pv = Part.makeBox(p["PV_THICK_X"], pv_span_each, p["PV_H"])
+    x0 = p["PV_MOUNT_X"] - p["PV_THICK_X"]/2.0
     if sign > 0:
         # izquierda (+Y): arranca en el lateral del bus y crece +Y
-        y0 = P["BUS_W"]/2.0
+        y0 = p["BUS_W"]/2.0
     else:
         # derecha (-Y): arranca fuera hacia -Y para que crezca +Y hasta el lateral
-        y0 = -P["BUS_W"]/2.0 - pv_span_each
+        y0 = -p["BUS_W"]/2.0 - pv_span_each
     z0 = 0.0
     pv.translate(Vector(x0, y0, z0))
     return pv
 
-pv_L = make_pv(+1)
-pv_R = make_pv(-1)
-o_pv_L = add_obj(doc, pv_L, "PanelSolar_L", color=(0.10, 0.30, 0.60))
-o_pv_R = add_obj(doc, pv_R, "PanelSolar_R", color=(0.10, 0.30, 0.60))
-add_to_assembly(o_pv_L)
-add_to_assembly(o_pv_R)
-
-# Tobera magnética
-nozzle = cone_along_x(P["NOZZLE_D_OUT"]/2.0, P["NOZZLE_D_IN"]/2.0, P["NOZZLE_LEN"], P["X_NOZZLE_START"], 0.0, P["BUS_H"]/2.0)
-o_nozzle = add_obj(doc, nozzle, "Tobera", color=(0.30, 0.35, 0.40))
-add_to_assembly(o_nozzle)
+def make_nozzle(p):
+    # Tobera magnética
+    return cone_along_x(p["NOZZLE_D_OUT"]/2.0, p["NOZZLE_D_IN"]/2.0, p["NOZZLE_LEN"], p["X_NOZZLE_START"], 0.0, p["BUS_H"]/2.0)
+
+# nombre, constructor, color, material por defecto, clave de TOL
+PARTS = (
+    ("Bus",          make_bus,                     (0.80, 0.80, 0.85), "Al7075",  "Bus"),
+    ("FusionShell",  make_fusion_shell,            (0.70, 0.70, 0.75), "Inconel", "FusionShell"),
+    ("Domo",         make_domo,                    (0.50, 0.50, 0.52), "W",       "Domo"),
+    ("Reactor",      make_reactor,                 (0.40, 0.40, 0.45), "W",       "Reactor"),
+    ("Tanque",       make_tank,                    (0.75, 0.80, 0.85), "AlLi",    "Tanque"),
+    ("Radiador_L",   lambda p: make_radiator(p, +1), (0.90, 0.20, 0.20), "Ti",    "Radiador"),
+    ("Radiador_R",   lambda p: make_radiator(p, -1), (0.90, 0.20, 0.20), "Ti",    "Radiador"),
+    ("PanelSolar_L", lambda p: make_pv(p, +1),     (0.10, 0.30, 0.60), "CFRP",    "PanelSolar"),
+    ("PanelSolar_R", lambda p: make_pv(p, -1),     (0.10, 0.30, 0.60), "CFRP",    "PanelSolar"),
+    ("Tobera",       make_nozzle,                  (0.30, 0.35, 0.40), "Inconel", "Tobera"),
+)
 
 # -----------------------------
-# Propiedades: materiales, tolerancias, masas
+# Propiedades analíticas (mismas piezas, sin OCC; p puede llevar arrays)
 # -----------------------------
-total_geom_mass = 0.0
+def _x_axis_base(p, base_x):
+    return (base_x, 0.0, p["BUS_H"]/2.0)
+
+def props_bus(p):
+    return mp.box(p["BUS_LEN"], p["BUS_W"], p["BUS_H"], (p["X_BUS_START"], -p["BUS_W"]/2.0, 0.0))
+
+def props_fusion_shell(p):
+    return mp.cylinder(p["FUSION_D"]/2.0, p["FUSION_LEN"], _x_axis_base(p, p["X_FUSION_START"]), axis="x")
+
+def props_domo(p):
+    return mp.annulus(p["DOME_OD"]/2.0, p["DOME_ID"]/2.0, p["DOME_LEN"], _x_axis_base(p, p["X_FUSION_START"]), axis="x")
+
+def props_reactor(p):
+    return mp.cylinder(p["REACTOR_D"]/2.0, p["REACTOR_LEN"], _x_axis_base(p, p["X_FUSION_START"] + 500.0), axis="x")
+
+def props_tank(p):
+    return mp.cylinder(p["TANK_D"]/2.0, p["TANK_LEN"], _x_axis_base(p, p["X_TANK_START"]), axis="x")
+
+def props_radiator(p, sign=+1):
+    x0 = p["X_FUSION_START"] + (p["FUSION_LEN"] - p["RAD_LEN"]) / 2.0
+    y0 = sign * (p["RAD_CENTER_Y"] - p["RAD_W"]/2.0)
+    return mp.box(p["RAD_LEN"], p["RAD_W"], p["RAD_T"], (x0, y0, p["RAD_BASE_Z"]))
+
+def props_pv(p, sign=+1):
+    pv_span_each = p["PV_HALF_SPAN"] - p["BUS_W"]/2.0
+    x0 = p["PV_MOUNT_X"] - p["PV_THICK_X"]/2.0
+    y0 = p["BUS_W"]/2.0 if sign > 0 else -p["BUS_W"]/2.0 - pv_span_each
+    return mp.box(p["PV_THICK_X"], pv_span_each, p["PV_H"], (x0, y0, 0.0))
+
+def props_nozzle(p):
+    return mp.cone(p["NOZZLE_D_OUT"]/2.0, p["NOZZLE_D_IN"]/2.0, p["NOZZLE_LEN"], _x_axis_base(p, p["X_NOZZLE_START"]), axis="x")
+
+ANALYTIC = {
+    "Bus": props_bus,
+    "FusionShell": props_fusion_shell,
+    "Domo": props_domo,
+    "Reactor": props_reactor,
+    "Tanque": props_tank,
+    "Radiador_L": lambda p: props_radiator(p, +1),
+    "Radiador_R": lambda p: props_radiator(p, -1),
+    "PanelSolar_L": lambda p: props_pv(p, +1),
+    "PanelSolar_R": lambda p: props_pv(p, -1),
+    "Tobera": props_nozzle,
+}
 
-def apply_props(o, default_mat_key, tol_key):
-    global total_geom_mass
-    tol = TOL.get(tol_key, 1.0)
-    mkey = MAT_MAP.get(o.Name, (default_mat_key, 1.0))[0]
-    total_geom_mass += set_props(o, mkey, tol)
-
-apply_props(o_bus, "Al7075", "Bus")
-apply_props(o_pv_L, "CFRP", "PanelSolar")
-apply_props(o_pv_R, "CFRP", "PanelSolar")
-apply_props(o_rad_L, "Ti", "Radiador")
-apply_props(o_rad_R, "Ti", "Radiador")
-apply_props(o_fusion, "Inconel", "FusionShell")
-apply_props(o_reactor, "W", "Reactor")
-apply_props(o_domo, "W", "Domo")
-apply_props(o_tank, "AlLi", "Tanque")
-apply_props(o_nozzle, "Inconel", "Tobera")
-
-# Masa adicional de propelente para el tanque
-o_tank.addProperty("App::PropertyFloat", "ExtraMass_kg", "Design").ExtraMass_kg = EXTRA_MASS["Tanque_Propelente_kg"]
-o_tank.addProperty("App::PropertyFloat", "WetMass_kg", "Design").WetMass_kg = o_tank.Mass_geom_kg + o_tank.ExtraMass_kg
-
-# Totales
-total_mass_with_propellant = total_geom_mass + EXTRA_MASS["Tanque_Propelente_kg"]
-assembly.addProperty("App::PropertyFloat", "TotalGeomMass_kg", "Summary").TotalGeomMass_kg = total_geom_mass
-assembly.addProperty("App::PropertyFloat", "TotalWithPropellant_kg", "Summary").TotalWithPropellant_kg = total_mass_with_propellant
+def effective_density(name, default_mat_key, factor=None):
+    # factor (opcional, escalar o array) sustituye al factor efectivo de MAT_MAP
+    mkey, nominal = MAT_MAP.get(name, (default_mat_key, 1.0))
+    return MAT.get(mkey, 1000.0) * (nominal if factor is None else factor)
+
+def analytic_mass(params=None, propellant_kg=None, factors=None, inertia=True):
+    # Masa/CG/inercia del vehículo completo sin construir geometría.
+    # Seco y húmedo (propelente repartido en el volumen del tanque).
+    # factors: {pieza: factor efectivo} para muestrear MAT_MAP (dispersion.py)
+    p = resolve_params(params)
+    if propellant_kg is None:
+        propellant_kg = EXTRA_MASS["Tanque_Propelente_kg"]
+    factors = factors or {}
+    parts = [ANALYTIC[name](p) for name, _, _, _, _ in PARTS]
+    dens = [effective_density(name, mat_key, factors.get(name)) for name, _, _, mat_key, _ in PARTS]
+    dry = mp.rollup(parts, dens, inertia)
+
+    tank = parts[[name for name, _, _, _, _ in PARTS].index("Tanque")]
+    prop_dens = mp.np.asarray(propellant_kg, dtype=float) / (tank.vol * 1e-9)
+    wet = mp.rollup(parts + [tank], dens + [prop_dens], inertia)
+    return {
+        "dry": dry,
+        "wet": wet,
+        "names": [name for name, _, _, _, _ in PARTS],
+    }
 
 # -----------------------------
-# Visual: aplicar sombreado solo a objetos que lo soporten
+# Construcción
 # -----------------------------
-if GUI_AVAILABLE:
-    for obj in doc.Objects:
-        if hasattr(obj, "ViewObject") and hasattr(obj.ViewObject, "listDisplayModes"):
-            modes = obj.ViewObject.listDisplayModes()
-            if isinstance(modes, (list, tuple)) and "Shaded" in modes:
-                obj.ViewObject.DisplayMode = "Shaded"
-    try:
-        Gui.ActiveDocument.ActiveView.fitAll()
-    except Exception:
-        pass
-
-doc.recompute()
-
-print("=== Resumen de masas ===")
-print(f"Masa geométrica total [kg]: {total_geom_mass:.1f}")
-print(f"Masa total con propelente [kg]: {total_mass_with_propellant:.1f}")
-print(f"Tanque (seca) [kg]: {o_tank.Mass_geom_kg:.1f} | Propelente [kg]: {o_tank.ExtraMass_kg:.1f} | Húmeda [kg]: {o_tank.WetMass_kg:.1f}")
+def apply_props(o, default_mat_key, tol_key, volume_mm3=None):
+    tol = TOL.get(tol_key, 1.0)
+    mkey = MAT_MAP.get(o.Name, (default_mat_key, 1.0))[0]
+    return set_props(o, mkey, tol, volume_mm3)
+
+def _apply_part_props(objs, p, names):
+    # Volumen analítico si la pieza es primitiva (Mass_geom_kg); el OCC se
+    # registra aparte (Mass_occ_kg)
+    for name, _, _, mat_key, tol_key in PARTS:
+        if name in names:
+            vol = float(ANALYTIC[name](p).vol) if name in ANALYTIC else None
+            apply_props(objs[name], mat_key, tol_key, vol)
+
+    # Masa adicional de propelente para el tanque
+    if "Tanque" in names:
+        o_tank = objs["Tanque"]
+        set_prop(o_tank, "App::PropertyFloat", "ExtraMass_kg", "Design", EXTRA_MASS["Tanque_Propelente_kg"])
+        set_prop(o_tank, "App::PropertyFloat", "WetMass_kg", "Design", o_tank.Mass_geom_kg + o_tank.ExtraMass_kg)
+
+def update_summary(assembly, objs, p):
+    # Totales (se recalculan en sitio tras cada reconstrucción)
+    total_geom_mass = sum(o.Mass_geom_kg for o in objs.values())
+    total_mass_with_propellant = total_geom_mass + EXTRA_MASS["Tanque_Propelente_kg"]
+    set_prop(assembly, "App::PropertyFloat", "TotalGeomMass_kg", "Summary", total_geom_mass)
+    set_prop(assembly, "App::PropertyFloat", "TotalOccMass_kg", "Summary",
+             sum(o.Mass_occ_kg for o in objs.values()))
+    set_prop(assembly, "App::PropertyFloat", "TotalWithPropellant_kg", "Summary", total_mass_with_propellant)
+
+    # CG e inercia (seco) a partir del modelo analítico
+    dry = analytic_mass(p)["dry"]
+    cg, inertia = dry["cg_mm"], dry["inertia_kgm2"]
+    set_prop(assembly, "App::PropertyVector", "CG_mm", "Summary", Vector(*(float(v) for v in cg)))
+    for i, axis in enumerate("xyz"):
+        set_prop(assembly, "App::PropertyFloat", f"I{axis}{axis}_kgm2", "Summary", float(inertia[i, i]))
+
+def build(doc=None, params=None, graph=None):
+    # graph (opcional) registra qué claves de P lee cada componente.
+    # Sin documento (doc=None) las piezas y el conjunto son Component (docless.py)
+    p = resolve_params(params)
+    graph = graph if graph is not None else DependencyGraph()
+    assembly = docless.group(doc, "App::Part", "Nave")
+
+    objs = {}
+    for name, builder, color, _, _ in PARTS:
+        with prof.section(name):
+            o = add_obj(doc, graph.run(name, builder, p), name, color=color)
+        try:
+            assembly.addObject(o)
+        except Exception:
+            pass
+        objs[name] = o
+
+    with prof.stage("properties"):
+        _apply_part_props(objs, p, set(objs))
+        update_summary(assembly, objs, p)
+    return assembly, objs
+
+def rebuild(assembly, objs, graph, params):
+    # Reconstrucción incremental: solo los componentes que leen claves cambiadas.
+    # params son las sobrescrituras sobre P (no un p ya resuelto: los derivados,
+    # RAD_FIN_EFF y las cotas de los radiadores, se recalculan desde P)
+    p = resolve_params(params)
+    dirty = graph.dirty(graph.changed_keys(p))
+    for name, builder, _, _, _ in PARTS:
+        if name in dirty:
+            with prof.section(name):
+                objs[name].Shape = graph.run(name, builder, p)
+    with prof.stage("properties"):
+        _apply_part_props(objs, p, set(dirty))
+        update_summary(assembly, objs, p)
+    return dirty
+
+def summarize(assembly, objs):
+    # Fila plana de resultados (para barridos y tablas)
+    row = {
+        "TotalGeomMass_kg": assembly.TotalGeomMass_kg,
+        "TotalOccMass_kg": assembly.TotalOccMass_kg,
+        "TotalWithPropellant_kg": assembly.TotalWithPropellant_kg,
+        "CG_x_mm": assembly.CG_mm.x,
+        "CG_y_mm": assembly.CG_mm.y,
+        "CG_z_mm": assembly.CG_mm.z,
+        "Ixx_kgm2": assembly.Ixx_kgm2,
+        "Iyy_kgm2": assembly.Iyy_kgm2,
+        "Izz_kgm2": assembly.Izz_kgm2,
+    }
+    for name, o in objs.items():
+        row[f"{name}.Mass_geom_kg"] = o.Mass_geom_kg
+        row[f"{name}.Mass_occ_kg"] = o.Mass_occ_kg
+    return row
+
+# Estado de la última ejecución (para ajustes interactivos con tune())
+SESSION = {}
+
+def tune(**changes):
+    # Desde la consola de FreeCAD tras ejecutar la macro: tune(RAD_LEN=2500).
+    # Se guardan solo las sobrescrituras; KEY=None vuelve al valor de P
+    if not SESSION:
+        raise RuntimeError("Ejecuta primero la macro (main)")
+    overrides = dict(SESSION["overrides"], **changes)
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+    dirty = rebuild(SESSION["assembly"], SESSION["objs"], SESSION["graph"], overrides)
+    SESSION["overrides"] = overrides
+    SESSION["doc"].recompute()
+    print(f"Reconstruidos: {', '.join(dirty) if dirty else '(ninguno)'} | "
+          f"Masa total [kg]: {SESSION['assembly'].TotalGeomMass_kg:.1f}")
+    return dirty
+
+def main():
+    doc = ensure_doc()
+    graph = DependencyGraph()
+    assembly, objs = build(doc, graph=graph)
+    SESSION.update(doc=doc, assembly=assembly, objs=objs, graph=graph, overrides={})
+
+    # Visual: aplicar sombreado solo a objetos que lo soporten
+    Gui = headless.gui()
+    if Gui:
+        for obj in doc.Objects:
+            if hasattr(obj, "ViewObject") and hasattr(obj.ViewObject, "listDisplayModes"):
+                modes = obj.ViewObject.listDisplayModes()
+                if isinstance(modes, (list, tuple)) and "Shaded" in modes:
+                    obj.ViewObject.DisplayMode = "Shaded"
+        try:
+            Gui.ActiveDocument.ActiveView.fitAll()
+        except Exception:
+            pass
+
+    prof.recompute(doc)
+
+    o_tank = objs["Tanque"]
+    print("=== Resumen de masas ===")
+    print(f"Masa geométrica total [kg]: {assembly.TotalGeomMass_kg:.1f} (OCC: {assembly.TotalOccMass_kg:.1f})")
+    print(f"Masa total con propelente [kg]: {assembly.TotalWithPropellant_kg:.1f}")
+    print(f"Tanque (seca) [kg]: {o_tank.Mass_geom_kg:.1f} | Propelente [kg]: {o_tank.ExtraMass_kg:.1f} | Húmeda [kg]: {o_tank.WetMass_kg:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -2,106 +2,164 @@
 # FreeCAD macro: CubeSat_2U_with_MicroHallThruster
 # Unidad: mm
 
-import FreeCAD as App
-import FreeCADGui as Gui
-import Part
+import os
+import sys
 
-DOC_NAME = "CubeSat_IonThruster"
+# cadTools/ (utilidades compartidas) en el path
+_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _TOOLS_DIR not in sys.path:
+    sys.path.insert(0, _TOOLS_DIR)
+
+import coil_field
+import docless
+import fillets
+import headless
+import lod
+import profiling as prof
+from boolean_fuse import fuse_all
+from brep_cache import cached_builder, default_cache
+from model_registry import resolve
 
-# Crear nuevo documento
-if App.ActiveDocument is None:
-    App.newDocument(DOC_NAME)
-else:
-    App.setActiveDocument(DOC_NAME)
-doc = App.ActiveDocument
+try:
+    import FreeCAD as App
+    import Part
+except ImportError:
+    App = Part = None  # solo parámetros (P) sin FreeCAD
+
+DOC_NAME = "CubeSat_IonThruster"
 
 # ------------------------------
 # 0. Parámetros globales
 # ------------------------------
-# Bus 2U
-bus_length = 227
-bus_width = 100
-bus_height = 100
-wall_thickness = 1.6
-fillet_radius = 2
-
-# Cilindro central
-cyl_diam = 74
-cyl_length = 190
-cyl_wall = 1.2
-
-# Bulkheads
-bulkhead_diam = 94
-bulkhead_thickness = 2.5
-
-# Thruster (Micro Hall)
-thruster_can_diam = 60
-thruster_can_length = 50
-thruster_flange_diam = 76
-thruster_flange_thickness = 3
-nozzle_exit_diam = 10
-nozzle_length = 30
-coil_major_radius = 35
-coil_minor_radius = 5
+P = {
+    # Bus 2U
+    "bus_length": 227.0,
+    "bus_width": 100.0,
+    "bus_height": 100.0,
+    "wall_thickness": 1.6,
+    "fillet_radius": 2.0,
+    "fillet_rule": "all",      # aristas a redondear (ver fillets.py); "outer"... = opcional
+
+    # Cilindro central
+    "cyl_diam": 74.0,
+    "cyl_length": 190.0,
+    "cyl_wall": 1.2,
+
+    # Bulkheads
+    "bulkhead_diam": 94.0,
+    "bulkhead_thickness": 2.5,
+
+    # Thruster (Micro Hall)
+    "thruster_can_diam": 60.0,
+    "thruster_can_length": 50.0,
+    "thruster_flange_diam": 76.0,
+    "thruster_flange_thickness": 3.0,
+    "nozzle_exit_diam": 10.0,
+    "nozzle_length": 30.0,
+    "coil_major_radius": 35.0,
+    "coil_minor_radius": 5.0,
+    # Campo de la bobina (coil_field.py): amperios-vuelta y eje del toro
+    # ("X" como el modelo original; "Z" = coaxial con el propulsor)
+    "coil_NI": 1000.0,
+    "coil_axis": "X",
+}
+
+def resolve_params(params=None):
+    return resolve(P, params, DOC_NAME)
 
 # ------------------------------
 # 1. Funciones de modelado
 # ------------------------------
-def create_bus():
-    outer = Part.makeBox(bus_width, bus_height, bus_length)
-    inner = Part.makeBox(bus_width - 2*wall_thickness,
-                         bus_height - 2*wall_thickness,
-                         bus_length - 2*wall_thickness)
-    inner.translate(App.Vector(wall_thickness, wall_thickness, wall_thickness))
-    shell = outer.cut(inner)
-    return shell.makeFillet(fillet_radius, shell.Edges)
-
-def create_central_cylinder():
-    outer = Part.makeCylinder(cyl_diam/2, cyl_length)
-    inner = Part.makeCylinder((cyl_diam/2) - cyl_wall, cyl_length)
-    cyl_shell = outer.cut(inner)
-    cyl_shell.translate(App.Vector(bus_width/2, bus_height/2, (bus_length - cyl_length)/2))
+# Los constructores cacheados reciben solo las cotas que leen: con p entero
+# cualquier cambio ajeno (bobina, cilindro...) invalidaría la entrada
+@cached_builder
+def bus_shell(width, height, length, wall, fillet_r, fillet_rule, fillet_mode="full"):
+    outer = Part.makeBox(width, height, length)
+    inner = Part.makeBox(width - 2*wall, height - 2*wall, length - 2*wall)
+    inner.translate(App.Vector(wall, wall, wall))
+    shell = prof.cut(outer, inner)
+    return fillets.fillet(shell, fillet_r, fillet_rule, fillet_mode)
+
+def create_bus(p, fillet_mode="full"):
+    return bus_shell(p["bus_width"], p["bus_height"], p["bus_length"], p["wall_thickness"],
+                     p["fillet_radius"], p["fillet_rule"], fillet_mode)
+
+def create_central_cylinder(p):
+    outer = Part.makeCylinder(p["cyl_diam"]/2, p["cyl_length"])
+    inner = Part.makeCylinder((p["cyl_diam"]/2) - p["cyl_wall"], p["cyl_length"])
+    cyl_shell = prof.cut(outer, inner)
+    cyl_shell.translate(App.Vector(p["bus_width"]/2, p["bus_height"]/2, (p["bus_length"] - p["cyl_length"])/2))
     return cyl_shell
 
-def create_bulkheads():
-    front = Part.makeCylinder(bulkhead_diam/2, bulkhead_thickness)
+def create_bulkheads(p):
+    front = Part.makeCylinder(p["bulkhead_diam"]/2, p["bulkhead_thickness"])
     rear = front.copy()
-    front.translate(App.Vector(bus_width/2, bus_height/2, (bus_length - cyl_length)/2))
-    rear.translate(App.Vector(bus_width/2, bus_height/2, (bus_length + cyl_length)/2 - bulkhead_thickness))
+    front.translate(App.Vector(p["bus_width"]/2, p["bus_height"]/2, (p["bus_length"] - p["cyl_length"])/2))
+    rear.translate(App.Vector(p["bus_width"]/2, p["bus_height"]/2, (p["bus_length"] + p["cyl_length"])/2 - p["bulkhead_thickness"]))
     return front, rear
 
-def create_thruster():
+def coils(p):
+    # Bobinas para coil_field.py (mismas cotas que el toro del CAD)
+    center = (p["bus_width"]/2, p["bus_height"]/2, p["bus_length"] + p["thruster_can_length"]/2)
+    return [coil_field.coil(center, p["coil_axis"], p["coil_major_radius"], p["coil_minor_radius"], p["coil_NI"])]
+
+@cached_builder
+def thruster_shape(cx, cy, z0, can_d, can_L, exit_d, nozzle_L, flange_d, flange_t,
+                   coil_R, coil_r, coil_axis):
     # Cámara de plasma
-    chamber = Part.makeCylinder(thruster_can_diam/2, thruster_can_length,
-                                App.Vector(bus_width/2, bus_height/2, bus_length))
+    chamber = Part.makeCylinder(can_d/2, can_L, App.Vector(cx, cy, z0))
     # Tobera
-    nozzle = Part.makeCone(thruster_can_diam/2, nozzle_exit_diam/2, nozzle_length,
-                           App.Vector(bus_width/2, bus_height/2, bus_length + thruster_can_length))
+    nozzle = Part.makeCone(can_d/2, exit_d/2, nozzle_L, App.Vector(cx, cy, z0 + can_L))
     # Brida
-    flange = Part.makeCylinder(thruster_flange_diam/2, thruster_flange_thickness,
-                               App.Vector(bus_width/2, bus_height/2, bus_length - thruster_flange_thickness))
+    flange = Part.makeCylinder(flange_d/2, flange_t, App.Vector(cx, cy, z0 - flange_t))
     # Bobina magnética
-    coil = Part.makeTorus(coil_major_radius, coil_minor_radius,
-                          App.Vector(bus_width/2, bus_height/2, bus_length + thruster_can_length/2),
-                          App.Vector(1, 0, 0))
-    return chamber.fuse([nozzle, flange, coil])
-
-def create_support_plate():
-    plate = Part.makeBox(5, bus_height - 20, bus_height - 20,
-                         App.Vector(bus_width - 5, 10, 10))
+    coil = lod.torus(coil_R, coil_r, App.Vector(cx, cy, z0 + can_L/2),
+                     App.Vector(*coil_field.axis_vector(coil_axis)))
+    return fuse_all([chamber, nozzle, flange, coil])
+
+def create_thruster(p):
+    return thruster_shape(p["bus_width"]/2, p["bus_height"]/2, p["bus_length"],
+                          p["thruster_can_diam"], p["thruster_can_length"],
+                          p["nozzle_exit_diam"], p["nozzle_length"],
+                          p["thruster_flange_diam"], p["thruster_flange_thickness"],
+                          p["coil_major_radius"], p["coil_minor_radius"], p["coil_axis"])
+
+def create_support_plate(p):
+    plate = Part.makeBox(5, p["bus_height"] - 20, p["bus_height"] - 20,
+                         App.Vector(p["bus_width"] - 5, 10, 10))
     return plate
 
 # ------------------------------
 # 2. Ensamblaje
 # ------------------------------
-bus_shell = create_bus()
-central_cyl = create_central_cylinder()
-bulk_front, bulk_rear = create_bulkheads()
-thruster = create_thruster()
-support_plate = create_support_plate()
+def build(doc, params=None):
+    p = resolve_params(params)
+    with prof.section("Bus"):
+        bus_shell = create_bus(p, fillets.get_mode())
+    with prof.section("Cilindro central y bulkheads"):
+        central_cyl = create_central_cylinder(p)
+        bulk_front, bulk_rear = create_bulkheads(p)
+    with prof.section("Thruster"):
+        thruster = create_thruster(p)
+    with prof.section("Placa soporte"):
+        support_plate = create_support_plate(p)
+
+    with prof.section("Ensamblaje"):
+        assembly = fuse_all([bus_shell, central_cyl, bulk_front, bulk_rear, thruster, support_plate])
+    obj = docless.add(doc, assembly, "CubeSat_IonThruster")
+    return obj, {obj.Name: obj}
 
-assembly = bus_shell.fuse([central_cyl, bulk_front, bulk_rear, thruster, support_plate])
+def main():
+    doc = App.ActiveDocument
+    if doc is None or doc.Name != DOC_NAME:
+        doc = App.newDocument(DOC_NAME)
+    _, objs = build(doc)
+    prof.recompute(doc)
+    Gui = headless.gui()
+    if Gui:
+        lod.apply_view(objs.values())
+        Gui.ActiveDocument.ActiveView.fitAll()
+    print(default_cache().report())
 
-Part.show(assembly)
-doc.recompute()
-Gui.ActiveDocument.ActiveView.fitAll()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Dispersión Monte Carlo de masa y CG de NaveFusion (Measurements_automation.py).
+#
+# Cada clave de P leída por una pieza se muestrea dentro de la tolerancia TOL
+# de esa pieza (la más estrecha si la leen varias); los factores efectivos de
+# MAT_MAP (porosidad/mezcla) se muestrean con una dispersión relativa. Masa,
+# CG y masa húmeda salen del modelo analítico (analytic_mass) vectorizado, por
+# bloques y en procesos: 10^6 muestras en segundos.
+# Solo las muestras de la cola peor (según --worst) se reconstruyen con la
+# geometría real (param_sweep.run_sweep) para contrastar el modelo analítico.
+#
+#   python dispersion.py -n 1000000 -j 8
+#   python dispersion.py -n 200000 --dist uniform --factor-sigma 0.03 --worst cg_offset --verify 5
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_registry import load_model
+from param_graph import DependencyGraph
+
+MODEL = "navefusion"
+PERCENTILES = (0.1, 1.0, 5.0, 50.0, 95.0, 99.0, 99.9)
+METRICS = ("dry_kg", "wet_kg", "cg_x_mm", "cg_y_mm", "cg_z_mm", "wet_cg_x_mm", "cg_offset_mm")
+
+# -----------------------------
+# Tolerancias por clave de P
+# -----------------------------
+def key_tolerances(model):
+    # {clave de P: tolerancia [mm]} a partir de las piezas que la leen
+    graph = DependencyGraph()
+    p = model.resolve_params()
+    for name, _, _, _, _ in model.PARTS:
+        graph.run(name, model.ANALYTIC[name], p)
+    tol_key = {name: tk for name, _, _, _, tk in model.PARTS}
+    out = {}
+    for key in sorted(set().union(*graph.deps.values())):
+        out[key] = min(model.TOL.get(tol_key[name], 1.0) for name in graph.readers(key))
+    return out
+
+# -----------------------------
+# Muestreo y evaluación (un bloque)
+# -----------------------------
+_model = None
+
+def _get_model():
+    global _model
+    if _model is None:
+        _model = load_model(MODEL)   # solo tablas y NumPy: no hace falta FreeCAD
+    return _model
+
+def sample(model, tols, n, rng, dist="normal", sigmas=3.0, factor_sigma=0.02, prop_sigma=0.0):
+    # Tolerancia = ±sigmas·σ (normal) o límites de una uniforme
+    p0 = model.resolve_params()
+    params = {}
+    for key, t in tols.items():
+        if dist == "uniform":
+            d = rng.uniform(-t, t, n)
+        else:
+            d = rng.normal(0.0, t / sigmas, n)
+        params[key] = p0[key] + d
+    factors = {}
+    for name, _, _, mat_key, _ in model.PARTS:
+        nominal = model.MAT_MAP.get(name, (mat_key, 1.0))[1]
+        factors[name] = nominal * (1.0 + rng.normal(0.0, factor_sigma, n)) if factor_sigma else np.full(n, nominal)
+    prop = model.EXTRA_MASS["Tanque_Propelente_kg"] * (1.0 + rng.normal(0.0, prop_sigma, n))
+    return params, factors, prop
+
+def evaluate(model, params, factors, prop):
+    res = model.analytic_mass(params, prop, factors, inertia=False)
+    dry, wet = res["dry"], res["wet"]
+    cg = dry["cg_mm"]
+    axis_z = model.P["BUS_H"] / 2.0
+    return {
+        "dry_kg": dry["mass_kg"],
+        "wet_kg": wet["mass_kg"],
+        "cg_x_mm": cg[..., 0],
+        "cg_y_mm": cg[..., 1],
+        "cg_z_mm": cg[..., 2],
+        "wet_cg_x_mm": wet["cg_mm"][..., 0],
+        "cg_offset_mm": np.hypot(cg[..., 1], cg[..., 2] - axis_z),   # fuera del eje de empuje
+    }
+
+def _run_block(seed, n, tols, opts, worst, tail):
+    # Devuelve las métricas del bloque (float32) y las `tail` muestras peores completas
+    model = _get_model()
+    rng = np.random.default_rng(seed)
+    params, factors, prop = sample(model, tols, n, rng, **opts)
+    out = evaluate(model, params, factors, prop)
+    metrics = np.column_stack([out[k] for k in METRICS]).astype(np.float32)
+    idx = np.argsort(out[worst])[::-1][:tail]
+    rows = []
+    for i in idx:
+        row = {k: float(v[i]) for k, v in params.items()}
+        row.update({f"factor.{k}": float(v[i]) for k, v in factors.items()})
+        row["propellant_kg"] = float(prop[i])
+        row.update({k: float(v[i]) for k, v in out.items()})
+        rows.append(row)
+    return metrics, rows
+
+# -----------------------------
+# Ejecución
+# -----------------------------
+def run(n=1_000_000, workers=None, seed=0, block=50_000, worst="wet_kg", tail=20, **opts):
+    t0 = time.perf_counter()
+    model = _get_model()
+    tols = key_tolerances(model)
+    sizes = [block] * (n // block) + ([n % block] if n % block else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))   # reproducible con cualquier -j
+    args = [(s, k, tols, opts, worst, tail) for s, k in zip(seeds, sizes)]
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(_run_block, *zip(*args)))
+    else:
+        results = [_run_block(*a) for a in args]
+    metrics = np.vstack([m for m, _ in results])
+    rows = sorted((r for _, rs in results for r in rs), key=lambda r: -r[worst])[:tail]
+
+    nominal = {k: float(np.asarray(v).ravel()[0]) for k, v in evaluate(
+        model, model.resolve_params(), None, model.EXTRA_MASS["Tanque_Propelente_kg"]).items()}
+    stats = {}
+    for j, key in enumerate(METRICS):
+        col = metrics[:, j].astype(float)
+        stats[key] = {
+            "nominal": nominal[key],
+            "mean": float(col.mean()),
+            "std": float(col.std()),
+            "min": float(col.min()),
+            "max": float(col.max()),
+            "percentiles": dict(zip((f"p{p:g}" for p in PERCENTILES), map(float, np.percentile(col, PERCENTILES)))),
+        }
+    return {"samples": n, "tolerances": tols, "options": dict(opts, worst=worst), "stats": stats,
+            "tail": rows, "wall_s": time.perf_counter() - t0, "metrics": metrics}
+
+def verify(rows, workers=None, freecad_lib=None):
+    # Geometría real de la cola: masa del volumen OCC construido (factores
+    # nominales) frente a la analítica; TotalGeomMass_kg es la propia analítica
+    import param_sweep
+    model = _get_model()
+    variants = [{k: row[k] for k in model.P if k in row} for row in rows]
+    built = param_sweep.run_sweep(variants, workers=workers, freecad_lib=freecad_lib)
+    for row, variant, b in zip(rows, variants, built):
+        row["build_status"] = b["status"]
+        if b["status"] == "ok":
+            analytic = float(np.asarray(model.analytic_mass(variant)["dry"]["mass_kg"]))
+            row["occ_dry_kg"] = b["TotalOccMass_kg"]
+            row["analytic_err"] = analytic / b["TotalOccMass_kg"] - 1.0
+    return rows
+
+def format_report(result):
+    lines = [f"{result['samples']} muestras en {result['wall_s']:.2f} s "
+             f"({len(result['tolerances'])} cotas con tolerancia, distribución {result['options']['dist']})"]
+    for key, st in result["stats"].items():
+        pc = st["percentiles"]
+        lines.append(f"  {key:<13} nominal {st['nominal']:12.2f}  media {st['mean']:12.2f}  σ {st['std']:9.3f}  "
+                     f"p1 {pc['p1']:12.2f}  p50 {pc['p50']:12.2f}  p99 {pc['p99']:12.2f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Dispersión Monte Carlo de masa y CG (TOL / MAT_MAP)")
+    ap.add_argument("-n", "--samples", type=int, default=1_000_000)
+    ap.add_argument("-j", "--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dist", choices=("normal", "uniform"), default="normal")
+    ap.add_argument("--sigmas", type=float, default=3.0, help="la tolerancia equivale a ±sigmas·σ (normal)")
+    ap.add_argument("--factor-sigma", type=float, default=0.02, help="dispersión relativa de los factores de MAT_MAP")
+    ap.add_argument("--prop-sigma", type=float, default=0.0, help="dispersión relativa de la carga de propelente")
+    ap.add_argument("--worst", choices=METRICS, default="wet_kg", help="métrica que define la cola peor (mayor = peor)")
+    ap.add_argument("--tail", type=int, default=20, help="muestras de la cola que se conservan")
+    ap.add_argument("--verify", type=int, default=0, metavar="K", help="reconstruye en FreeCAD las K peores")
+    ap.add_argument("--freecad-lib", default=None)
+    ap.add_argument("-o", "--output", default=None, help="JSON con estadísticas y cola")
+    ap.add_argument("--samples-out", default=None, metavar="NPY", help="guarda todas las métricas (float32)")
+    args = ap.parse_args(argv)
+
+    result = run(args.samples, args.workers, args.seed, worst=args.worst, tail=args.tail, dist=args.dist,
+                 sigmas=args.sigmas, factor_sigma=args.factor_sigma, prop_sigma=args.prop_sigma)
+    print(format_report(result))
+    if args.verify:
+        for row in verify(result["tail"][:args.verify], args.workers, args.freecad_lib):
+            err = f"{row['analytic_err']:+.3%}" if "analytic_err" in row else row["build_status"]
+            print(f"  cola: {args.worst} {row[args.worst]:.2f}, error analítico {err}")
+    if args.samples_out:
+        np.save(args.samples_out, result["metrics"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in result.items() if k != "metrics"}, f, indent=2)
+        print(f"Resultados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
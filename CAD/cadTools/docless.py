@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Construcción sin documento.
+#
+# Los modelos aceptan build(None, params): los constructores devuelven formas
+# Part.Shape ya colocadas y, en lugar de Part::Feature, cada componente final
+# es un Component (Name, Label, Shape, Placement y propiedades dinámicas con
+# addProperty/PropertiesList, así que set_prop() y summarize() no cambian).
+# Sin documento no hay addObject, recompute, propiedades del documento ni
+# pila de deshacer por pieza, y los modelos se construyen en procesos de
+# trabajo sin documento (param_sweep.py). Con build(doc) los objetos del
+# documento se crean solo para los componentes finales.
+#
+#   root, objs = model.build(None, params)      # formas, sin documento
+#   python run_model.py cubesat2u --no-doc -o cubesat.step
+
+import os
+
+import profiling
+
+class Component:
+    # Sustituto ligero de un Part::Feature
+    TypeId = "Part::Feature"
+
+    def __init__(self, name, shape=None):
+        self.Name = self.Label = name
+        self.Shape = shape
+        self._props = []
+
+    @property
+    def Placement(self):
+        return self.Shape.Placement
+
+    @Placement.setter
+    def Placement(self, placement):
+        self.Shape.Placement = placement
+
+    @property
+    def PropertiesList(self):
+        return ["Label", "Placement", "Shape"] + self._props
+
+    def addProperty(self, type_name, name, group="", doc=""):
+        if name not in self._props:
+            self._props.append(name)
+            setattr(self, name, None)
+        return self
+
+    def __repr__(self):
+        return f"<Component {self.Name}>"
+
+class Group(Component):
+    # Sustituto de App::Part / App::DocumentObjectGroup (sin forma propia)
+    def __init__(self, name, type_id="App::Part"):
+        super().__init__(name)
+        self.TypeId = type_id
+        self.Group = []
+
+    @property
+    def Placement(self):
+        import FreeCAD as App
+        return App.Placement()
+
+    def addObject(self, obj):
+        self.Group.append(obj)
+        return [obj]
+
+def is_component(obj):
+    return isinstance(obj, Component)
+
+def add(doc, shape, name):
+    # Part::Feature con documento; Component sin él
+    if doc is None:
+        return Component(name, shape)
+    return profiling.add_feature(doc, shape, name)
+
+def group(doc, type_id, name):
+    if doc is None:
+        return Group(name, type_id)
+    return doc.addObject(type_id, name)
+
+def placed(shape, placement):
+    # Copia con otra Placement que comparte la geometría (superficies) del prototipo
+    out = shape.copy(False)
+    out.Placement = placement
+    return out
+
+def shape_of(obj):
+    # Forma global (modificable sin tocar el objeto) de un Component, un
+    # Part::Feature o un App::Link
+    import Part
+    if isinstance(obj, Component):
+        return obj.Shape.copy(False)
+    if isinstance(obj, Part.Shape):
+        return obj
+    return Part.getShape(obj)
+
+def export(objs, path):
+    # Exporta Component y objetos del documento a STEP/IGES/BREP por su extensión
+    import Part
+    shape = Part.makeCompound([shape_of(o) for o in objs])
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".step", ".stp"):
+        shape.exportStep(path)
+    elif ext in (".iges", ".igs"):
+        shape.exportIges(path)
+    elif ext in (".brep", ".brp"):
+        shape.exportBrep(path)
+    else:
+        raise ValueError(f"Formato no soportado sin documento: {ext}")
+    return path
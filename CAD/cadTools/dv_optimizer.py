@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+# Optimización Δv frente a masa de NaveFusion (Measurements_automation.py).
+#
+# Variables: tanque (TANK_LEN, TANK_D), reactor (REACTOR_LEN), radiadores
+# (RAD_LEN, RAD_W) y carga de propelente. El bucle interior usa el sustituto
+# analítico de masas (analytic_mass, vectorizado y sin OCC) en procesos
+# paralelos con caché de resultados; la geometría completa solo se construye
+# para los candidatos finales del frente de Pareto (param_sweep.run_sweep).
+#
+# Δv por la ecuación del cohete con los dos modos del README:
+#   "pulse"   fusión pulsada + tobera magnética; se quema primero pulse_frac del propelente
+#   "cruise"  propulsión eléctrica (iónica/Hall) con el resto
+# Restricciones: capacidad del tanque, potencia eléctrica mínima del reactor,
+# calor residual <= capacidad de los radiadores y encaje en FUSION_LEN.
+#
+#   python dv_optimizer.py --samples 20000 --rounds 4 -j 8 -o frente.csv
+#   python dv_optimizer.py --isp-cruise 3500 --isp-pulse 15000 --verify 5 -o frente.csv
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import radiator_sizing
+from model_registry import load_model
+
+MODEL = "navefusion"
+G0 = 9.80665
+
+# Variables de diseño: (mín, máx, paso de cuantización). El paso fija la
+# resolución de la caché: dos diseños en la misma celda son el mismo diseño.
+BOUNDS = {
+    "TANK_LEN": (4000.0, 12000.0, 10.0),
+    "TANK_D": (600.0, 1400.0, 5.0),
+    "REACTOR_LEN": (1500.0, 3500.0, 10.0),
+    "RAD_LEN": (1000.0, 4000.0, 10.0),
+    "RAD_W": (400.0, 1200.0, 5.0),
+    "propellant_kg": (200.0, 8000.0, 5.0),
+}
+NAMES = tuple(BOUNDS)
+
+# Supuestos de misión y planta de potencia (sobrescribibles desde la CLI)
+MISSION = {
+    "isp_cruise_s": 3000.0,     # eléctrica (Xe/H2)
+    "isp_pulse_s": 12000.0,     # fusión pulsada
+    "pulse_frac": 0.3,          # fracción del propelente en modo pulsado
+    "payload_kg": 0.0,
+    "prop_density": 250.0,      # H2 en hidruros compactos [kg de H2 por m^3 de tanque]
+    "fill_max": 0.95,           # llenado útil del tanque
+    "reactor_kw_per_m": 100.0,  # potencia térmica por metro de reactor
+    "eta": 0.30,                # conversión a potencia eléctrica
+    "min_electric_kw": 60.0,
+    "rad_temp_K": 900.0,
+    "rad_emissivity": 0.85,
+}
+
+# -----------------------------
+# Modelo analítico (vectorizado)
+# -----------------------------
+def design_params(model, X):
+    # Columnas de X -> parámetros de P (la tobera sigue al final del tanque)
+    cols = dict(zip(NAMES, X.T))
+    params = {k: v for k, v in cols.items() if k in model.P}
+    params["X_NOZZLE_START"] = model.P["X_NOZZLE_START"] + (cols["TANK_LEN"] - model.P["TANK_LEN"])
+    return params, cols["propellant_kg"]
+
+def rocket_dv(m0, mp, isp_cruise, isp_pulse, pulse_frac):
+    # Δv [m/s] de cada modo: primero el pulsado, después el crucero
+    m1 = m0 - pulse_frac * mp
+    m2 = m1 - (1.0 - pulse_frac) * mp
+    return G0 * isp_pulse * np.log(m0 / m1), G0 * isp_cruise * np.log(m1 / m2)
+
+def evaluate(model, X, mission=None):
+    # X: (N, len(NAMES)) -> dict de arrays (N,)
+    m = dict(MISSION, **(mission or {}))
+    params, prop = design_params(model, X)
+    res = model.analytic_mass(params, prop, inertia=False)
+    names = res["names"]
+    tank_vol_m3 = np.pi * (params["TANK_D"] / 2e3) ** 2 * params["TANK_LEN"] / 1e3
+    dry = res["dry"]["mass_kg"]
+    wet = res["wet"]["mass_kg"] + m["payload_kg"]
+    dv_pulse, dv_cruise = rocket_dv(wet, prop, m["isp_cruise_s"], m["isp_pulse_s"], m["pulse_frac"])
+
+    thermal_kw = m["reactor_kw_per_m"] * params["REACTOR_LEN"] / 1e3
+    electric_kw = m["eta"] * thermal_kw
+    waste_kw = thermal_kw - electric_kw
+    rad_area = 2 * params["RAD_LEN"] * params["RAD_W"] / 1e6      # 2 radiadores de 2 caras [m^2]
+    fin_eff = model.resolve_params(params)["RAD_FIN_EFF"]
+    reject_kw = radiator_sizing.rejection(rad_area, m["rad_temp_K"], model.P["RAD_SINK_K"],
+                                          m["rad_emissivity"], fin_eff) / 1e3
+    fusion_len = model.P["FUSION_LEN"]
+    feasible = ((prop <= tank_vol_m3 * m["prop_density"] * m["fill_max"]) &
+                (electric_kw >= m["min_electric_kw"]) &
+                (reject_kw >= waste_kw) &
+                (params["REACTOR_LEN"] + 500.0 <= fusion_len) &
+                (params["RAD_LEN"] <= fusion_len))
+    return {
+        "dry_kg": dry,
+        "wet_kg": wet,
+        "dv_pulse_ms": dv_pulse,
+        "dv_cruise_ms": dv_cruise,
+        "dv_ms": dv_pulse + dv_cruise,
+        "electric_kw": electric_kw,
+        "waste_kw": waste_kw,
+        "reject_kw": reject_kw,
+        "tank_fill": prop / (tank_vol_m3 * m["prop_density"]),
+        "feasible": feasible,
+        "tank_dry_kg": res["dry"]["part_mass_kg"][..., names.index("Tanque")],
+    }
+
+METRICS = ("dry_kg", "wet_kg", "dv_pulse_ms", "dv_cruise_ms", "dv_ms", "electric_kw",
+           "waste_kw", "reject_kw", "tank_fill", "feasible", "tank_dry_kg")
+
+# -----------------------------
+# Evaluación paralela con caché
+# -----------------------------
+_model = None
+
+def _eval_chunk(X, mission):
+    global _model
+    if _model is None:
+        _model = load_model(MODEL)   # solo tablas y NumPy: no hace falta FreeCAD
+    out = evaluate(_model, X, mission)
+    return np.column_stack([np.asarray(out[k], dtype=float) for k in METRICS])
+
+def quantize(X):
+    lo = np.array([BOUNDS[n][0] for n in NAMES])
+    hi = np.array([BOUNDS[n][1] for n in NAMES])
+    step = np.array([BOUNDS[n][2] for n in NAMES])
+    return np.clip(np.round(X / step) * step, lo, hi)
+
+class Evaluator:
+    # Memoriza los resultados por diseño cuantizado; solo los nuevos se evalúan
+    # (por bloques en procesos si hay muchos)
+    def __init__(self, mission=None, workers=1, chunk=20000):
+        self.mission = dict(MISSION, **(mission or {}))
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk = chunk
+        self.memo = {}
+        self.hits = self.misses = 0
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _compute(self, X):
+        if self.workers <= 1 or len(X) <= self.chunk:
+            return _eval_chunk(X, self.mission)
+        if self._pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        parts = np.array_split(X, int(np.ceil(len(X) / self.chunk)))
+        return np.vstack(list(self._pool.map(_eval_chunk, parts, [self.mission] * len(parts))))
+
+    def __call__(self, X):
+        X = quantize(np.atleast_2d(X))
+        keys = [tuple(row) for row in X]
+        new = {k: i for i, k in enumerate(keys) if k not in self.memo}
+        self.misses += len(new)
+        self.hits += len(keys) - len(new)
+        if new:
+            Y = self._compute(X[list(new.values())])
+            self.memo.update(zip(new, Y))
+        return X, np.array([self.memo[k] for k in keys])
+
+    def save(self, path):
+        np.savez_compressed(path, X=np.array(list(self.memo)), Y=np.array(list(self.memo.values())),
+                            mission=np.array(sorted(self.mission.items()), dtype=object))
+
+    def load(self, path):
+        # Solo se reutiliza una caché calculada con los mismos supuestos de misión
+        if not os.path.isfile(path):
+            return 0
+        data = np.load(path, allow_pickle=True)
+        if dict((k, float(v)) for k, v in data["mission"]) != self.mission or data["Y"].shape[-1] != len(METRICS):
+            return 0
+        self.memo.update(zip(map(tuple, data["X"]), data["Y"]))
+        return len(data["X"])
+
+# -----------------------------
+# Muestreo y frente de Pareto
+# -----------------------------
+def latin_hypercube(n, rng):
+    lo = np.array([BOUNDS[k][0] for k in NAMES])
+    hi = np.array([BOUNDS[k][1] for k in NAMES])
+    u = (np.argsort(rng.random((len(NAMES), n)), axis=1).T + rng.random((n, len(NAMES)))) / n
+    return lo + u * (hi - lo)
+
+def perturb(X, n, rng, sigma=0.05):
+    # Vecinos de los diseños del frente (sigma relativo al rango de cada variable)
+    lo = np.array([BOUNDS[k][0] for k in NAMES])
+    hi = np.array([BOUNDS[k][1] for k in NAMES])
+    base = X[rng.integers(0, len(X), n)]
+    return np.clip(base + rng.normal(0.0, sigma, base.shape) * (hi - lo), lo, hi)
+
+def pareto_front(mass, dv, feasible):
+    # Índices no dominados (menos masa, más Δv), ordenados por masa
+    idx = np.flatnonzero(feasible)
+    idx = idx[np.lexsort((-dv[idx], mass[idx]))]
+    best = np.maximum.accumulate(dv[idx])
+    keep = np.r_[True, dv[idx][1:] > best[:-1]]
+    return idx[keep]
+
+def optimize(samples=20000, rounds=3, mission=None, workers=1, seed=0, cache=None, progress=None):
+    rng = np.random.default_rng(seed)
+    with Evaluator(mission, workers) as ev:
+        if cache:
+            ev.load(cache)
+        X, Y = ev(latin_hypercube(samples, rng))
+        for r in range(rounds):
+            col = {k: Y[:, i] for i, k in enumerate(METRICS)}
+            front = pareto_front(col["wet_kg"], col["dv_ms"], col["feasible"] > 0)
+            if progress:
+                progress(r, len(X), len(front), ev)
+            if not len(front):
+                fresh = latin_hypercube(samples, rng)
+            else:
+                fresh = np.vstack([perturb(X[front], samples * 4 // 5, rng, 0.05 / (r + 1)),
+                                   latin_hypercube(samples // 5, rng)])
+            Xn, Yn = ev(fresh)
+            X, Y = np.vstack([X, Xn]), np.vstack([Y, Yn])
+        X, first = np.unique(X, axis=0, return_index=True)
+        Y = Y[first]
+        if cache:
+            ev.save(cache)
+        col = {k: Y[:, i] for i, k in enumerate(METRICS)}
+        front = pareto_front(col["wet_kg"], col["dv_ms"], col["feasible"] > 0)
+        stats = {"evaluated": len(ev.memo), "hits": ev.hits, "misses": ev.misses}
+    return X, Y, front, stats
+
+def rows_of(X, Y, idx):
+    rows = []
+    for rank, i in enumerate(idx):
+        row = {"rank": rank}
+        row.update(zip(NAMES, (float(v) for v in X[i])))
+        row.update(zip(METRICS, (float(v) for v in Y[i])))
+        row["feasible"] = bool(row["feasible"])
+        rows.append(row)
+    return rows
+
+def pick(front_rows, k):
+    # k candidatos repartidos a lo largo del frente (extremos incluidos)
+    if k >= len(front_rows):
+        return list(front_rows)
+    return [front_rows[int(round(i))] for i in np.linspace(0, len(front_rows) - 1, k)]
+
+def verify(rows, workers=None, freecad_lib=None):
+    # Geometría completa (FreeCAD) de los candidatos finales; compara la masa
+    # seca OCC (volumen de la geometría construida) con la del sustituto analítico
+    import param_sweep
+    model = load_model(MODEL)
+    variants = []
+    for row in rows:
+        X = np.array([[row[n] for n in NAMES]])
+        params, _ = design_params(model, X)
+        variants.append({k: float(v[0]) for k, v in params.items()})
+    built = param_sweep.run_sweep(variants, workers=workers, freecad_lib=freecad_lib)
+    for row, b in zip(rows, built):
+        row["build_status"] = b["status"]
+        if b["status"] == "ok":
+            row["occ_dry_kg"] = b["TotalOccMass_kg"]
+            row["surrogate_err"] = row["dry_kg"] / b["TotalOccMass_kg"] - 1.0
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Optimización Δv frente a masa de NaveFusion (frente de Pareto)")
+    ap.add_argument("--samples", type=int, default=20000, help="diseños por ronda")
+    ap.add_argument("--rounds", type=int, default=3, help="rondas de refinado alrededor del frente")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--seed", type=int, default=0)
+    for key, value in MISSION.items():
+        ap.add_argument("--" + key.removesuffix("_s").replace("_", "-"), dest=key, type=float, default=value)
+    ap.add_argument("--cache", default=None, metavar="NPZ", help="caché persistente de evaluaciones")
+    ap.add_argument("--verify", type=int, default=0, metavar="K", help="construye en FreeCAD K candidatos del frente")
+    ap.add_argument("--freecad-lib", default=None)
+    ap.add_argument("-o", "--output", default="pareto_front.csv")
+    args = ap.parse_args(argv)
+
+    mission = {k: getattr(args, k) for k in MISSION}
+    def progress(r, n, n_front, ev):
+        print(f"ronda {r}: {n} diseños, frente {n_front}, caché {ev.hits} aciertos / {ev.misses} evaluados",
+              file=sys.stderr)
+
+    t0 = time.perf_counter()
+    X, Y, front, stats = optimize(args.samples, args.rounds, mission, args.workers or os.cpu_count() or 1,
+                                  args.seed, args.cache, progress)
+    rows = rows_of(X, Y, front)
+    print(f"{stats['evaluated']} diseños evaluados en {time.perf_counter() - t0:.2f} s; frente de Pareto: {len(rows)}")
+    if args.verify and rows:
+        for row in verify(pick(rows, args.verify), args.workers, args.freecad_lib):
+            err = f"{row['surrogate_err']:+.2%}" if "surrogate_err" in row else row["build_status"]
+            print(f"  #{row['rank']}: Δv {row['dv_ms']:.0f} m/s, húmeda {row['wet_kg']:.0f} kg, error sustituto {err}")
+
+    import param_sweep
+    param_sweep.write_csv(rows, args.output)
+    print(f"Frente -> {args.output}")
+    return 0 if rows else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Exportación por componentes en paralelo.
+#
+# Cada componente (raíl, panel, PCB, tanque, propulsor...) se escribe en su
+# propio fichero STEP/BREP desde procesos de trabajo; el proceso principal solo
+# serializa la forma (BREP en texto) y recoge los resultados según terminan.
+# Resultado en la carpeta de salida:
+#   components/<nombre>.step   geometría local (sin Placement) de cada pieza
+#   assembly.json              ensamblado ligero: fichero + Placement por pieza
+#   manifest.json              sha256 de la geometría -> se omiten las piezas
+#                              que no han cambiado al volver a exportar
+# Las piezas con geometría idéntica (mismo sha256) comparten fichero.
+#
+#   python run_model.py cubesat2u --export-dir out/cubesat -j 4
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import docless
+import headless
+
+FORMATS = ("step", "brep")
+MANIFEST = "manifest.json"
+ASSEMBLY = "assembly.json"
+COMPONENT_DIR = "components"
+
+def _placement_dict(pl):
+    return {"base": [pl.Base.x, pl.Base.y, pl.Base.z], "rotation": list(pl.Rotation.Q)}
+
+def local_shape(obj):
+    # Forma sin Placement (la geometría compartida) + Placement del objeto;
+    # resuelve también los App::Link y los Component (docless.py)
+    shape = docless.shape_of(obj)
+    placement = shape.Placement
+    shape.Placement = type(placement)()
+    return shape, placement
+
+def _atomic_write_text(path, text):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def _load_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# -----------------------------
+# Trabajador
+# -----------------------------
+def _init_worker(freecad_lib):
+    headless.load_freecad(freecad_lib)
+
+def _write_component(brep, path, fmt):
+    # Escribe un componente desde su BREP en texto; devuelve (ruta, segundos)
+    t0 = time.perf_counter()
+    if fmt == "brep":
+        _atomic_write_text(path, brep)
+    else:
+        import Part
+        shape = Part.Shape()
+        shape.importBrepFromString(brep)
+        root, ext = os.path.splitext(path)
+        tmp = f"{root}.{os.getpid()}.tmp{ext}"
+        shape.exportStep(tmp)
+        os.replace(tmp, path)
+    return path, time.perf_counter() - t0
+
+# -----------------------------
+# Exportación
+# -----------------------------
+def export_components(objs, out_dir, fmt="step", workers=None, freecad_lib=None,
+                      model=None, force=False, progress=None):
+    # objs: {nombre: objeto con Shape}. Devuelve {"written", "skipped", "instances", "wall_s"}
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} (usa {', '.join(FORMATS)})")
+    t0 = time.perf_counter()
+    comp_dir = os.path.join(out_dir, COMPONENT_DIR)
+    os.makedirs(comp_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    old = {} if force else _load_json(manifest_path).get("files", {})
+
+    # Serialización y checksum (proceso principal)
+    entries, jobs = [], {}
+    for name, obj in objs.items():
+        shape, placement = local_shape(obj)
+        brep = shape.exportBrepToString()
+        digest = hashlib.sha256(brep.encode("utf-8")).hexdigest()
+        entries.append({"name": name, "sha256": digest, "placement": _placement_dict(placement)})
+        if digest not in jobs:
+            jobs[digest] = (name, brep)
+
+    done, pending = {}, []
+    for digest, (name, brep) in jobs.items():
+        prev = old.get(digest)
+        if prev and os.path.isfile(os.path.join(out_dir, *prev["file"].split("/"))):
+            done[digest] = prev   # sin cambios: se reutiliza el fichero
+    reused = {f["file"] for f in done.values()}
+    for digest, (name, brep) in jobs.items():
+        if digest in done:
+            continue
+        rel = f"{COMPONENT_DIR}/{name}.{fmt}"
+        if rel in reused:   # no pisar un fichero que otra pieza sigue usando
+            rel = f"{COMPONENT_DIR}/{name}_{digest[:8]}.{fmt}"
+        pending.append((digest, rel, brep))
+
+    def _done(digest, rel, secs):
+        # El manifiesto solo lista ficheros ya escritos (exportación reanudable)
+        path = os.path.join(out_dir, *rel.split("/"))
+        done[digest] = {"file": rel, "format": fmt, "bytes": os.path.getsize(path), "export_s": secs}
+        _atomic_write_text(manifest_path, json.dumps({"files": done}, indent=2))
+        if progress:
+            progress(os.path.basename(path), secs)
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers > 1 and fmt == "step":
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(freecad_lib,)) as pool:
+            futures = {pool.submit(_write_component, brep, os.path.join(out_dir, *rel.split("/")), fmt): (digest, rel)
+                       for digest, rel, brep in pending}
+            for fut in as_completed(futures):
+                _, secs = fut.result()
+                _done(*futures[fut], secs)
+    else:
+        for digest, rel, brep in pending:
+            _, secs = _write_component(brep, os.path.join(out_dir, *rel.split("/")), fmt)
+            _done(digest, rel, secs)
+
+    # Manifiesto final (sin entradas de piezas que ya no existen)
+    files = {d: f for d, f in done.items() if d in jobs}
+    _atomic_write_text(manifest_path, json.dumps({"files": files}, indent=2))
+    assembly = {
+        "model": model,
+        "format": fmt,
+        "components": [dict(e, file=files[e["sha256"]]["file"]) for e in entries],
+    }
+    _atomic_write_text(os.path.join(out_dir, ASSEMBLY), json.dumps(assembly, indent=2))
+    return {
+        "written": len(pending),
+        "skipped": len(jobs) - len(pending),
+        "instances": len(entries),
+        "wall_s": time.perf_counter() - t0,
+    }
+
+def load_assembly(out_dir, doc=None):
+    # Reconstruye el ensamblado en un documento (una lectura por fichero)
+    import FreeCAD as App
+    import Part
+    with open(os.path.join(out_dir, ASSEMBLY), encoding="utf-8") as f:
+        assembly = json.load(f)
+    doc = doc or App.newDocument(assembly.get("model") or "Assembly")
+    shapes, objs = {}, {}
+    for comp in assembly["components"]:
+        rel = comp["file"]
+        if rel not in shapes:
+            shapes[rel] = Part.read(os.path.join(out_dir, *rel.split("/")))
+        obj = doc.addObject("Part::Feature", comp["name"])
+        obj.Shape = shapes[rel]
+        pl = comp["placement"]
+        obj.Placement = App.Placement(App.Vector(*pl["base"]), App.Rotation(*pl["rotation"]))
+        objs[comp["name"]] = obj
+    doc.recompute()
+    return doc, objs
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Redondeos selectivos: en lugar de makeFillet(r, shape.Edges) sobre todas las
+# aristas (lento y frágil cuando la pared se acerca al radio), se eligen las
+# aristas por regla:
+#   "all"     todas (comportamiento original y valor por defecto)
+#   "outer"   solo las de la piel exterior (no la cavidad interior)
+#   "convex"  solo aristas convexas (ángulo sólido < 180°)
+#   "axis"    rectas paralelas a un eje (axis="X"|"Y"|"Z")
+#   "region"  contenidas en una caja (region=(xmin, ymin, zmin, xmax, ymax, zmax))
+# Varias reglas se combinan por intersección: "outer+axis" o ("outer", "axis").
+#
+# Modo global (FILLET_MODE o set_mode / draft(); "none" siempre con LOD preview):
+#   "full"     makeFillet
+#   "chamfer"  makeChamfer (más rápido; vista previa y barridos)
+#   "none"     sin redondeo
+# Si makeFillet falla se intenta chamfer y, si también falla, se deja sin redondear.
+# Las degradaciones se cuentan (fallback_counts) en lugar de imprimirse en cada
+# pieza, para no inundar la salida de los barridos.
+
+import os
+from contextlib import contextmanager
+
+import lod
+import profiling
+
+MODES = ("full", "chamfer", "none")
+RULES = ("all", "outer", "convex", "axis", "region")
+
+_mode = os.environ.get("FILLET_MODE", "full").lower()
+_fallbacks = {"chamfer": 0, "none": 0, "last_error": None}
+
+def get_mode():
+    # En LOD "preview" nunca se redondea
+    return "none" if lod.is_preview() else _mode
+
+def set_mode(mode):
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Modo de redondeo desconocido: {mode} (usa {', '.join(MODES)})")
+    _mode = mode
+
+@contextmanager
+def draft(mode="none"):
+    # with fillets.draft(): ...  -> redondeos baratos durante el bloque
+    prev = _mode
+    set_mode(mode)
+    try:
+        yield
+    finally:
+        set_mode(prev)
+
+def fallback_counts():
+    # {"chamfer": n, "none": n, "last_error": texto}: redondeos degradados desde el último reset
+    return dict(_fallbacks)
+
+def reset_fallbacks():
+    _fallbacks.update(chamfer=0, none=0, last_error=None)
+
+def fallback_report():
+    # Resumen de una línea ("" si no hubo degradaciones)
+    f = _fallbacks
+    if not (f["chamfer"] or f["none"]):
+        return ""
+    return (f"Redondeos degradados: {f['chamfer']} a chamfer, {f['none']} sin redondeo "
+            f"(último error: {f['last_error']})")
+
+# -----------------------------
+# Selección de aristas
+# -----------------------------
+def _outer(shape, edges):
+    outer = [e for solid in shape.Solids for e in solid.OuterShell.Edges]
+    return [e for e in edges if any(e.isSame(o) for o in outer)]
+
+def _is_convex(shape, edge, eps):
+    # Convexa si el punto mid + eps*(n1 - n2) queda fuera del sólido
+    import Part
+    faces = shape.ancestorsOfType(edge, Part.Face)
+    if len(faces) != 2:
+        return False
+    mid = edge.valueAt(0.5 * (edge.FirstParameter + edge.LastParameter))
+    n1, n2 = (f.normalAt(*f.Surface.parameter(mid)) for f in faces)
+    d = n1 - n2
+    if d.Length < 1e-6:
+        return False  # arista tangente (sin canto vivo)
+    probe = mid + d.normalize() * eps
+    return not shape.isInside(probe, eps * 0.1, True)
+
+def _along_axis(edge, axis, tol=1e-6):
+    if len(edge.Vertexes) != 2 or not hasattr(edge.Curve, "Direction"):
+        return False  # solo rectas
+    d = edge.Vertexes[1].Point - edge.Vertexes[0].Point
+    if d.Length < tol:
+        return False
+    d.normalize()
+    i = "XYZ".index(axis.upper())
+    return abs(abs((d.x, d.y, d.z)[i]) - 1.0) < 1e-6
+
+def _in_region(edge, region):
+    xmin, ymin, zmin, xmax, ymax, zmax = region
+    bb = edge.BoundBox
+    return (bb.XMin >= xmin and bb.YMin >= ymin and bb.ZMin >= zmin and
+            bb.XMax <= xmax and bb.YMax <= ymax and bb.ZMax <= zmax)
+
+def select_edges(shape, rule="all", axis="Z", region=None, eps=None):
+    # rule: nombre, "outer+axis" o tupla de nombres (intersección)
+    rules = tuple(rule.split("+")) if isinstance(rule, str) else tuple(rule)
+    edges = list(shape.Edges)
+    for r in rules:
+        if r == "all":
+            continue
+        if r == "outer":
+            edges = _outer(shape, edges)
+        elif r == "convex":
+            step = eps or max(shape.BoundBox.DiagonalLength * 1e-5, 1e-4)
+            edges = [e for e in edges if _is_convex(shape, e, step)]
+        elif r == "axis":
+            edges = [e for e in edges if _along_axis(e, axis)]
+        elif r == "region":
+            if region is None:
+                raise ValueError("La regla 'region' necesita region=(xmin, ymin, zmin, xmax, ymax, zmax)")
+            edges = [e for e in edges if _in_region(e, region)]
+        else:
+            raise ValueError(f"Regla de aristas desconocida: {r} (usa {', '.join(RULES)})")
+    return edges
+
+# -----------------------------
+# Redondeo
+# -----------------------------
+def fillet(shape, radius, rule="all", mode=None, **select):
+    # Redondea las aristas elegidas por rule según el modo (global por defecto)
+    mode = mode or get_mode()
+    if mode == "none" or radius <= 0:
+        return shape
+    edges = select_edges(shape, rule, **select)
+    if not edges:
+        return shape
+    if mode == "full":
+        try:
+            return profiling.fillet(shape, radius, edges)
+        except Exception as exc:
+            _fallbacks["chamfer"] += 1
+            _fallbacks["last_error"] = f"fillet r={radius}: {exc}"
+    try:
+        return profiling.timed_call("fillet", "makeChamfer", shape.makeChamfer, radius, edges)
+    except Exception as exc:
+        _fallbacks["none"] += 1
+        _fallbacks["last_error"] = f"chamfer r={radius}: {exc}"
+        return shape
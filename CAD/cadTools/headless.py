@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Carga de FreeCAD sin GUI (python normal o freecadcmd) para scripts por lotes.
+# La ruta a la librería de FreeCAD se toma de FREECAD_LIB o de rutas habituales.
+
+import os
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DESIGN_DIR = os.path.join(TOOLS_DIR, "design")
+
+FREECAD_LIB_ENV = "FREECAD_LIB"
+
+LIB_CANDIDATES = (
+    "/usr/lib/freecad/lib",
+    "/usr/lib/freecad-python3/lib",
+    "/usr/local/lib/freecad/lib",
+    "/usr/local/lib",
+    "/Applications/FreeCAD.app/Contents/Resources/lib",
+    r"C:\Program Files\FreeCAD 1.0\bin",
+    r"C:\Program Files\FreeCAD 0.21\bin",
+)
+
+def _add_path(path):
+    if path and os.path.isdir(path) and path not in sys.path:
+        sys.path.append(path)
+
+def load_freecad(lib_path=None):
+    # Devuelve el módulo FreeCAD; añade la ruta de la librería si hace falta
+    try:
+        import FreeCAD
+        return FreeCAD
+    except ImportError:
+        pass
+    for path in (lib_path, os.environ.get(FREECAD_LIB_ENV)) + LIB_CANDIDATES:
+        _add_path(path)
+        try:
+            import FreeCAD
+            return FreeCAD
+        except ImportError:
+            continue
+    raise ImportError(
+        f"No se encontró FreeCAD. Indica la carpeta lib con --freecad-lib o {FREECAD_LIB_ENV}."
+    )
+
+def use_design_dir():
+    # Permite 'import Measurements_automation' y el resto de macros de design/
+    if DESIGN_DIR not in sys.path:
+        sys.path.insert(0, DESIGN_DIR)
+
+def gui_available():
+    # True solo con la GUI de FreeCAD en marcha (no en freecadcmd)
+    try:
+        import FreeCAD
+    except ImportError:
+        return False
+    return bool(getattr(FreeCAD, "GuiUp", False))
+
+def gui():
+    # Import perezoso de FreeCADGui; None en modo consola/lotes
+    if not gui_available():
+        return None
+    import FreeCADGui
+    return FreeCADGui
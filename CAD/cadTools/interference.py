@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# Comprobación de interferencias y holguras entre las piezas de un modelo.
+#
+# Fase amplia: cajas AABB (NumPy) ampliadas con la holgura de cada pieza y
+# barrido por X (sweep and prune); solo los pares cuyas cajas se solapan pasan
+# a la fase exacta. Fase exacta (OCC, en procesos): volumen de common() y
+# distToShape() por par candidato.
+#
+# Holgura requerida de un par = tolerancia(a) + tolerancia(b), tomada de la
+# propiedad Tolerance_mm de la pieza o del dict TOL del modelo.
+# Resultado por par:
+#   "collision"  volumen común > vol_eps
+#   "contact"    se tocan sin volumen común y se pedía holgura
+#   "clearance"  separadas menos que la holgura requerida
+#
+#   python run_model.py navefusion --check -j 4
+
+import fnmatch
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import docless
+import headless
+
+KINDS = ("collision", "contact", "clearance")
+
+# -----------------------------
+# Piezas
+# -----------------------------
+def tolerance_of(name, obj=None, tol=None, default=0.0):
+    # Tolerance_mm de la pieza, TOL[nombre] o TOL[prefijo] ("Radiador_L" -> "Radiador")
+    value = getattr(obj, "Tolerance_mm", None)
+    if value is not None:
+        return float(value)
+    tol = tol or {}
+    if name in tol:
+        return float(tol[name])
+    return float(tol.get(name.split("_")[0], default))
+
+def collect(objs, tol=None, default=0.0):
+    # objs: {nombre: objeto o Component} o documento -> [(nombre, forma, tolerancia)] solo con sólidos
+    if hasattr(objs, "Objects"):
+        objs = {o.Name: o for o in objs.Objects if hasattr(o, "Shape")}
+    items = []
+    for name, obj in objs.items():
+        shape = docless.shape_of(obj)
+        if shape.isNull() or not shape.Solids:
+            continue
+        items.append((name, shape, tolerance_of(name, obj, tol, default)))
+    return items
+
+def _is_mate(a, b, mates):
+    for pa, pb in mates:
+        if ((fnmatch.fnmatchcase(a, pa) and fnmatch.fnmatchcase(b, pb)) or
+                (fnmatch.fnmatchcase(a, pb) and fnmatch.fnmatchcase(b, pa))):
+            return True
+    return False
+
+# -----------------------------
+# Fase amplia
+# -----------------------------
+def bounds(shapes):
+    # (N, 6): xmin, ymin, zmin, xmax, ymax, zmax
+    out = np.empty((len(shapes), 6))
+    for i, s in enumerate(shapes):
+        bb = s.BoundBox
+        out[i] = (bb.XMin, bb.YMin, bb.ZMin, bb.XMax, bb.YMax, bb.ZMax)
+    return out
+
+def candidate_pairs(boxes, margin=None):
+    # Pares (i, j), i < j, cuyas cajas ampliadas con margin[i] se solapan.
+    # Orden por xmin y búsqueda binaria del final de cada ventana:
+    # O(n log n + pares candidatos) en lugar de todos contra todos
+    boxes = np.asarray(boxes, dtype=float)
+    n = len(boxes)
+    if n < 2:
+        return np.empty((0, 2), dtype=int)
+    m = np.zeros(n) if margin is None else np.asarray(margin, dtype=float)
+    lo = boxes[:, :3] - m[:, None]
+    hi = boxes[:, 3:] + m[:, None]
+    order = np.argsort(lo[:, 0], kind="stable")
+    lo, hi = lo[order], hi[order]
+    ends = np.searchsorted(lo[:, 0], hi[:, 0], side="right")
+    pairs = []
+    for i in range(n - 1):
+        j = np.arange(i + 1, ends[i])
+        if not len(j):
+            continue
+        hit = np.all((lo[j, 1:] <= hi[i, 1:]) & (lo[i, 1:] <= hi[j, 1:]), axis=1)
+        if hit.any():
+            pairs.append(np.column_stack([np.full(hit.sum(), i), j[hit]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=int)
+    pairs = order[np.vstack(pairs)]
+    return np.sort(pairs, axis=1)
+
+# -----------------------------
+# Fase exacta
+# -----------------------------
+_shapes = {}
+
+def _init_worker(freecad_lib):
+    headless.load_freecad(freecad_lib)
+
+def _shape(key, brep):
+    # Cada proceso importa cada pieza una sola vez
+    shape = _shapes.get(key)
+    if shape is None:
+        import Part
+        shape = Part.Shape()
+        shape.importBrepFromString(brep)
+        _shapes[key] = shape
+    return shape
+
+def _exact(a, b, boxes_overlap, vol_eps):
+    # (volumen común, distancia mínima)
+    vol = a.common(b).Volume if boxes_overlap else 0.0
+    if vol > vol_eps:
+        return vol, 0.0
+    return vol, a.distToShape(b)[0]
+
+def _check_chunk(jobs, breps, vol_eps):
+    # jobs: [(i, j, cajas solapadas)]; breps: {índice: BREP en texto}
+    return [(i, j) + _exact(_shape(i, breps[i]), _shape(j, breps[j]), ov, vol_eps) for i, j, ov in jobs]
+
+def _classify(vol, dist, required, vol_eps, dist_eps=1e-6):
+    if vol > vol_eps:
+        return "collision"
+    if required > 0 and dist <= dist_eps:
+        return "contact"
+    if dist < required - dist_eps:
+        return "clearance"
+    return None
+
+def check(objs, tol=None, default_tol=0.0, mates=(), workers=1, freecad_lib=None,
+          vol_eps=1e-3, chunk=64):
+    # Devuelve {"issues": [...], "parts", "candidates", "pairs_total", "wall_s"}
+    t0 = time.perf_counter()
+    items = collect(objs, tol, default_tol)
+    names = [n for n, _, _ in items]
+    shapes = [s for _, s, _ in items]
+    tols = np.array([t for _, _, t in items])
+    boxes = bounds(shapes)
+    pairs = [(i, j) for i, j in candidate_pairs(boxes, tols)
+             if not _is_mate(names[i], names[j], mates)]
+    raw = boxes[:, :3], boxes[:, 3:]
+    jobs = [(i, j, bool(np.all((raw[0][i] <= raw[1][j]) & (raw[0][j] <= raw[1][i])))) for i, j in pairs]
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs) // chunk))
+    results = []
+    if workers > 1:
+        # Cada bloque lleva solo los BREP de sus piezas
+        brep = {}
+        blocks = [jobs[k:k + chunk] for k in range(0, len(jobs), chunk)]
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(freecad_lib,)) as pool:
+            futures = []
+            for block in blocks:
+                idx = {k for i, j, _ in block for k in (i, j)}
+                for k in idx:
+                    if k not in brep:
+                        brep[k] = shapes[k].exportBrepToString()
+                futures.append(pool.submit(_check_chunk, block, {k: brep[k] for k in idx}, vol_eps))
+            for fut in futures:
+                results.extend(fut.result())
+    else:
+        results = [(i, j) + _exact(shapes[i], shapes[j], ov, vol_eps) for i, j, ov in jobs]
+
+    issues = []
+    for i, j, vol, dist in results:
+        required = tols[i] + tols[j]
+        kind = _classify(vol, dist, required, vol_eps)
+        if kind:
+            issues.append({"kind": kind, "a": names[i], "b": names[j], "volume_mm3": vol,
+                           "distance_mm": dist, "required_mm": required})
+    issues.sort(key=lambda r: (KINDS.index(r["kind"]), -r["volume_mm3"], r["distance_mm"]))
+    n = len(items)
+    return {
+        "issues": issues,
+        "parts": n,
+        "candidates": len(jobs),
+        "pairs_total": n * (n - 1) // 2,
+        "wall_s": time.perf_counter() - t0,
+    }
+
+def format_report(result):
+    lines = [f"Interferencias: {result['parts']} piezas, {result['candidates']} pares candidatos "
+             f"de {result['pairs_total']} ({result['wall_s']:.2f} s)"]
+    for r in result["issues"]:
+        if r["kind"] == "collision":
+            detail = f"volumen común {r['volume_mm3']:.1f} mm^3"
+        else:
+            detail = f"distancia {r['distance_mm']:.2f} mm < holgura {r['required_mm']:.2f} mm"
+        lines.append(f"  {r['kind']:<9} {r['a']} / {r['b']}: {detail}")
+    if not result["issues"]:
+        lines.append("  sin colisiones ni holguras insuficientes")
+    return "\n".join(lines)
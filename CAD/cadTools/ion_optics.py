@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# Óptica iónica de las rejillas de PropulsMejora (modo "ion"): límite de
+# Child–Langmuir, margen de perveancia, empuje e Isp por apertura y para toda
+# la rejilla, vectorizado sobre millones de diseños candidatos.
+#
+# Por apertura (pantalla de diámetro d_s = grid_hole_d, espesor t_s, separación l_g):
+#   l_e   = sqrt((l_g + t_s)^2 + d_s^2/4)                 longitud efectiva
+#   P_max = (π·ε0/9)·sqrt(2q/M)·(d_s/l_e)^2               perveancia máxima [A/V^1.5]
+#   I_max = P_max·V_T^1.5,  V_T = V_haz / R                tensión total entre rejillas
+# Haz:    T = F_t·I_b·sqrt(2·M·V_haz/q),  Isp = F_t·η_m·sqrt(2q·V_haz/M)/g0
+# Un diseño es viable si el margen de perveancia (1 - I_b/I_max) >= min_margin,
+# el campo V_T/l_g <= e_max y cabe al menos una apertura.
+# Con beam_A = None cada diseño opera justo en el margen (empuje máximo).
+#
+#   python ion_optics.py -o rejillas.csv                         # 32^4 ≈ 10^6 diseños
+#   python ion_optics.py --set grid_gap=0.8:2.0:40 --set ion_beam_V=800,1000,1200 --beam-current 0.015
+
+import argparse
+import functools
+import sys
+import time
+
+import numpy as np
+
+from model_registry import load_model, parse_overrides
+
+MODEL = "cubesat_pro"
+EPS0 = 8.8541878128e-12
+Q_E = 1.602176634e-19
+AMU = 1.66053906660e-27
+G0 = 9.80665
+
+# Masa atómica [u] de los propelentes (iones de carga simple)
+PROPELLANTS = {"Xe": 131.293, "Kr": 83.798, "Ar": 39.948, "I": 126.904, "Bi": 208.980}
+
+# Supuestos del haz (sobrescribibles desde la CLI)
+BEAM = {
+    "accel_ratio": 0.8,     # R = V_haz / V_total
+    "thrust_factor": 0.98,  # F_t: divergencia y dobles cargas
+    "mass_util": 0.85,      # η_m: utilización de propelente
+    "min_margin": 0.2,      # margen de perveancia mínimo
+    "e_max_kV_mm": 2.5,     # campo máximo entre rejillas
+}
+
+# Barrido por defecto: 32 valores por eje -> 32^4 = 1 048 576 diseños
+SWEEP = {
+    "grid_gap": (0.5, 2.5, 32),
+    "grid_opening": (0.4, 0.9, 32),
+    "grid_screen_thk": (0.3, 1.5, 32),
+    "ion_beam_V": (400.0, 2000.0, 32),
+}
+
+@functools.lru_cache(maxsize=None)
+def constants(propellant):
+    # Constantes por propelente (memorizadas): masa del ion, sqrt(2q/M) y
+    # coeficiente de perveancia
+    if propellant not in PROPELLANTS:
+        raise KeyError(f"Propelente desconocido: {propellant} (disponibles: {', '.join(PROPELLANTS)})")
+    mass = PROPELLANTS[propellant] * AMU
+    k = np.sqrt(2.0 * Q_E / mass)
+    return {"mass_kg": mass, "sqrt_2q_m": k, "perveance": np.pi * EPS0 / 9.0 * k}
+
+# -----------------------------
+# Geometría de la rejilla
+# -----------------------------
+def optics_pattern(pattern):
+    # "single" es la simplificación geométrica del CAD (una abertura): la óptica
+    # se calcula con la matriz hexagonal de grid_hole_d / grid_pitch
+    return "rect" if pattern == "rect" else "hex"
+
+def aperture_count(chamber_OD, opening, hole_d, pitch, web, pattern="hex"):
+    # Aperturas completas dentro de la zona activa (aproximación por área de la
+    # celda; aperture_array.hex_points/rect_points da el recuento exacto)
+    limit = np.asarray(chamber_OD) * opening / 2.0 - hole_d / 2.0 - web
+    cell = np.sqrt(3.0) / 2.0 * pitch ** 2 if optics_pattern(pattern) == "hex" else pitch ** 2
+    return np.where(limit > 0.0, np.floor(np.pi * np.maximum(limit, 0.0) ** 2 / cell) + 1.0, 0.0)
+
+# -----------------------------
+# Evaluación (vectorizada)
+# -----------------------------
+def evaluate(gap, opening, screen_thk, beam_V, propellant="Xe", chamber_OD=60.0, hole_d=1.9, pitch=2.4,
+             web=0.3, pattern="hex", beam_A=None, **beam):
+    # Todas las entradas hacen broadcast; longitudes en mm, tensiones en V.
+    # Devuelve {métrica: array}
+    b = dict(BEAM, **beam)
+    c = constants(propellant)
+    gap = np.asarray(gap, dtype=float)
+    beam_V = np.asarray(beam_V, dtype=float)
+    d_s = float(hole_d)
+    n_ap = aperture_count(chamber_OD, opening, hole_d, pitch, web, pattern)
+    l_e = np.sqrt((gap + screen_thk) ** 2 + d_s ** 2 / 4.0)
+    V_T = beam_V / b["accel_ratio"]
+    P_max = c["perveance"] * (d_s / l_e) ** 2
+    I_ap_max = P_max * V_T ** 1.5
+    I_max = I_ap_max * n_ap
+    if beam_A is None:
+        I_b = (1.0 - b["min_margin"]) * I_max
+    else:
+        I_b = np.broadcast_to(float(beam_A), np.shape(I_max))
+    margin = np.where(I_max > 0.0, 1.0 - I_b / np.where(I_max > 0.0, I_max, 1.0), -np.inf)
+    v_ion = c["sqrt_2q_m"] * np.sqrt(beam_V)
+    thrust = b["thrust_factor"] * I_b * c["mass_kg"] / Q_E * v_ion
+    field = V_T / gap * 1e-3
+    feasible = (margin >= b["min_margin"] - 1e-12) & (field <= b["e_max_kV_mm"]) & (n_ap >= 1)
+    n = np.maximum(n_ap, 1.0)
+    return {
+        "apertures": n_ap,
+        "l_eff_mm": l_e,
+        "perveance_max": P_max,
+        "I_aperture_max_A": I_ap_max,
+        "I_grid_max_A": I_max,
+        "I_beam_A": I_b,
+        "I_aperture_A": I_b / n,
+        "perveance_margin": margin,
+        "field_kV_mm": field,
+        "thrust_mN": thrust * 1e3,
+        "thrust_aperture_mN": thrust * 1e3 / n,
+        "isp_s": b["thrust_factor"] * b["mass_util"] * v_ion / G0 * np.ones_like(thrust),
+        "beam_power_W": I_b * beam_V,
+        "feasible": feasible,
+    }
+
+def from_params(p, **beam):
+    # Diseño actual de PropulsMejora (p de resolve_params)
+    return evaluate(p["grid_gap"], p["grid_opening"], p["grid_screen_thk"], p["ion_beam_V"], p["ion_propellant"],
+                    p["chamber_OD"], p["grid_hole_d"], p["grid_pitch"], p["grid_web"], p["grid_pattern"],
+                    p["ion_beam_A"], **dict({"accel_ratio": p["ion_accel_ratio"]}, **beam))
+
+# -----------------------------
+# Barrido
+# -----------------------------
+def axes_of(spec):
+    # {clave: (mín, máx, n) | [valores]} -> {clave: array}
+    return {k: np.linspace(*v[:2], int(v[2])) if isinstance(v, tuple) else np.asarray(v, dtype=float)
+            for k, v in spec.items()}
+
+def sweep(p, spec=None, beam_A=None, block=262144, top=50, rank="thrust_mN", **beam):
+    # Producto cartesiano de los ejes de spec evaluado por bloques (sin
+    # materializar la malla completa). Devuelve el recuento de viables y los
+    # `top` mejores según `rank` como filas de parámetros
+    axes = axes_of(spec or SWEEP)
+    names = list(axes)
+    shape = tuple(len(axes[k]) for k in names)
+    total = int(np.prod(shape))
+    beam = dict({"accel_ratio": p["ion_accel_ratio"]}, **beam)
+    t0 = time.perf_counter()
+    n_ok = 0
+    best_v = np.empty(0)
+    best_i = np.empty(0, dtype=np.int64)
+    for start in range(0, total, block):
+        idx = np.arange(start, min(start + block, total))
+        cols = {k: axes[k][i] for k, i in zip(names, np.unravel_index(idx, shape))}
+        res = evaluate(cols["grid_gap"], cols["grid_opening"], cols["grid_screen_thk"], cols["ion_beam_V"],
+                       p["ion_propellant"], p["chamber_OD"], p["grid_hole_d"], p["grid_pitch"], p["grid_web"],
+                       p["grid_pattern"], beam_A, **beam)
+        ok = res["feasible"]
+        n_ok += int(ok.sum())
+        # Mejores viables acumulados (argpartition por bloque)
+        v = np.concatenate([best_v, res[rank][ok]])
+        i = np.concatenate([best_i, idx[ok]])
+        if len(v) > top:
+            keep = np.argpartition(-v, top)[:top]
+            v, i = v[keep], i[keep]
+        best_v, best_i = v, i
+    order = np.argsort(-best_v, kind="stable")
+    best = best_i[order]
+    cols = {k: axes[k][j] for k, j in zip(names, np.unravel_index(best, shape))}
+    res = evaluate(cols["grid_gap"], cols["grid_opening"], cols["grid_screen_thk"], cols["ion_beam_V"],
+                   p["ion_propellant"], p["chamber_OD"], p["grid_hole_d"], p["grid_pitch"], p["grid_web"],
+                   p["grid_pattern"], beam_A, **beam)
+    return {"total": total, "feasible": n_ok, "rows": design_rows(p, cols, res),
+            "wall_s": time.perf_counter() - t0}
+
+def design_rows(p, cols, res):
+    # Diseños como parámetros de PropulsMejora (grid_*, ion_beam_V) + métricas;
+    # la aceleradora conserva la relación de espesores del modelo
+    ratio = p["grid_accel_thk"] / p["grid_screen_thk"]
+    rows = []
+    for k in range(len(cols["grid_gap"])):
+        row = {"rank": k}
+        row.update({name: float(v[k]) for name, v in cols.items()})
+        row["grid_accel_thk"] = row["grid_screen_thk"] * ratio
+        row.update({name: (bool(v[k]) if v.dtype == bool else float(v[k])) for name, v in res.items()})
+        rows.append(row)
+    return rows
+
+def overrides(row):
+    # Fila -> --set de run_model.py
+    keys = ("grid_gap", "grid_opening", "grid_screen_thk", "grid_accel_thk", "ion_beam_V")
+    return [f"{k}={row[k]:.6g}" for k in keys]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Óptica iónica de las rejillas (Child–Langmuir, perveancia, empuje, Isp)")
+    ap.add_argument("--set", dest="sets", action="append", default=[], metavar="KEY=VALORES",
+                    help="eje del barrido (a:b:n o a,b,c): grid_gap, grid_opening, grid_screen_thk, ion_beam_V")
+    ap.add_argument("--param", action="append", default=[], metavar="KEY=VAL",
+                    help="parámetro fijo de PropulsMejora (p. ej. ion_propellant=Kr, grid_pattern=rect)")
+    ap.add_argument("--beam-current", type=float, default=None,
+                    help="corriente de haz [A]; por defecto cada diseño opera en el margen de perveancia")
+    for key, value in BEAM.items():
+        if key != "accel_ratio":
+            ap.add_argument("--" + key.replace("_", "-"), dest=key, type=float, default=value)
+    ap.add_argument("--rank", default="thrust_mN", choices=("thrust_mN", "isp_s", "perveance_margin"))
+    ap.add_argument("--top", type=int, default=50, help="diseños viables que se guardan")
+    ap.add_argument("-o", "--output", default=None, help="CSV con los mejores diseños (parámetros grid_*)")
+    args = ap.parse_args(argv)
+
+    import param_sweep
+    model = load_model(MODEL)
+    p = model.resolve_params(parse_overrides(args.param))
+    spec = dict(SWEEP)
+    spec.update({k: list(v) for k, v in param_sweep.parse_spec(args.sets).items()})
+    unknown = set(spec) - set(SWEEP)
+    if unknown:
+        print(f"Ejes no soportados: {', '.join(sorted(unknown))} (usa {', '.join(SWEEP)})")
+        return 2
+    beam = {k: getattr(args, k) for k in BEAM if k != "accel_ratio"}
+
+    now = {k: float(np.asarray(v)) for k, v in from_params(p, **beam).items()}
+    print(f"Diseño actual ({p['ion_propellant']}, {p['grid_pattern']}): {now['apertures']:.0f} aperturas, "
+          f"límite {now['I_grid_max_A'] * 1e3:.2f} mA, haz {now['I_beam_A'] * 1e3:.2f} mA, "
+          f"margen {now['perveance_margin']:.2f}, {now['thrust_mN']:.3f} mN, Isp {now['isp_s']:.0f} s")
+
+    res = sweep(p, spec, args.beam_current, top=args.top, rank=args.rank, **beam)
+    print(f"{res['total']} diseños en {res['wall_s']:.2f} s; viables: {res['feasible']}")
+    rows = res["rows"]
+    if rows:
+        r = rows[0]
+        print(f"  mejor: {r['thrust_mN']:.3f} mN, Isp {r['isp_s']:.0f} s, margen {r['perveance_margin']:.2f}, "
+              f"{r['field_kV_mm']:.2f} kV/mm -> --set " + " --set ".join(overrides(r)))
+    if args.output:
+        param_sweep.write_csv(rows, args.output)
+        print(f"Diseños viables -> {args.output}")
+    return 0 if rows else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
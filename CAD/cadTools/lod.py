@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Nivel de detalle (LOD) global para vistas previas y barridos.
+#
+#   "full"     geometría completa; idéntica a la salida de siempre (exportaciones)
+#   "preview"  splines y toros -> conos y anillos cilíndricos, sin redondeos,
+#              sin agujeros pequeños (< LOD_MIN_HOLE_MM) ni matrices de
+#              aperturas, y teselado grueso para visores/STL
+#
+# Se elige con CAD_LOD=preview, set_level() o el contexto preview().
+# El nivel entra en la clave de la caché BREP (brep_cache.register_context).
+
+import math
+import os
+from contextlib import contextmanager
+
+import brep_cache
+
+LEVELS = ("full", "preview")
+
+MIN_HOLE_MM = float(os.environ.get("LOD_MIN_HOLE_MM", 3.5))
+
+# Teselado: desviación lineal relativa a la diagonal de la pieza y angular [rad]
+DEFLECTION = {"full": (0.001, math.radians(28.5)), "preview": (0.02, math.radians(60.0))}
+
+_level = os.environ.get("CAD_LOD", "full").lower()
+
+def get_level():
+    return _level
+
+def set_level(level):
+    global _level
+    if level not in LEVELS:
+        raise ValueError(f"LOD desconocido: {level} (usa {', '.join(LEVELS)})")
+    _level = level
+
+def is_preview():
+    return _level != "full"
+
+@contextmanager
+def preview(level="preview"):
+    prev = get_level()
+    set_level(level)
+    try:
+        yield
+    finally:
+        set_level(prev)
+
+@brep_cache.register_context
+def _cache_tag():
+    return "" if _level == "full" else f"lod={_level}"
+
+def skip_hole(dia):
+    # True si el agujero no se modela en este nivel
+    return is_preview() and dia < MIN_HOLE_MM
+
+# -----------------------------
+# Sustitutos simplificados
+# -----------------------------
+def ring(R, r, center, direction):
+    # Anillo cilíndrico con la envolvente de un toro (R, r); sin booleans
+    import FreeCAD as App
+    import Part
+    d = App.Vector(direction)
+    d.normalize()
+    base = App.Vector(center) - d * r
+    outer = Part.Wire(Part.makeCircle(R + r, base, d))
+    inner = Part.Wire(Part.makeCircle(R - r, base, d))
+    face = Part.makeFace([outer, inner], "Part::FaceMakerBullseye")
+    return face.extrude(d * (2.0 * r))
+
+def torus(R, r, center, direction):
+    # Part.makeTorus en "full"; anillo cilíndrico en "preview"
+    import FreeCAD as App
+    import Part
+    if is_preview():
+        return ring(R, r, center, direction)
+    return Part.makeTorus(R, r, App.Vector(center), App.Vector(direction))
+
+def nozzle_cones(z0, L, d_inlet, d_throat, d_exit, throat_frac=0.35):
+    # Tobera convergente-divergente como dos conos macizos (eje Z)
+    import FreeCAD as App
+    import Part
+    zt = z0 + throat_frac * L
+    conv = Part.makeCone(d_inlet / 2.0, d_throat / 2.0, zt - z0, App.Vector(0, 0, z0))
+    div = Part.makeCone(d_throat / 2.0, d_exit / 2.0, z0 + L - zt, App.Vector(0, 0, zt))
+    return Part.makeCompound([conv, div])
+
+# -----------------------------
+# Teselado
+# -----------------------------
+def deflection(shape, level=None):
+    lin, ang = DEFLECTION[level or _level]
+    return max(shape.BoundBox.DiagonalLength * lin, 1e-3), ang
+
+def tessellate(shape, level=None):
+    # (puntos, triángulos) con la desviación del nivel actual
+    lin, _ = deflection(shape, level)
+    return shape.tessellate(lin)
+
+def export_mesh(objs, path, level=None):
+    # STL/OBJ... con la desviación del nivel actual (una malla por objeto)
+    import Mesh
+    import MeshPart
+    import docless
+    mesh = Mesh.Mesh()
+    for obj in objs:
+        shape = docless.shape_of(obj)
+        lin, ang = deflection(shape, level)
+        mesh.addMesh(MeshPart.meshFromShape(Shape=shape, LinearDeflection=lin, AngularDeflection=ang))
+    mesh.write(path)
+    return path
+
+def apply_view(objs):
+    # Teselado de la vista 3D (solo con GUI)
+    if not is_preview():
+        return
+    lin, ang = DEFLECTION[_level]
+    for obj in objs:
+        vo = getattr(obj, "ViewObject", None)
+        if vo is not None and hasattr(vo, "Deviation"):
+            vo.Deviation = lin * 100.0  # en % (FreeCAD)
+            vo.AngularDeflection = math.degrees(ang)
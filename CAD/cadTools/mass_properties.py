@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Propiedades másicas analíticas (volumen, CG, tensor de inercia) sin OCC.
+# Unidades: mm para geometría, kg/m^3 para densidades, kg·m^2 para inercias.
+#
+# Todas las funciones aceptan escalares o arrays de NumPy (se hace broadcast),
+# de modo que una sola llamada evalúa miles de variantes a la vez.
+# Para sólidos arbitrarios, from_shape() usa el kernel OCC como respaldo.
+
+from collections import namedtuple
+
+import numpy as np
+
+# vol: volumen [mm^3]; cg: centro [mm] (..., 3);
+# J: tensor de inercia volumétrico respecto al CG [mm^5] (..., 3, 3) -> I = rho * J
+Props = namedtuple("Props", "vol cg J")
+
+AXES = {"x": 0, "y": 1, "z": 2}
+
+def _arr(*values):
+    return np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in values))
+
+def _diag(a, b, c):
+    a, b, c = _arr(a, b, c)
+    J = np.zeros(a.shape + (3, 3))
+    J[..., 0, 0], J[..., 1, 1], J[..., 2, 2] = a, b, c
+    return J
+
+def _shift(J, vol, d):
+    # Steiner: tensor respecto a un punto desplazado d del CG
+    d2 = np.einsum("...i,...i->...", d, d)
+    eye = np.eye(3)
+    return J + vol[..., None, None] * (d2[..., None, None] * eye - d[..., :, None] * d[..., None, :])
+
+# -----------------------------
+# Primitivas
+# -----------------------------
+def box(lx, ly, lz, base=(0.0, 0.0, 0.0)):
+    # Part.makeBox(lx, ly, lz) trasladado a base (esquina mínima)
+    lx, ly, lz, bx, by, bz = _arr(lx, ly, lz, *base)
+    vol = lx * ly * lz
+    cg = np.stack([bx + lx / 2.0, by + ly / 2.0, bz + lz / 2.0], axis=-1)
+    J = _diag(vol * (ly**2 + lz**2) / 12.0, vol * (lx**2 + lz**2) / 12.0, vol * (lx**2 + ly**2) / 12.0)
+    return Props(vol, cg, J)
+
+def cone(r1, r2, length, base=(0.0, 0.0, 0.0), axis="z"):
+    # Tronco de cono (r1 en la base, r2 en base+length) a lo largo de un eje;
+    # con r1 == r2 es un cilindro. Integrales exactas de rho(t) lineal.
+    r1, r2, L, bx, by, bz = _arr(r1, r2, length, *base)
+    s2 = r1**2 + r1 * r2 + r2**2
+    s4 = r1**4 + r1**3 * r2 + r1**2 * r2**2 + r1 * r2**3 + r2**4
+    vol = np.pi * L * s2 / 3.0
+    safe = np.where(s2 > 0.0, s2, 1.0)
+    zbar = L * (r1**2 / 12.0 + r1 * r2 / 6.0 + r2**2 / 4.0) * 3.0 / safe
+    j_ax = np.pi * L * s4 / 10.0
+    j_base = np.pi * (L * s4 / 20.0 + L**3 * (r1**2 / 30.0 + r1 * r2 / 10.0 + r2**2 / 5.0))
+    j_tr = j_base - vol * zbar**2
+
+    k = AXES[axis]
+    diag = [j_tr, j_tr, j_tr]
+    diag[k] = j_ax
+    J = _diag(*diag)
+    cg = np.stack([bx, by, bz], axis=-1)
+    cg[..., k] += zbar
+    return Props(vol, cg, J)
+
+def cylinder(r, length, base=(0.0, 0.0, 0.0), axis="z"):
+    return cone(r, r, length, base, axis)
+
+def annulus(r_out, r_in, length, base=(0.0, 0.0, 0.0), axis="z"):
+    # Cilindro hueco = exterior - interior
+    return combine([cylinder(r_out, length, base, axis), cylinder(r_in, length, base, axis)], [1.0, -1.0])
+
+def combine(items, signs=None):
+    # Suma (o resta, signo -1) de volúmenes con el mismo material
+    signs = [1.0] * len(items) if signs is None else signs
+    vol = sum(s * p.vol for p, s in zip(items, signs))
+    safe = np.where(vol != 0.0, vol, 1.0)
+    cg = sum(s * p.vol[..., None] * p.cg for p, s in zip(items, signs)) / safe[..., None]
+    J = sum(s * _shift(p.J, p.vol, p.cg - cg) for p, s in zip(items, signs))
+    return Props(np.asarray(vol), cg, J)
+
+def from_shape(shape):
+    # Respaldo OCC para sólidos arbitrarios (MatrixOfInertia es respecto al CG)
+    items = []
+    for solid in shape.Solids:
+        m = solid.MatrixOfInertia
+        J = np.array([[m.A11, m.A12, m.A13], [m.A21, m.A22, m.A23], [m.A31, m.A32, m.A33]])
+        c = solid.CenterOfMass
+        items.append(Props(np.asarray(solid.Volume), np.array([c.x, c.y, c.z]), J))
+    if not items:
+        return Props(np.asarray(0.0), np.zeros(3), np.zeros((3, 3)))
+    return combine(items) if len(items) > 1 else items[0]
+
+# -----------------------------
+# Agregado del vehículo
+# -----------------------------
+def rollup(parts, densities, inertia=True):
+    # parts: lista de Props; densities: densidad efectiva [kg/m^3] de cada una.
+    # inertia=False omite el tensor (solo masa y CG; muestreos masivos)
+    shape = np.broadcast_shapes(*(np.shape(p.vol) for p in parts), *(np.shape(d) for d in densities))
+    vol = np.stack([np.broadcast_to(p.vol, shape) for p in parts], axis=-1)
+    cg = np.stack([np.broadcast_to(p.cg, shape + (3,)) for p in parts], axis=-2)
+    rho = np.stack([np.broadcast_to(np.asarray(d, dtype=float), shape) for d in densities], axis=-1) * 1e-9
+
+    mass = rho * vol                                   # kg
+    total = mass.sum(axis=-1)
+    safe = np.where(total > 0.0, total, 1.0)
+    cg_sys = np.einsum("...n,...ni->...i", mass, cg) / safe[..., None]
+    if not inertia:
+        return {"mass_kg": total, "cg_mm": cg_sys, "inertia_kgm2": None, "part_mass_kg": mass}
+    J = np.stack([np.broadcast_to(p.J, shape + (3, 3)) for p in parts], axis=-3)
+    d = cg - cg_sys[..., None, :]
+    d2 = np.einsum("...ni,...ni->...n", d, d)
+    own = np.einsum("...n,...nij->...ij", rho, J)
+    steiner = (np.einsum("...n,...n->...", mass, d2)[..., None, None] * np.eye(3)
+               - np.einsum("...n,...ni,...nj->...ij", mass, d, d))
+    inertia = (own + steiner) * 1e-6                   # kg·mm^2 -> kg·m^2
+    return {"mass_kg": total, "cg_mm": cg_sys, "inertia_kgm2": inertia, "part_mass_kg": mass}
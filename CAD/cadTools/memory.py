@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Memoria de las construcciones por lotes.
+#
+# - RSS actual y pico del proceso (Linux: /proc/self; resto: resource/psutil).
+# - Pico y RSS estable por sección con nombre (las mismas de profiling.section):
+#       with profiling.memory_tracking() as mem: model.build(doc)
+#       print(mem.report())
+# - Documentos de lote sin pila de deshacer (UndoMode = 0) y cierre con
+#   liberación (gc + malloc_trim) entre variantes.
+# - Techo de memoria (MEM_CEILING_MB o --mem-ceiling en param_sweep.py): el
+#   proceso que lo supera tras una variante se recicla antes de quedarse sin
+#   memoria.
+#
+#   python run_model.py navefusion --memory      # tabla de memoria por sección
+
+import gc
+import os
+import sys
+
+MB = 1024.0 * 1024.0
+
+# -----------------------------
+# Lecturas de RSS
+# -----------------------------
+def _status_mb(field):
+    # Campo "VmRSS"/"VmHWM" de /proc/self/status en MB (None fuera de Linux)
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+def _maxrss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / MB if sys.platform == "darwin" else rss / 1024.0
+
+def rss_mb():
+    # Memoria residente actual [MB]
+    rss = _status_mb("VmRSS")
+    if rss is not None:
+        return rss
+    try:
+        import psutil
+    except ImportError:
+        return _maxrss_mb()
+    return psutil.Process().memory_info().rss / MB
+
+def peak_mb():
+    # Pico de memoria residente [MB] (desde el inicio o el último reset_peak)
+    peak = _status_mb("VmHWM")
+    return peak if peak is not None else _maxrss_mb()
+
+def reset_peak():
+    # Reinicia el pico (VmHWM) al RSS actual; False si el sistema no lo permite
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+def release():
+    # Libera ciclos de Python y devuelve al sistema la memoria libre de malloc
+    # (OCC reserva con malloc; sin trim el RSS no baja entre variantes)
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+    return rss_mb()
+
+# -----------------------------
+# Techo de memoria
+# -----------------------------
+def ceiling_mb(value=None):
+    # Techo configurado [MB]: argumento, MEM_CEILING_MB o None (sin límite)
+    if value is None:
+        value = os.environ.get("MEM_CEILING_MB") or None
+    return float(value) if value is not None else None
+
+def over_ceiling(ceiling=None, rss=None):
+    limit = ceiling_mb(ceiling)
+    if limit is None:
+        return False
+    return (rss_mb() if rss is None else rss) > limit
+
+# -----------------------------
+# Documentos de lote
+# -----------------------------
+def batch_document(App, name):
+    # Documento sin pila de deshacer: en lote nadie deshace y cada
+    # transacción guardaría copias de las formas
+    doc = App.newDocument(name)
+    try:
+        doc.UndoMode = 0
+    except (AttributeError, ValueError):
+        pass
+    return doc
+
+def close_document(App, doc):
+    # Cierra el documento y libera la memoria antes de la siguiente variante
+    if doc is not None:
+        App.closeDocument(doc.Name)
+    return release()
+
+# -----------------------------
+# Memoria por sección
+# -----------------------------
+class MemoryTracker:
+    # Por sección: llamadas, RSS al entrar, RSS al salir (estable) y pico.
+    # El pico de la sección incluye el de sus subsecciones.
+    def __init__(self):
+        self.sections = {}   # ruta -> {calls, rss_in_mb, rss_out_mb, peak_mb}
+        self._stack = []     # [nombre, rss al entrar, pico acumulado]
+        self._resettable = reset_peak()
+        self.start_mb = rss_mb()
+
+    def _peak(self):
+        return peak_mb() or 0.0
+
+    def push(self, name):
+        # El pico hasta ahora pertenece a la sección padre; se reinicia para la nueva
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], self._peak())
+        if self._resettable:
+            reset_peak()
+        rss = rss_mb()
+        self._stack.append([name, rss, rss or 0.0])
+
+    def pop(self):
+        path = tuple(n for n, _, _ in self._stack)
+        name, rss_in, peak = self._stack.pop()
+        peak = max(peak, self._peak())
+        entry = self.sections.setdefault(" / ".join(path), {
+            "calls": 0, "rss_in_mb": rss_in, "rss_out_mb": 0.0, "peak_mb": 0.0})
+        entry["calls"] += 1
+        entry["rss_out_mb"] = rss_mb()
+        entry["peak_mb"] = max(entry["peak_mb"], peak)
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+
+    def summary(self):
+        # Totales del proceso: RSS inicial, actual y pico
+        return {"start_mb": self.start_mb, "rss_mb": rss_mb(),
+                "peak_mb": max([self._peak()] + [s["peak_mb"] for s in self.sections.values()])}
+
+    def report(self):
+        lines = [f"{'sección':<48}{'llamadas':>9}{'entrada':>9}{'salida':>9}{'pico':>9}  MB"]
+        for path, st in self.sections.items():
+            lines.append(f"{path:<48}{st['calls']:>9}{st['rss_in_mb']:>9.1f}"
+                         f"{st['rss_out_mb']:>9.1f}{st['peak_mb']:>9.1f}")
+        s = self.summary()
+        lines.append(f"proceso: inicio {s['start_mb']:.1f} MB, actual {s['rss_mb']:.1f} MB, pico {s['peak_mb']:.1f} MB")
+        return "\n".join(lines)
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+# Simulador de misión de doble modo de NaveFusion (Measurements_automation.py).
+#
+# Transferencia rectilínea sin gravedad de distance_km con cita final
+# (acelerar, costa, frenar) y los dos modos del README:
+#   "cruise"  eléctrica continua (iónica/Hall): F = 2·η·P/(g0·Isp) con la
+#             potencia eléctrica del reactor que no carga el banco
+#   "pulse"   fusión pulsada + tobera magnética: cada pulso descarga E_drv =
+#             yield/gain del banco de supercondensadores, que se recarga con
+#             potencia limitada; la cadencia la limitan el banco (capacidad,
+#             carga y descarga), rep_max_hz y el calor que admiten los radiadores
+# Programa de fases: cada maniobra (salida y llegada) gasta su mitad de los
+# presupuestos de pulso (pulse_frac) y de crucero; la costa termina cuando
+# la distancia de frenado estimada alcanza la distancia restante. Si el
+# frenado se detiene antes del objetivo (brake_margin frena pronto a
+# propósito) se repite el programa sobre la distancia restante con la mitad
+# del presupuesto de llegada que quede; sin presupuesto es un fallo de cita.
+#
+# Masas seca/húmeda del modelo analítico (analytic_mass); la integración es
+# de paso fijo sobre arrays NumPy (una componente por misión) y los bloques
+# de misiones se reparten entre procesos. Salida por diseño de P: tiempo de
+# transferencia y margen de propelente.
+#
+#   python mission.py --set REACTOR_LEN=1500:3500:5 --set RAD_LEN=2000:4000:5 -j 4 -o misiones.csv
+#   python mission.py --variants design/variants/navefusion_radiador.toml --distance-km 8e7
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import radiator_sizing
+from model_registry import load_model
+
+MODEL = "navefusion"
+G0 = 9.80665
+DAY = 86400.0
+
+# Supuestos de misión, planta de potencia y banco (sobrescribibles desde la CLI)
+MISSION = {
+    "distance_km": 2.0e7,       # transferencia rectilínea
+    "t_max_days": 3650.0,
+    "dt_s": 21600.0,            # paso fijo
+    "payload_kg": 0.0,
+    "reserve_frac": 0.05,       # propelente de reserva (no se planifica)
+    "pulse_frac": 0.3,          # fracción del propelente útil en modo pulsado
+    "brake_margin": 1.05,       # factor sobre la distancia de frenado estimada
+    "arrive_tol_ms": 50.0,      # velocidad de llegada admitida (cita)
+    "arrive_tol_km": 1000.0,    # distancia al objetivo admitida (cita)
+    # Crucero eléctrico
+    "isp_cruise_s": 3000.0,
+    "cruise_eta": 0.6,          # eficiencia del propulsor
+    "cruise_kw_max": 200.0,     # potencia nominal de los propulsores
+    # Fusión pulsada
+    "isp_pulse_s": 12000.0,
+    "pulse_yield_MJ": 50.0,     # energía de fusión por pulso
+    "pulse_gain": 10.0,         # yield / energía del banco por pulso
+    "nozzle_eta": 0.8,          # fracción del yield en chorro dirigido
+    "pulse_heat_frac": 0.02,    # fracción del yield que acaba en los radiadores
+    "rep_max_hz": 10.0,
+    # Banco de supercondensadores
+    "cap_MJ": 20.0,
+    "cap_charge_kw": 500.0,
+    "cap_discharge_MW": 100.0,
+    # Reactor en régimen continuo y radiadores (como dv_optimizer.py)
+    "reactor_kw_per_m": 100.0,
+    "eta": 0.30,
+    "rad_temp_K": 900.0,
+    "rad_emissivity": 0.85,
+}
+
+METRICS = ("dry_kg", "wet_kg", "propellant_kg", "electric_kw", "pulse_hz_max", "arrived", "transfer_days",
+           "arrival_v_ms", "miss_km", "dv_ms", "propellant_used_kg", "propellant_margin_kg",
+           "propellant_margin_frac", "pulses", "pulse_days", "cruise_days", "cap_limited_frac")
+
+# Fases
+ACCEL, COAST, BRAKE, DONE = 0, 1, 2, 3
+
+_model = None
+
+def _get_model():
+    global _model
+    if _model is None:
+        _model = load_model(MODEL)   # solo tablas y NumPy: no hace falta FreeCAD
+    return _model
+
+# -----------------------------
+# Planta (vectorizada)
+# -----------------------------
+def plant(model, params, mission=None):
+    # Masas, potencia eléctrica continua y límites de los pulsos por diseño
+    m = dict(MISSION, **(mission or {}))
+    p = model.resolve_params(params)
+    prop = model.EXTRA_MASS["Tanque_Propelente_kg"] if m.get("propellant_kg") is None else m["propellant_kg"]
+    res = model.analytic_mass(p, prop, inertia=False)
+    dry = np.asarray(res["dry"]["mass_kg"], dtype=float)
+    wet = np.asarray(res["wet"]["mass_kg"], dtype=float) + m["payload_kg"]
+    prop = wet - dry - m["payload_kg"]
+
+    # Reactor limitado por lo que evacuan los radiadores (2 radiadores de 2 caras)
+    thermal_kw = m["reactor_kw_per_m"] * p["REACTOR_LEN"] / 1e3
+    rad_area = 2 * p["RAD_LEN"] * p["RAD_W"] / 1e6
+    reject_kw = radiator_sizing.rejection(rad_area, m["rad_temp_K"], p["RAD_SINK_K"],
+                                          m["rad_emissivity"], p["RAD_FIN_EFF"]) / 1e3
+    waste_kw = (1.0 - m["eta"]) * thermal_kw
+    throttle = np.clip(reject_kw / np.maximum(waste_kw, 1e-9), 0.0, 1.0)
+    electric_kw = m["eta"] * thermal_kw * throttle
+    spare_kw = np.maximum(reject_kw - waste_kw * throttle, 0.0)
+
+    # Pulso: energía del banco, impulso y masa por pulso
+    y = m["pulse_yield_MJ"] * 1e6
+    e_drv = y / m["pulse_gain"]
+    ve_p = G0 * m["isp_pulse_s"]
+    j_pulse = 2.0 * m["nozzle_eta"] * y / ve_p
+    hz_heat = spare_kw * 1e3 / max(m["pulse_heat_frac"] * y, 1e-9)
+    hz_max = np.minimum(np.minimum(m["rep_max_hz"], m["cap_discharge_MW"] * 1e6 / e_drv), hz_heat)
+    shape = np.broadcast(dry, electric_kw, hz_max).shape
+    full = lambda a: np.broadcast_to(np.asarray(a, dtype=float), shape).copy()
+    return {"dry_kg": full(dry), "wet_kg": full(wet), "propellant_kg": full(prop),
+            "electric_kw": full(electric_kw), "pulse_hz_max": full(hz_max),
+            "e_drv": e_drv, "j_pulse": j_pulse, "m_pulse": j_pulse / ve_p}
+
+# -----------------------------
+# Integración de paso fijo (todas las misiones a la vez)
+# -----------------------------
+def simulate(model, params, mission=None):
+    m = dict(MISSION, **(mission or {}))
+    pl = plant(model, params, m)
+    n = pl["dry_kg"].shape
+    dt = float(m["dt_s"])
+    D = m["distance_km"] * 1e3
+    ve_c, ve_p = G0 * m["isp_cruise_s"], G0 * m["isp_pulse_s"]
+    e_drv, j_pulse, m_pulse = pl["e_drv"], pl["j_pulse"], pl["m_pulse"]
+    elec = pl["electric_kw"] * 1e3
+    charge_max = np.minimum(m["cap_charge_kw"] * 1e3, elec)
+    cap = m["cap_MJ"] * 1e6
+    hz_max = pl["pulse_hz_max"]
+
+    # Presupuestos de propelente por maniobra (salida / llegada)
+    usable = pl["propellant_kg"] * (1.0 - m["reserve_frac"])
+    pulse_dep = pulse_arr = usable * m["pulse_frac"] / 2.0
+    cruise_dep = cruise_arr = usable * (1.0 - m["pulse_frac"]) / 2.0
+
+    def cruise_force(power, budget):
+        return np.where(budget > 0.0, 2.0 * m["cruise_eta"] * np.minimum(power, m["cruise_kw_max"] * 1e3) / ve_c, 0.0)
+
+    mass = pl["wet_kg"].copy()
+    x, v, E = np.zeros(n), np.zeros(n), np.full(n, cap)
+    x0 = np.zeros(n)   # inicio del tramo actual (se repite si el frenado se queda corto)
+    tol = m["arrive_tol_km"] * 1e3
+    phase = np.full(n, ACCEL)
+    t_done = np.full(n, np.nan)
+    pulses, pulse_s, cruise_s, limited_s, dv = (np.zeros(n) for _ in range(5))
+
+    for k in range(int(np.ceil(m["t_max_days"] * DAY / dt))):
+        active = phase != DONE
+        if not active.any():
+            break
+        burn = (phase == ACCEL) | (phase == BRAKE)
+        pb = np.where(phase == ACCEL, pulse_dep, pulse_arr)
+        cb = np.where(phase == ACCEL, cruise_dep, cruise_arr)
+
+        # Banco: se carga con prioridad; el resto de la potencia va al crucero
+        firing = burn & (pb > 0.0) & (hz_max > 0.0)
+        p_charge = np.where(active & (firing | (E < cap)), charge_max, 0.0)
+        avail = E + p_charge * dt
+        n_p = np.where(firing, np.minimum(np.minimum(hz_max * dt, avail / e_drv), pb / m_pulse), 0.0)
+        limited_s += np.where(firing & (avail / e_drv < hz_max * dt), dt, 0.0)
+        E = np.minimum(avail - n_p * e_drv, cap)
+        dm_p = n_p * m_pulse
+
+        p_cruise = np.where(burn & (cb > 0.0), np.minimum(elec - p_charge, m["cruise_kw_max"] * 1e3), 0.0)
+        dm_c = np.minimum(2.0 * m["cruise_eta"] * p_cruise / ve_c ** 2 * dt, cb)
+
+        # Δv exacto del gasto de cada modo en el paso (ecuación del cohete)
+        m1 = mass - dm_c
+        m2 = m1 - dm_p
+        dv_k = ve_c * np.log(mass / m1) + ve_p * np.log(m1 / m2)
+        sign = np.where(phase == ACCEL, 1.0, np.where(phase == BRAKE, -1.0, 0.0))
+        x += np.where(active, (v + 0.5 * sign * dv_k) * dt, 0.0)
+        v += sign * dv_k
+        mass, dv = m2, dv + dv_k
+        pulses += n_p
+        pulse_s += np.where(n_p > 0.0, dt, 0.0)
+        cruise_s += np.where(dm_c > 0.0, dt, 0.0)
+        accel = phase == ACCEL
+        pulse_dep = np.where(accel, pulse_dep - dm_p, pulse_dep)
+        cruise_dep = np.where(accel, cruise_dep - dm_c, cruise_dep)
+        pulse_arr = np.where(phase == BRAKE, pulse_arr - dm_p, pulse_arr)
+        cruise_arr = np.where(phase == BRAKE, cruise_arr - dm_c, cruise_arr)
+        t = (k + 1) * dt
+
+        # Transiciones: llegada (o fallo de cita), nuevo tramo si el frenado se
+        # queda corto, fin de la aceleración y comienzo del frenado
+        stopped = (phase == BRAKE) & (v <= 0.0)
+        left = (pulse_arr > 1e-9) | (cruise_arr > 1e-9)
+        short = stopped & (D - x > tol) & left
+        arrived = active & ((x >= D) | (stopped & ~short))
+        t_done = np.where(arrived & np.isnan(t_done), t, t_done)
+        phase = np.where(arrived, DONE, phase)
+        x0 = np.where(short, x, x0)
+        pulse_dep = np.where(short, pulse_arr / 2.0, pulse_dep)
+        cruise_dep = np.where(short, cruise_arr / 2.0, cruise_dep)
+        pulse_arr = np.where(short, pulse_arr / 2.0, pulse_arr)
+        cruise_arr = np.where(short, cruise_arr / 2.0, cruise_arr)
+        phase = np.where(short, ACCEL, phase)
+        spent = accel & ~arrived & (((pulse_dep <= 1e-9) & (cruise_dep <= 1e-9)) | (x >= (x0 + D) / 2.0))
+        phase = np.where(spent, COAST, phase)
+        # Distancia de frenado: primero pulsos a la cadencia sostenible (con el
+        # crucero que deja la carga del banco) hasta agotar su presupuesto y
+        # después solo crucero con toda la potencia
+        pa = pulse_arr + np.where(accel, pulse_dep, 0.0)
+        ca = cruise_arr + np.where(accel, cruise_dep, 0.0)
+        a_p = np.where(pa > 0.0, np.minimum(hz_max, charge_max / e_drv) * j_pulse, 0.0)
+        a_p = (a_p + np.where(a_p > 0.0, cruise_force(elec - charge_max, ca), 0.0)) / mass
+        a_c = cruise_force(elec, ca) / mass
+        dv_p = np.where(a_p > 0.0, ve_p * np.log(mass / np.maximum(mass - pa, 1e-9)), 0.0)
+        v1 = np.maximum(v - dv_p, 0.0)
+        s1 = 0.5 * (v + v1) * (v - v1) / np.maximum(a_p, 1e-30)
+        s_stop = s1 + np.where(v1 > 0.0, v1 ** 2 / (2.0 * np.maximum(a_c, 1e-30)), 0.0)
+        start = ((phase == ACCEL) | (phase == COAST)) & (D - x <= m["brake_margin"] * s_stop) & (v > 0.0)
+        # Lo no gastado en la salida pasa a la llegada
+        leaving = accel & ~arrived & (spent | start)
+        pulse_arr = np.where(leaving, pulse_arr + pulse_dep, pulse_arr)
+        cruise_arr = np.where(leaving, cruise_arr + cruise_dep, cruise_arr)
+        pulse_dep = np.where(leaving, 0.0, pulse_dep)
+        cruise_dep = np.where(leaving, 0.0, cruise_dep)
+        phase = np.where(start, BRAKE, phase)
+
+    used = pl["wet_kg"] - mass
+    margin = pl["propellant_kg"] - used
+    ok = ~np.isnan(t_done) & (np.abs(v) <= m["arrive_tol_ms"]) & (np.abs(D - x) <= tol)
+    return {
+        "dry_kg": pl["dry_kg"],
+        "wet_kg": pl["wet_kg"],
+        "propellant_kg": pl["propellant_kg"],
+        "electric_kw": pl["electric_kw"],
+        "pulse_hz_max": pl["pulse_hz_max"],
+        "arrived": ok,
+        "transfer_days": np.where(ok, t_done / DAY, np.nan),
+        "arrival_v_ms": v,
+        "miss_km": (D - x) / 1e3,
+        "dv_ms": dv,
+        "propellant_used_kg": used,
+        "propellant_margin_kg": margin,
+        "propellant_margin_frac": margin / np.maximum(pl["propellant_kg"], 1e-12),
+        "pulses": pulses,
+        "pulse_days": pulse_s / DAY,
+        "cruise_days": cruise_s / DAY,
+        "cap_limited_frac": limited_s / np.maximum(pulse_s, dt),
+    }
+
+# -----------------------------
+# Lotes en procesos
+# -----------------------------
+def stack(designs, keys=None):
+    # Lista de dicts de P -> {clave: array (N,)}; las claves ausentes toman su valor de P
+    model = _get_model()
+    keys = keys or sorted({k for d in designs for k in d})
+    return {k: np.array([float(d.get(k, model.P[k])) for d in designs]) for k in keys}
+
+def _sim_chunk(params, mission, tables):
+    import variants
+    model = _get_model()
+    with variants.applied(model, tables):
+        out = simulate(model, params, mission)
+    return np.column_stack([np.asarray(out[k], dtype=float) for k in METRICS])
+
+def run(designs, mission=None, workers=None, chunk=2000, tables=None):
+    # designs: lista de dicts de P (o Variant con sus tablas) -> (N, len(METRICS))
+    import variants
+    groups = {}
+    for i, d in enumerate(designs):
+        t = d.tables if isinstance(d, variants.Variant) else (tables or {})
+        groups.setdefault(json.dumps(t, sort_keys=True), (t, []))[1].append(i)
+    jobs = []
+    for t, idx in groups.values():
+        params = stack([designs[i].params if isinstance(designs[i], variants.Variant) else designs[i] for i in idx])
+        for s in range(0, len(idx), chunk):
+            jobs.append((idx[s:s + chunk], {k: v[s:s + chunk] for k, v in params.items()}, t))
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(_sim_chunk, [p for _, p, _ in jobs], [mission] * len(jobs),
+                                    [t for _, _, t in jobs]))
+    else:
+        results = [_sim_chunk(p, mission, t) for _, p, t in jobs]
+    Y = np.empty((len(designs), len(METRICS)))
+    for (idx, _, _), block in zip(jobs, results):
+        Y[idx] = block
+    return Y
+
+def rows_of(designs, Y):
+    import variants
+    rows = []
+    for i, d in enumerate(designs):
+        row = {"design": i}
+        if isinstance(d, variants.Variant):
+            row["name"] = d.name
+            row.update(variants.flat(d))
+        else:
+            row.update(d)
+        row.update(zip(METRICS, (float(v) for v in Y[i])))
+        row["arrived"] = bool(row["arrived"])
+        rows.append(row)
+    return rows
+
+def main(argv=None):
+    import param_sweep
+    import variants
+    ap = argparse.ArgumentParser(description="Misiones de doble modo (crucero + fusión pulsada) de NaveFusion")
+    ap.add_argument("--set", dest="sets", action="append", default=[], metavar="KEY=VALORES",
+                    help="rango 'a:b:n' o lista 'a,b,c' para una clave de P (repetible)")
+    ap.add_argument("--variants", default=None, metavar="TOML|JSON", help="fichero de variantes (variants.py)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("--chunk", type=int, default=2000, help="misiones por bloque")
+    ap.add_argument("--propellant-kg", type=float, default=None, help="carga de propelente (por defecto EXTRA_MASS)")
+    for key, value in MISSION.items():
+        ap.add_argument("--" + key.replace("_", "-"), dest=key, type=float, default=value)
+    ap.add_argument("-o", "--output", default="missions.csv")
+    args = ap.parse_args(argv)
+
+    model = _get_model()
+    spec = param_sweep.parse_spec(args.sets)
+    unknown = [k for k in spec if k not in model.P]
+    if unknown:
+        ap.error(f"claves desconocidas en P: {', '.join(unknown)}")
+    if args.variants:
+        try:
+            designs = variants.load(args.variants)
+        except variants.VariantError as exc:
+            ap.error(f"fichero de variantes no válido:\n{exc}")
+        if any(v.model != MODEL for v in designs):
+            ap.error(f"las misiones son de {MODEL}; el fichero es de {designs[0].model}")
+        designs = variants.expand(designs, spec)
+    else:
+        designs = param_sweep.expand_grid(spec)
+
+    mission = {k: getattr(args, k) for k in MISSION}
+    mission["propellant_kg"] = args.propellant_kg
+    t0 = time.perf_counter()
+    Y = run(designs, mission, args.workers, args.chunk)
+    wall = time.perf_counter() - t0
+    rows = rows_of(designs, Y)
+    param_sweep.write_csv(rows, args.output)
+
+    ok = [r for r in rows if r["arrived"]]
+    print(f"{len(rows)} misiones en {wall:.2f} s; {len(ok)} llegan (|v| <= {args.arrive_tol_ms:g} m/s, "
+          f"a <= {args.arrive_tol_km:g} km) -> {args.output}")
+    if ok:
+        best = min(ok, key=lambda r: r["transfer_days"])
+        print(f"más rápida: diseño {best['design']} en {best['transfer_days']:.1f} días, "
+              f"margen de propelente {best['propellant_margin_kg']:.0f} kg ({best['propellant_margin_frac']:.1%})")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
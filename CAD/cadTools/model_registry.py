@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Registro de los modelos (macros) del repositorio y utilidades comunes:
+# carga por ruta, resolución de parámetros y sobrescrituras "KEY=valor".
+#
+# Cada modelo expone: DOC_NAME, P (parámetros por defecto), resolve_params(),
+# build(doc, params=None) -> (raíz, {nombre: objeto}) y main() para la GUI.
+
+import importlib.util
+import os
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.abspath(os.path.join(TOOLS_DIR, "..", ".."))
+
+# nombre -> (ruta relativa al repo, descripción)
+MODELS = {
+    "navefusion": ("CAD/cadTools/design/Measurements_automation.py", "Nave de fusión con masas/CG (NaveFusion)"),
+    "cubesat_hall": ("CAD/cadTools/design/SateliteStructure.py", "CubeSat 2U con micro propulsor Hall"),
+    "cubesat_pro": ("CubeSat_propulsion_structure/idea/PropulsMejora.py", "CubeSat 2U con propulsor iónico/Hall Pro"),
+    "fusion_propulsion": ("IMPexample.py", "Nave FusionPropulsion (reactor, truss, tanques)"),
+    "cubesat2u": ("Cubesat2/Important_freeCAD/Cubesat2U.py", "CubeSat 1U/2U con PCBs y resistojet"),
+}
+
+def model_path(name):
+    if name not in MODELS:
+        raise KeyError(f"Modelo desconocido: {name} (disponibles: {', '.join(MODELS)})")
+    return os.path.join(REPO_DIR, *MODELS[name][0].split("/"))
+
+def load_model(name):
+    # Importa la macro como módulo (sin ejecutar main); nombre = nombre del fichero
+    path = model_path(name)
+    mod_name = os.path.splitext(os.path.basename(path))[0]
+    mod = sys.modules.get(mod_name)
+    if mod is not None and os.path.abspath(getattr(mod, "__file__", "")) == path:
+        return mod
+    spec = importlib.util.spec_from_file_location(mod_name, path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[mod_name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+# -----------------------------
+# Parámetros
+# -----------------------------
+_TRUE = ("1", "true", "yes", "si", "sí", "on")
+
+def coerce(default, value):
+    # Convierte value al tipo del valor por defecto (los arrays pasan tal cual)
+    if getattr(value, "ndim", 0):
+        return value
+    if isinstance(default, bool):
+        return value.strip().lower() in _TRUE if isinstance(value, str) else bool(value)
+    if isinstance(default, int):
+        return int(float(value))
+    if isinstance(default, float) or default is None:
+        if value is None or (isinstance(value, str) and value.strip().lower() == "none"):
+            return None
+        return float(value)
+    if isinstance(default, str):
+        return str(value)
+    if isinstance(default, (list, tuple)):
+        items = value.split(",") if isinstance(value, str) else list(value)
+        kind = type(default[0]) if default else float
+        return [coerce(kind(), v) for v in items]
+    return value
+
+def resolve(defaults, params=None, model=""):
+    # Copia de los valores por defecto + sobrescrituras; admite claves "a.b"
+    # para diccionarios anidados (p. ej. "propulsion.tank_d")
+    p = {k: (dict(v) if isinstance(v, dict) else v) for k, v in defaults.items()}
+    for key, value in (params or {}).items():
+        target, ref, leaf = p, defaults, key
+        if "." in key:
+            head, leaf = key.split(".", 1)
+            if not isinstance(defaults.get(head), dict):
+                raise KeyError(f"Parámetro desconocido en {model or 'el modelo'}: {key}")
+            target, ref = p[head], defaults[head]
+        if leaf not in ref:
+            raise KeyError(f"Parámetro desconocido en {model or 'el modelo'}: {key}")
+        target[leaf] = coerce(ref[leaf], value)
+    return p
+
+def parse_overrides(items):
+    # ["KEY=valor", ...] -> {KEY: "valor"}
+    out = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Formato esperado KEY=valor: {item}")
+        out[key.strip()] = value.strip()
+    return out
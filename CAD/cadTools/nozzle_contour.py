@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Contornos de tobera (pared interior r(z)) con NumPy, sin OCC.
+#
+#   "legacy"   los 5 puntos de siempre (fracciones 0.22 / 0.35 / 0.70) que
+#              make_nozzle_revolve interpola con una B-spline
+#   "conical"  convergente y divergente rectos (polilínea)
+#   "bell"     campana de Rao (aproximación parabólica): arco de garganta
+#              0.382*Rt + Bézier cuadrática con los ángulos θn/θe de las
+#              curvas de Rao según la relación de áreas y la fracción de longitud
+#
+# El divergente se define por d_exit o por la relación de áreas eps = (d_exit/d_throat)^2.
+# Todas las funciones aceptan arrays de parámetros (N,) y devuelven (N, n):
+# miles de contornos por llamada para optimización. profile() memoriza el
+# contorno de un solo diseño; el constructor de revolución solo recibe esos puntos.
+# Unidades: mm; z = 0 en la entrada de la tobera.
+
+from functools import lru_cache
+
+import numpy as np
+
+KINDS = ("legacy", "conical", "bell")
+
+LEGACY_FRACS = (0.22, 0.35, 0.70)   # z/L de los puntos interiores del perfil original
+
+# Ángulos de Rao [grados] frente a eps (log) para campanas del 60, 80 y 90 %
+# de la longitud del cono de 15°
+_FRACS = np.array([0.6, 0.8, 0.9])
+_LOG_EPS = np.log([4.0, 10.0, 20.0, 50.0, 100.0])
+_THETA_N = np.radians([[26.0, 32.0, 35.0, 38.5, 40.0],
+                       [21.5, 26.0, 28.5, 32.0, 34.5],
+                       [19.0, 24.0, 26.5, 30.0, 32.0]])
+_THETA_E = np.radians([[20.5, 17.5, 16.0, 14.5, 14.0],
+                       [14.0, 11.0, 9.5, 8.0, 7.0],
+                       [12.0, 9.0, 7.5, 6.0, 5.0]])
+
+R_THROAT_UP = 1.5     # radio del arco convergente de garganta / Rt
+R_THROAT_DN = 0.382   # radio del arco divergente de garganta / Rt
+
+# -----------------------------
+# Relaciones básicas
+# -----------------------------
+def area_ratio(d_throat, d_exit):
+    return (np.asarray(d_exit, dtype=float) / np.asarray(d_throat, dtype=float)) ** 2
+
+def exit_diameter(d_throat, eps):
+    return np.asarray(d_throat, dtype=float) * np.sqrt(eps)
+
+def cone15_length(r_throat, r_exit):
+    # Longitud del divergente cónico de 15° (referencia de las campanas de Rao)
+    return (np.asarray(r_exit, dtype=float) - r_throat) / np.tan(np.radians(15.0))
+
+def rao_angles(eps, frac):
+    # (θn, θe) [rad] interpolados en log(eps) y en la fracción de longitud
+    eps = np.atleast_1d(np.asarray(eps, dtype=float))
+    frac = np.broadcast_to(np.clip(frac, _FRACS[0], _FRACS[-1]), eps.shape)
+    x = np.log(np.clip(eps, 4.0, 100.0))
+    tn = np.array([np.interp(x, _LOG_EPS, row) for row in _THETA_N])   # (3, N)
+    te = np.array([np.interp(x, _LOG_EPS, row) for row in _THETA_E])
+    i = np.clip(np.searchsorted(_FRACS, frac) - 1, 0, len(_FRACS) - 2)
+    w = (frac - _FRACS[i]) / (_FRACS[i + 1] - _FRACS[i])
+    cols = np.arange(eps.size)
+    return ((1 - w) * tn[i, cols] + w * tn[i + 1, cols],
+            (1 - w) * te[i, cols] + w * te[i + 1, cols])
+
+# -----------------------------
+# Tramos (arrays (N, n); z relativa a la garganta)
+# -----------------------------
+def _col(a, n_rows):
+    return np.broadcast_to(np.asarray(a, dtype=float), (n_rows,))[:, None]
+
+def _lerp(a, b, s):
+    return a + (b - a) * s
+
+def converging(r_in, r_th, L_c, n):
+    # Recta desde la entrada tangente a un arco de radio Ru hasta la garganta
+    # (z de -L_c a 0). Tangencia con pendiente α: (Ru - Δr)·cos α + L_c·sin α = Ru,
+    # Δr = r_in - r_th. Ru = 1.5*Rt salvo en convergentes cortos, donde se limita
+    # a L_c/2: así siempre hay solución con α < 90° y la recta conserva al menos
+    # la mitad de la longitud axial (z estrictamente creciente)
+    N = np.broadcast(r_in, r_th, L_c).shape
+    N = N[0] if N else 1
+    r_in, r_th, L_c = _col(r_in, N), _col(r_th, N), _col(L_c, N)
+    dr = r_in - r_th
+    Ru = np.minimum(R_THROAT_UP * r_th, 0.5 * L_c)
+    rho = np.hypot(Ru - dr, L_c)
+    alpha = np.arctan2(L_c, Ru - dr) - np.arccos(np.clip(Ru / np.maximum(rho, 1e-12), -1.0, 1.0))
+    alpha = np.clip(alpha, 0.0, np.pi / 2)
+    n_arc = max(n // 3, 2)
+    s = np.linspace(0.0, 1.0, n - n_arc + 1)[None, :]
+    a = -np.pi / 2 - alpha * (1.0 - s)
+    z_arc, r_arc = Ru * np.cos(a), Ru * np.sin(a) + Ru + r_th
+    t = np.linspace(0.0, 1.0, n_arc)[None, :-1]
+    z_line = _lerp(-L_c, z_arc[:, :1], t)
+    r_line = _lerp(r_in, r_arc[:, :1], t)
+    z, r = np.hstack([z_line, z_arc]), np.hstack([r_line, r_arc])
+    # Sin contracción (r_in <= Rt) no hay arco: convergente recto
+    flat = dr[:, 0] <= r_th[:, 0] * 1e-9
+    if flat.any():
+        zc, rc = conical(r_in[flat, 0], r_th[flat, 0], -L_c[flat, 0], 0.0, n)
+        z[flat], r[flat] = zc, rc
+    return z, r
+
+def conical(r_a, r_b, z_a, z_b, n):
+    N = np.broadcast(r_a, r_b, z_a, z_b).shape
+    N = N[0] if N else 1
+    t = np.linspace(0.0, 1.0, n)[None, :]
+    return _lerp(_col(z_a, N), _col(z_b, N), t), _lerp(_col(r_a, N), _col(r_b, N), t)
+
+def bell(r_th, r_ex, L_div, n):
+    # Campana de Rao de longitud L_div (frac = L_div / cono de 15°)
+    N = np.broadcast(r_th, r_ex, L_div).shape
+    N = N[0] if N else 1
+    r_th, r_ex, L_div = (np.broadcast_to(np.asarray(a, dtype=float), (N,)) for a in (r_th, r_ex, L_div))
+    eps = (r_ex / r_th) ** 2
+    frac = L_div / np.maximum(cone15_length(r_th, r_ex), 1e-12)
+    tn, te = rao_angles(eps, frac)
+    Rd = R_THROAT_DN * r_th
+    # Arco de garganta hasta el punto N (ángulo θn)
+    n_arc = max(n // 4, 2)
+    s = np.linspace(0.0, 1.0, n_arc)[None, :]
+    a = -np.pi / 2 + s * tn[:, None]
+    z_arc = Rd[:, None] * np.cos(a)
+    r_arc = Rd[:, None] * np.sin(a) + Rd[:, None] + r_th[:, None]
+    zN, rN = z_arc[:, -1], r_arc[:, -1]
+    # Bézier cuadrática N -> E con tangentes θn y θe
+    m1, m2 = np.tan(tn), np.tan(te)
+    c1, c2 = rN - m1 * zN, r_ex - m2 * L_div
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zQ = (c2 - c1) / (m1 - m2)
+    # Campanas muy cortas (fuera de las curvas de Rao): control recortado al
+    # tramo N-E sobre la tangente de salida de la garganta (pared monótona)
+    zQ = np.clip(np.nan_to_num(zQ, nan=L_div), zN, L_div)
+    rQ = np.clip(rN + m1 * (zQ - zN), rN, r_ex)
+    t = np.linspace(0.0, 1.0, n - n_arc + 1)[None, 1:]
+    u = 1.0 - t
+    z_b = u**2 * zN[:, None] + 2*u*t * zQ[:, None] + t**2 * L_div[:, None]
+    r_b = u**2 * rN[:, None] + 2*u*t * rQ[:, None] + t**2 * r_ex[:, None]
+    z, r = np.hstack([z_arc, z_b]), np.hstack([r_arc, r_b])
+    # Sin expansión o campana más corta que el arco: divergente cónico
+    flat = (r_ex <= r_th * (1.0 + 1e-9)) | (zN >= L_div)
+    if flat.any():
+        zc, rc = conical(r_th[flat], r_ex[flat], 0.0, L_div[flat], n)
+        z[flat], r[flat] = zc, rc
+    return z, r
+
+# -----------------------------
+# Contorno completo
+# -----------------------------
+def contours(kind, d_inlet, d_throat, d_exit, L, throat_frac=0.35, n=48):
+    # Lote de contornos: arrays (N,) -> (z, r) de forma (N, m). z = 0 en la entrada.
+    # "legacy" devuelve los 5 puntos de control originales (m = 5)
+    if kind not in KINDS:
+        raise ValueError(f"Contorno de tobera desconocido: {kind} (usa {', '.join(KINDS)})")
+    d_inlet, d_throat, d_exit, L = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float))
+                                                        for a in (d_inlet, d_throat, d_exit, L)))
+    r_in, r_th, r_ex = d_inlet / 2.0, d_throat / 2.0, d_exit / 2.0
+    if kind == "legacy":
+        f1, f2, f3 = LEGACY_FRACS
+        z = np.column_stack([0 * L, f1 * L, f2 * L, f3 * L, L])
+        r = np.column_stack([r_in, (r_in + r_th) * 0.6, r_th, (r_th + r_ex) * 0.5, r_ex])
+        return z, r
+    L_c = throat_frac * L
+    n_c = max(n * 2 // 5, 3)
+    if kind == "conical":
+        zc, rc = conical(r_in, r_th, -L_c, 0.0, n_c)
+        zd, rd = conical(r_th, r_ex, 0.0, L - L_c, n - n_c + 1)
+    else:
+        zc, rc = converging(r_in, r_th, L_c, n_c)
+        zd, rd = bell(r_th, r_ex, L - L_c, n - n_c + 1)
+    z = np.hstack([zc, zd[:, 1:]]) + L_c[:, None]
+    r = np.hstack([rc, rd[:, 1:]])
+    return z, r
+
+@lru_cache(maxsize=1024)
+def _profile(kind, d_inlet, d_throat, d_exit, L, throat_frac, n):
+    z, r = contours(kind, d_inlet, d_throat, d_exit, L, throat_frac, n)
+    pts = np.column_stack([r[0], z[0]])
+    pts.setflags(write=False)
+    return pts
+
+def profile(kind, d_inlet, d_throat, d_exit, L, throat_frac=0.35, n=48):
+    # Contorno memorizado de un diseño: array (m, 2) de (r, z), solo lectura
+    return _profile(kind, float(d_inlet), float(d_throat), float(d_exit), float(L),
+                    float(throat_frac), int(n))
+
+def wall_length(z, r):
+    # Longitud de la pared (m) de cada contorno; útil para masa/área
+    return np.hypot(np.diff(z, axis=-1), np.diff(r, axis=-1)).sum(axis=-1)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Grafo parámetro -> componente para reconstrucción incremental.
+# Cada constructor recibe un dict que anota las claves que lee; al cambiar
+# parámetros solo se reconstruyen los componentes que leyeron alguna de ellas.
+
+class TrackingParams(dict):
+    # dict que registra las claves consultadas
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = set()
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return super().get(key, default)
+
+class DependencyGraph:
+    def __init__(self):
+        self.deps = {}      # componente -> frozenset(claves de P)
+        self.values = {}    # valores de P con los que se construyó por última vez
+
+    def run(self, name, builder, p):
+        # Ejecuta el constructor registrando qué claves de p usa
+        tp = TrackingParams(p)
+        result = builder(tp)
+        self.deps[name] = frozenset(tp.reads)
+        for key in tp.reads:
+            self.values[key] = p[key]
+        return result
+
+    def changed_keys(self, p):
+        out = set()
+        for key, old in self.values.items():
+            new = p.get(key, old)
+            if not _same(old, new):
+                out.add(key)
+        return out
+
+    def dirty(self, changed):
+        # Componentes afectados por un conjunto de claves modificadas
+        changed = set(changed)
+        return [name for name, keys in self.deps.items() if keys & changed]
+
+    def readers(self, key):
+        return [name for name, keys in self.deps.items() if key in keys]
+
+    def describe(self):
+        return {name: sorted(keys) for name, keys in self.deps.items()}
+
+def _same(a, b):
+    try:
+        return bool(a == b)
+    except ValueError:
+        # arrays de NumPy
+        return a is b
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+# Barrido paramétrico de NaveFusion (Measurements_automation.py) en paralelo.
+# Cada proceso carga FreeCAD una sola vez y construye muchas variantes sin GUI
+# y, por defecto, sin documento (docless.py: solo formas y propiedades; --doc
+# crea y cierra un documento sin deshacer por variante). Cada fila guarda el
+# RSS estable y el pico de la variante; con un techo de memoria (--mem-ceiling
+# o MEM_CEILING_MB) el proceso que lo supera sale tras devolver su fila y se
+# reemplaza solo ese, antes de quedarse sin memoria.
+#
+# Ejemplo:
+#   python param_sweep.py --set RAD_LEN=2000:4000:5 --set TANK_D=800,1000,1200 -j 8 -o barrido.csv
+#   python param_sweep.py --set ... --store barrido.store --resume   # almacén columnar, reanudable
+#   python param_sweep.py --set ... --doc --mem-ceiling 3000         # recicla por encima de 3 GB
+#   python param_sweep.py --variants design/variants/navefusion_radiador.toml -j 8   # variants.py
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import wait as mp_wait
+
+import headless
+import memory
+import profiling
+from results_store import ResultsStore, ShardWriter, variant_key
+from variants import Variant, VariantError, applied, expand, flat, load as load_variants
+
+MODEL_MODULE = "Measurements_automation"
+MODEL_NAME = "navefusion"   # nombre en model_registry (ficheros de variantes)
+
+# -----------------------------
+# Especificación de rangos
+# -----------------------------
+def parse_values(text):
+    # "a:b:n" -> n valores equiespaciados; "a,b,c" -> lista; "a" -> valor fijo
+    if ":" in text:
+        start, stop, num = text.split(":")
+        start, stop, num = float(start), float(stop), int(num)
+        if num < 2:
+            return [start]
+        step = (stop - start) / (num - 1)
+        return [start + i * step for i in range(num)]
+    return [float(v) for v in text.split(",") if v.strip()]
+
+def parse_spec(items):
+    # ["KEY=valores", ...] -> {KEY: [valores]}
+    spec = {}
+    for item in items:
+        key, sep, values = item.partition("=")
+        if not sep:
+            raise ValueError(f"Formato esperado KEY=valores: {item}")
+        spec[key.strip()] = parse_values(values)
+    return spec
+
+def expand_grid(spec):
+    # Producto cartesiano de todos los rangos -> lista de dicts
+    keys = list(spec)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(spec[k] for k in keys))]
+
+def row_params(v):
+    # Columnas de parámetros de una variante (dict de P o Variant de variants.py)
+    return flat(v) if isinstance(v, Variant) else v
+
+# -----------------------------
+# Trabajador (proceso hijo)
+# -----------------------------
+_App = None
+_model = None
+_trace_dir = None
+_writer = None
+_use_doc = False
+
+def _init_worker(freecad_lib, trace_dir=None, store_dir=None, use_doc=False, flush_every=200):
+    global _App, _model, _trace_dir, _writer, _use_doc
+    _App = headless.load_freecad(freecad_lib)
+    _trace_dir = trace_dir
+    _use_doc = use_doc
+    if store_dir:
+        # Cada proceso escribe sus propios bloques; el último se vuelca al salir
+        _writer = ShardWriter(store_dir, flush_every)
+        multiprocessing.util.Finalize(_writer, _writer.flush, exitpriority=10)
+    headless.use_design_dir()
+    import importlib
+    _model = importlib.import_module(MODEL_MODULE)
+
+def _run_variant(index, v):
+    # v: dict de P o Variant (parámetros y tablas ya validados y en unidades del modelo)
+    values = row_params(v)
+    row = {"variant": index, "key": variant_key(values), "status": "ok", "error": ""}
+    params, tables = v, None
+    if isinstance(v, Variant):
+        row["name"] = v.name
+        params, tables = v.params, v.tables
+    row.update(values)
+    t0 = time.perf_counter()
+    doc = None
+    memory.reset_peak()
+    try:
+        if _use_doc:
+            doc = memory.batch_document(_App, f"Sweep_{os.getpid()}_{index}")
+        with applied(_model, tables):
+            if _trace_dir:
+                with profiling.tracing() as tracer:
+                    assembly, objs = _model.build(doc, params)
+                tracer.write(os.path.join(_trace_dir, f"variant_{index:05d}.json"))
+            else:
+                assembly, objs = _model.build(doc, params)
+            row.update(_model.summarize(assembly, objs))
+        assembly = objs = None   # nada de la variante sobrevive al cierre
+    except Exception as exc:
+        row["status"] = "error"
+        row["error"] = f"{type(exc).__name__}: {exc}"
+        row["traceback"] = traceback.format_exc()
+    finally:
+        row["peak_mb"] = memory.peak_mb()
+        row["rss_mb"] = memory.close_document(_App, doc)
+    row["build_s"] = time.perf_counter() - t0
+    if _writer is not None:
+        _writer.append(row)
+    return row
+
+# -----------------------------
+# Ejecución
+# -----------------------------
+def _new_pool(workers, freecad_lib, trace_dir=None, store_dir=None, use_doc=False, max_tasks=None):
+    # spawn: mismo comportamiento en Linux/Windows y sin heredar estado de OCC.
+    # max_tasks: variantes por proceso antes de reemplazarlo (Python >= 3.11)
+    ctx = multiprocessing.get_context("spawn")
+    extra = {"max_tasks_per_child": max_tasks} if max_tasks else {}
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                               initargs=(freecad_lib, trace_dir, store_dir, use_doc), **extra)
+
+def _crashed_row(index, v):
+    values = row_params(v)
+    row = {"variant": index, "key": variant_key(values), "status": "crashed",
+           "error": "el proceso de trabajo terminó de forma abrupta"}
+    if isinstance(v, Variant):
+        row["name"] = v.name
+    row.update(values)
+    return row
+
+def _stored_rows(store, variants, todo):
+    # Filas ya guardadas de las variantes que no se repiten (reanudación)
+    keys = {variant_key(row_params(v)): i for i, v in enumerate(variants) if i not in todo}
+    rows = {}
+    for row in store.to_rows(where={"key": set(keys), "status": "ok"}):
+        i = keys[row["key"]]
+        rows[i] = dict(row, variant=i)
+    return rows
+
+def _worker_loop(conn, init_args, ceiling=None, max_tasks=None):
+    # Proceso de trabajo con reciclado propio: tras devolver la fila sale si su
+    # RSS supera el techo ("memory") o si ya construyó max_tasks variantes
+    # ("tasks"); el padre reemplaza solo ese proceso
+    _init_worker(*init_args)
+    count = 0
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        row = _run_variant(*task)
+        count += 1
+        reason = ("memory" if memory.over_ceiling(ceiling, row.get("rss_mb") or 0.0) else
+                  "tasks" if max_tasks and count >= max_tasks else None)
+        conn.send((row, reason))
+        if reason:
+            break
+    conn.close()
+
+def _spawn_worker(ctx, init_args, ceiling, max_tasks):
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_worker_loop, args=(child, init_args, ceiling, max_tasks))
+    proc.start()
+    child.close()
+    return parent, proc
+
+def _run_pooled(variants, todo, rows, workers, pool_args, ceiling=None, progress=None):
+    # Un proceso por trabajador con su tubería y una variante en vuelo. El que
+    # supera el techo (o max_tasks) sale tras devolver su fila y solo él se
+    # reemplaza: los demás conservan FreeCAD y el modelo cargados. Devuelve las
+    # variantes que estaban en vuelo en un proceso que murió.
+    ctx = multiprocessing.get_context("spawn")
+    *init_args, max_tasks = pool_args
+    pending = list(reversed(todo))
+    live = {}        # conexión -> [proceso, variante en vuelo o None]
+    suspects = []
+    recycles = 0
+
+    def retire(conn):
+        proc, _ = live.pop(conn)
+        conn.close()
+        proc.join()
+
+    try:
+        while pending or any(i is not None for _, i in live.values()):
+            while pending and len(live) < workers:
+                conn, proc = _spawn_worker(ctx, init_args, ceiling, max_tasks)
+                live[conn] = [proc, None]
+            for conn, entry in list(live.items()):
+                if entry[1] is None and pending:
+                    i = pending.pop()
+                    try:
+                        conn.send((i, variants[i]))
+                    except OSError:
+                        pending.append(i)   # murió estando libre: se reemplaza
+                        retire(conn)
+                        continue
+                    entry[1] = i
+            busy = {conn: entry for conn, entry in live.items() if entry[1] is not None}
+            if not busy:
+                continue
+            ready = set(mp_wait(list(busy) + [proc.sentinel for proc, _ in busy.values()]))
+            for conn, (proc, i) in busy.items():
+                if conn in ready:
+                    try:
+                        row, reason = conn.recv()
+                    except (EOFError, OSError):
+                        suspects.append(i)
+                        retire(conn)
+                        continue
+                    rows[i] = row
+                    live[conn][1] = None
+                    if reason:
+                        recycles += reason == "memory"
+                        retire(conn)
+                    if progress:
+                        progress(row)
+                elif proc.sentinel in ready:
+                    suspects.append(i)
+                    retire(conn)
+    finally:
+        for conn, (proc, i) in live.items():
+            if i is None:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+            else:
+                proc.terminate()   # interrumpido a mitad de una variante
+        for conn in list(live):
+            retire(conn)
+    if recycles:
+        print(f"{recycles} procesos reciclados por el techo de memoria", file=sys.stderr)
+    return suspects
+
+def run_sweep(variants, workers=None, freecad_lib=None, progress=None, trace_dir=None,
+              store_dir=None, resume=False, use_doc=False, ceiling=None, max_tasks=None):
+    # Devuelve una fila por variante (en orden); un fallo no detiene el lote.
+    # variants: dicts de P o Variant (variants.py: parámetros y tablas del modelo)
+    # trace_dir: una traza JSON de operaciones OCC por variante (profiling.py)
+    # store_dir: almacén columnar (results_store.py) escrito por los procesos;
+    # con resume las variantes ya guardadas con status "ok" no se repiten.
+    # use_doc: construye en un documento por variante (por defecto solo formas)
+    # ceiling: techo de RSS por proceso [MB] (por defecto MEM_CEILING_MB)
+    # max_tasks: recicla cada proceso tras ese número de variantes
+    workers = workers or os.cpu_count() or 1
+    if trace_dir:
+        os.makedirs(trace_dir, exist_ok=True)
+    rows = {}
+    todo = list(range(len(variants)))
+    if store_dir and resume:
+        store = ResultsStore(store_dir)
+        done = store.done_keys()
+        todo = [i for i, v in enumerate(variants) if variant_key(row_params(v)) not in done]
+        rows.update(_stored_rows(store, variants, set(todo)))
+
+    pool_args = (freecad_lib, trace_dir, store_dir, use_doc, max_tasks)
+    suspects = _run_pooled(variants, todo, rows, workers, pool_args, ceiling, progress)
+
+    # La variante de un proceso caído se repite sola en un proceso aparte:
+    # si vuelve a tumbarlo se marca como "crashed".
+    pool = None
+    for i in sorted(suspects):
+        if pool is None:
+            pool = _new_pool(1, *pool_args)
+        try:
+            rows[i] = pool.submit(_run_variant, i, variants[i]).result()
+        except BrokenProcessPool:
+            rows[i] = _crashed_row(i, variants[i])
+            if store_dir:
+                with ShardWriter(store_dir) as w:
+                    w.append(rows[i])
+            pool.shutdown(wait=False)
+            pool = None
+        if progress:
+            progress(rows[i])
+    if pool is not None:
+        pool.shutdown()
+
+    return [rows[i] for i in range(len(variants))]
+
+def write_csv(rows, path):
+    # Columnas: variante, parámetros, totales y masas por pieza
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns and key != "traceback":
+                columns.append(key)
+    part_mass = (".Mass_geom_kg", ".Mass_occ_kg")
+    fixed = [c for c in columns if not c.endswith(part_mass)]
+    parts = sorted(c for c in columns if c.endswith(part_mass))
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fixed + parts, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Barrido paramétrico headless de NaveFusion")
+    ap.add_argument("--set", dest="sets", action="append", default=[], metavar="KEY=VALORES",
+                    help="rango 'a:b:n' o lista 'a,b,c' para una clave de P (repetible)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    ap.add_argument("-o", "--output", default="sweep_results.csv")
+    ap.add_argument("--freecad-lib", default=None, help="carpeta lib de FreeCAD")
+    ap.add_argument("--fillet-mode", choices=("full", "chamfer", "none"), default=None,
+                    help="modo de redondeo en los procesos (FILLET_MODE); chamfer/none = borrador")
+    ap.add_argument("--lod", choices=("full", "preview"), default=None,
+                    help="nivel de detalle en los procesos (CAD_LOD)")
+    ap.add_argument("--trace", default=None, metavar="DIR", help="guarda una traza de operaciones OCC por variante")
+    ap.add_argument("--store", default=None, metavar="DIR", help="almacén columnar de resultados (results_store.py)")
+    ap.add_argument("--resume", action="store_true", help="con --store, no repite las variantes ya terminadas")
+    ap.add_argument("--variants", default=None, metavar="TOML|JSON",
+                    help="fichero de variantes (variants.py); --set barre además sobre cada una")
+    ap.add_argument("--doc", action="store_true", help="construye cada variante en un documento FreeCAD")
+    ap.add_argument("--mem-ceiling", type=float, default=None, metavar="MB",
+                    help="recicla el proceso cuyo RSS tras una variante supera este valor (MEM_CEILING_MB)")
+    ap.add_argument("--max-tasks", type=int, default=None, metavar="N",
+                    help="reemplaza cada proceso tras N variantes")
+    args = ap.parse_args(argv)
+    if args.resume and not args.store:
+        ap.error("--resume necesita --store")
+
+    if args.fillet_mode:
+        os.environ["FILLET_MODE"] = args.fillet_mode  # lo heredan los procesos (spawn)
+    if args.lod:
+        os.environ["CAD_LOD"] = args.lod
+
+    headless.use_design_dir()
+    import importlib
+    model = importlib.import_module(MODEL_MODULE)
+
+    spec = parse_spec(args.sets)
+    unknown = [k for k in spec if k not in model.P]
+    if unknown:
+        ap.error(f"claves desconocidas en P: {', '.join(unknown)}")
+    if args.variants:
+        try:
+            variants = load_variants(args.variants)
+        except VariantError as exc:
+            ap.error(f"fichero de variantes no válido:\n{exc}")
+        if any(v.model != MODEL_NAME for v in variants):
+            ap.error(f"el barrido es de {MODEL_NAME}; el fichero es de {variants[0].model}")
+        variants = expand(variants, spec)
+    else:
+        variants = expand_grid(spec)
+
+    done = [0]
+    def progress(row):
+        done[0] += 1
+        print(f"[{done[0]}/{len(variants)}] variante {row['variant']}: {row['status']}", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    rows = run_sweep(variants, workers=args.workers, freecad_lib=args.freecad_lib, progress=progress,
+                     trace_dir=args.trace, store_dir=args.store, resume=args.resume,
+                     use_doc=args.doc, ceiling=args.mem_ceiling, max_tasks=args.max_tasks)
+    wall = time.perf_counter() - t0
+    write_csv(rows, args.output)
+
+    failed = sum(1 for r in rows if r["status"] != "ok")
+    print(f"{len(rows)} variantes en {wall:.1f} s ({len(rows) / wall:.2f} var/s), {failed} con error -> {args.output}")
+    peaks = [r["peak_mb"] for r in rows if r.get("peak_mb")]
+    if peaks:
+        print(f"memoria por proceso: pico {max(peaks):.0f} MB, RSS estable máx. "
+              f"{max(r.get('rss_mb') or 0.0 for r in rows):.0f} MB")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+# Instrumentación de las operaciones OCC del proyecto.
+#
+# - Tiempos por etapa de modelado (primitive, cut, fuse, fillet, document,
+#   properties, recompute, export), usados por benchmark.py:
+#       with profiling.recording() as timer: model.build(doc)
+#       timer.totals -> {etapa: [llamadas, segundos propios]}
+# - Traza por secciones con nombre ("3) Bus, bulkhead y tubo central"...):
+#   llamadas, tiempo y caras/aristas del resultado de cada operación.
+#       with profiling.tracing() as tracer: model.build(doc)
+#       tracer.write("traza.json")     # Chrome/Perfetto (chrome://tracing)
+#       tracer.write("traza.folded")   # flamegraph.pl / speedscope
+# - Memoria (RSS de entrada/salida y pico) por las mismas secciones (memory.py):
+#       with profiling.memory_tracking() as mem: model.build(doc)
+#
+# Desactivado por defecto: section()/stage() devuelven un contexto nulo
+# compartido y cada envoltura solo comprueba dos globales antes de llamar
+# directamente a OCC, así que puede quedarse en el código de producción.
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+STAGES = ("primitive", "cut", "fuse", "fillet", "document", "properties", "recompute", "export")
+
+# Funciones de Part que crean primitivas (se envuelven solo mientras se mide)
+PRIMITIVES = ("makeBox", "makeCylinder", "makeCone", "makeTorus", "makeSphere", "makePolygon")
+
+_timer = None    # StageTimer activo
+_tracer = None   # Tracer activo
+_memory = None   # MemoryTracker activo (memory.py)
+
+# -----------------------------
+# Tiempos por etapa
+# -----------------------------
+class StageTimer:
+    def __init__(self):
+        self.totals = {}   # etapa -> [llamadas, segundos propios]
+        self._stack = []   # [etapa, t0, segundos en etapas anidadas]
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, t0, nested = self._stack.pop()
+        dt = time.perf_counter() - t0
+        entry = self.totals.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += dt - nested   # tiempo propio (sin etapas anidadas)
+        if self._stack:
+            self._stack[-1][2] += dt
+
+    def report(self):
+        lines = [f"{'etapa':<12}{'llamadas':>9}{'s':>10}"]
+        for name, (calls, secs) in sorted(self.totals.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<12}{calls:>9}{secs:>10.3f}")
+        return "\n".join(lines)
+
+# -----------------------------
+# Traza por secciones
+# -----------------------------
+def _topology(result):
+    # (caras, aristas) del resultado; None si no es una forma
+    try:
+        return len(result.Faces), len(result.Edges)
+    except Exception:
+        return None, None
+
+class Tracer:
+    def __init__(self, topology=True):
+        self.topology = topology
+        self.t0 = time.perf_counter()
+        self.ops = []        # (ruta de secciones, op, inicio, duración, caras, aristas)
+        self.sections = []   # (ruta de secciones, inicio, duración)
+        self._stack = []
+
+    def push(self, name):
+        self._stack.append((name, time.perf_counter()))
+
+    def pop(self):
+        start = self._stack[-1][1]
+        path = tuple(n for n, _ in self._stack)
+        self._stack.pop()
+        self.sections.append((path, start, time.perf_counter() - start))
+
+    def record(self, op, start, dt, result):
+        faces, edges = _topology(result) if self.topology else (None, None)
+        self.ops.append((tuple(n for n, _ in self._stack), op, start, dt, faces, edges))
+
+    def summary(self):
+        # {sección: {op: {calls, s, faces, edges}}}; sección raíz = "(global)"
+        out = {}
+        for path, op, _, dt, faces, edges in self.ops:
+            entry = out.setdefault(" / ".join(path) or "(global)", {}).setdefault(
+                op, {"calls": 0, "s": 0.0, "faces": 0, "edges": 0})
+            entry["calls"] += 1
+            entry["s"] += dt
+            entry["faces"] += faces or 0
+            entry["edges"] += edges or 0
+        return out
+
+    def chrome_trace(self):
+        # Formato "Trace Event" (eventos completos ph=X, tiempos en µs)
+        pid = os.getpid()
+        events = []
+        for path, start, dt in self.sections:
+            events.append({"name": path[-1], "cat": "section", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": (start - self.t0) * 1e6, "dur": dt * 1e6})
+        for path, op, start, dt, faces, edges in self.ops:
+            events.append({"name": op, "cat": "occ", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": (start - self.t0) * 1e6, "dur": dt * 1e6,
+                           "args": {"section": " / ".join(path), "faces": faces, "edges": edges}})
+        events.sort(key=lambda e: (e["ts"], -e["dur"]))
+        return {"traceEvents": events, "displayTimeUnit": "ms", "summary": self.summary()}
+
+    def folded(self):
+        # Pilas plegadas "sec;subsec;op µs" (tiempo propio de cada nodo)
+        total = {}
+        for path, _, dt in self.sections:
+            total[path] = total.get(path, 0.0) + dt
+        own = dict(total)
+        for path, dt in total.items():
+            if len(path) > 1 and path[:-1] in own:
+                own[path[:-1]] -= dt
+        for path, op, _, dt, _, _ in self.ops:
+            key = path + (op,)
+            own[key] = own.get(key, 0.0) + dt
+            if path in own:
+                own[path] -= dt
+        lines = []
+        for path, secs in sorted(own.items()):
+            us = int(round(secs * 1e6))
+            if us > 0:
+                lines.append(";".join(p.replace(";", ",") for p in path) + f" {us}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        if os.path.splitext(path)[1].lower() in (".folded", ".txt"):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.folded())
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f)
+        return path
+
+    def report(self):
+        lines = [f"{'sección / op':<48}{'llamadas':>9}{'s':>9}{'caras':>8}{'aristas':>9}"]
+        for section, ops in self.summary().items():
+            lines.append(section)
+            for op, st in sorted(ops.items(), key=lambda kv: -kv[1]["s"]):
+                lines.append(f"  {op:<46}{st['calls']:>9}{st['s']:>9.3f}{st['faces']:>8}{st['edges']:>9}")
+        return "\n".join(lines)
+
+# -----------------------------
+# Contextos (nulos si no se mide)
+# -----------------------------
+class _NullContext:
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullContext()
+
+class _Stage:
+    __slots__ = ("timer", "name")
+    def __init__(self, timer, name):
+        self.timer, self.name = timer, name
+    def __enter__(self):
+        self.timer.enter(self.name)
+        return self
+    def __exit__(self, *exc):
+        self.timer.exit()
+        return False
+
+class _Section:
+    __slots__ = ("tracer", "memory", "name")
+    def __init__(self, tracer, memory, name):
+        self.tracer, self.memory, self.name = tracer, memory, name
+    def __enter__(self):
+        if self.tracer is not None:
+            self.tracer.push(self.name)
+        if self.memory is not None:
+            self.memory.push(self.name)
+        return self
+    def __exit__(self, *exc):
+        if self.memory is not None:
+            self.memory.pop()
+        if self.tracer is not None:
+            self.tracer.pop()
+        return False
+
+def stage(name):
+    timer = _timer
+    return _NULL if timer is None else _Stage(timer, name)
+
+def section(name):
+    tracer, memory = _tracer, _memory
+    if tracer is None and memory is None:
+        return _NULL
+    return _Section(tracer, memory, name)
+
+def enabled():
+    return _timer is not None or _tracer is not None
+
+def timed_call(stage_name, op, fn, *args, **kwargs):
+    # Llama fn(*args) registrando etapa y operación si hay medición activa
+    timer, tracer = _timer, _tracer
+    if timer is None and tracer is None:
+        return fn(*args, **kwargs)
+    if timer is not None:
+        timer.enter(stage_name)
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        dt = time.perf_counter() - start
+        if timer is not None:
+            timer.exit()
+    if tracer is not None:
+        tracer.record(op, start, dt, result)
+    return result
+
+def _wrap_primitive(name, fn):
+    def wrapper(*args, **kwargs):
+        return timed_call("primitive", name, fn, *args, **kwargs)
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+@contextmanager
+def _patched_primitives(enabled=True):
+    # Envuelve Part.make* mientras dura el contexto (solo si no lo estaban ya)
+    patched = {}
+    Part = None
+    if enabled:
+        try:
+            import Part
+        except ImportError:
+            Part = None
+    for name in PRIMITIVES if Part is not None else ():
+        fn = getattr(Part, name, None)
+        if fn is not None and not hasattr(fn, "__wrapped__"):
+            patched[name] = fn
+            setattr(Part, name, _wrap_primitive(name, fn))
+    try:
+        yield
+    finally:
+        for name, fn in patched.items():
+            setattr(Part, name, fn)
+
+@contextmanager
+def recording(primitives=True):
+    # Activa los tiempos por etapa
+    global _timer
+    prev, timer = _timer, StageTimer()
+    with _patched_primitives(primitives):
+        _timer = timer
+        try:
+            yield timer
+        finally:
+            _timer = prev
+
+@contextmanager
+def tracing(primitives=True, topology=True):
+    # Activa la traza por secciones (topology=False evita contar caras/aristas)
+    global _tracer
+    prev, tracer = _tracer, Tracer(topology)
+    with _patched_primitives(primitives):
+        _tracer = tracer
+        try:
+            yield tracer
+        finally:
+            _tracer = prev
+
+@contextmanager
+def memory_tracking():
+    # Activa el registro de memoria por secciones (no envuelve primitivas)
+    global _memory
+    import memory
+    prev, tracker = _memory, memory.MemoryTracker()
+    _memory = tracker
+    try:
+        yield tracker
+    finally:
+        _memory = prev
+
+# -----------------------------
+# Envolturas de operaciones OCC
+# -----------------------------
+def cut(shape, tool):
+    if _timer is None and _tracer is None:
+        return shape.cut(tool)
+    return timed_call("cut", "cut", shape.cut, tool)
+
+def fuse(shape, tool):
+    if _timer is None and _tracer is None:
+        return shape.fuse(tool)
+    return timed_call("fuse", "fuse", shape.fuse, tool)
+
+def fillet(shape, radius, edges=None):
+    edges = shape.Edges if edges is None else edges
+    if _timer is None and _tracer is None:
+        return shape.makeFillet(radius, edges)
+    return timed_call("fillet", "makeFillet", shape.makeFillet, radius, edges)
+
+def revolve(shape, base, axis, angle=360.0):
+    if _timer is None and _tracer is None:
+        return shape.revolve(base, axis, angle)
+    return timed_call("primitive", "revolve", shape.revolve, base, axis, angle)
+
+def _add_feature(doc, shape, name):
+    obj = doc.addObject("Part::Feature", name)
+    obj.Shape = shape
+    return obj
+
+def add_feature(doc, shape, name):
+    if _timer is None and _tracer is None:
+        return _add_feature(doc, shape, name)
+    return timed_call("document", "addObject", _add_feature, doc, shape, name)
+
+def recompute(doc):
+    return timed_call("recompute", "recompute", doc.recompute)
+
+def export(objs, path):
+    import Part
+    import docless
+    objs = list(objs)
+    if any(docless.is_component(o) for o in objs):
+        return timed_call("export", "export", docless.export, objs, path)
+    timed_call("export", "export", Part.export, objs, path)
+    return path
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Dimensionado térmico de radiadores (Stefan–Boltzmann) con NumPy.
+#
+# Flujo neto por cara:   q = ε·σ·η_aleta·(T_rad^4 - T_sumidero^4)   [W/m^2]
+# Área de panel:         A = Q_residual / (caras · q)                [m^2]
+# Todas las funciones hacen broadcast: millones de puntos de operación por
+# llamada. size() devuelve directamente las cotas del panel (mm) para que
+# los modelos (make_radiator, build_radiator) las usen sin iterar geometría.
+
+import numpy as np
+
+SIGMA = 5.670374419e-8   # [W/m^2/K^4]
+
+# Conductividad [W/m/K] para la eficiencia de aleta (materiales de los modelos)
+CONDUCTIVITY = {"Al": 167.0, "Al7075": 130.0, "AlLi": 88.0, "Ti": 21.9, "Cu": 390.0, "CFRP": 50.0,
+                "Graphite": 150.0, "W": 173.0, "Inconel": 11.4, "B4C": 30.0}
+
+def _f(x):
+    return np.asarray(x, dtype=float)
+
+def net_flux(T_rad, T_sink=4.0, emissivity=0.85, fin_eff=1.0):
+    # Potencia neta emitida por m^2 de una cara [W/m^2]
+    return _f(emissivity) * SIGMA * _f(fin_eff) * (_f(T_rad) ** 4 - _f(T_sink) ** 4)
+
+def material_conductivity(material):
+    if material not in CONDUCTIVITY:
+        raise KeyError(f"Conductividad desconocida: {material} (disponibles: {', '.join(CONDUCTIVITY)})")
+    return CONDUCTIVITY[material]
+
+def fin_efficiency(thickness_mm, half_width_mm, T_rad, emissivity=0.85, conductivity=167.0, sides=2):
+    # Aleta radiante recta entre tubos de calor (linealizada): η = tanh(mL)/(mL),
+    # m^2 = caras·h_rad/(k·t) con h_rad = 4·ε·σ·T^3
+    t = _f(thickness_mm) * 1e-3
+    L = _f(half_width_mm) * 1e-3
+    h_rad = 4.0 * _f(emissivity) * SIGMA * _f(T_rad) ** 3
+    mL = np.sqrt(sides * h_rad / (_f(conductivity) * t)) * L
+    return np.where(mL > 1e-9, np.tanh(mL) / np.where(mL > 1e-9, mL, 1.0), 1.0)
+
+def area(Q_W, T_rad, T_sink=4.0, emissivity=0.85, fin_eff=1.0, sides=2):
+    # Área de panel necesaria [m^2] (sides = caras que radian)
+    q = net_flux(T_rad, T_sink, emissivity, fin_eff) * sides
+    return np.where(q > 0.0, _f(Q_W) / np.where(q > 0.0, q, 1.0), np.inf)
+
+def rejection(area_m2, T_rad, T_sink=4.0, emissivity=0.85, fin_eff=1.0, sides=2):
+    # Potencia que evacua un panel de área dada [W]
+    return _f(area_m2) * sides * net_flux(T_rad, T_sink, emissivity, fin_eff)
+
+def panel_mass(area_m2, thickness_mm, density, areal_extra=0.0):
+    # Masa del panel [kg]: chapa + masa por área adicional (tubos, recubrimiento) [kg/m^2]
+    return _f(area_m2) * (_f(thickness_mm) * 1e-3 * _f(density) + _f(areal_extra))
+
+def panel_dims(area_mm2, width, max_len=None):
+    # (largo, ancho) [mm] con ancho fijo; si el largo supera max_len se ensancha
+    L = _f(area_mm2) / _f(width)
+    W = np.zeros_like(L) + _f(width)
+    if max_len is not None:
+        over = L > max_len
+        W = np.where(over, _f(area_mm2) / max_len, W)
+        L = np.where(over, max_len, L)
+    return L, W
+
+def size(Q_W, T_rad, width, T_sink=4.0, emissivity=0.85, fin_eff=1.0, sides=2, n_panels=1,
+         max_len=None, thickness_mm=None, density=None):
+    # Dimensiona n_panels iguales para evacuar Q_W.
+    # Devuelve {"length_mm", "width_mm", "area_m2" (por panel), "flux_Wm2", "mass_kg" (total)}
+    A = area(_f(Q_W) / n_panels, T_rad, T_sink, emissivity, fin_eff, sides)
+    L, W = panel_dims(A * 1e6, width, max_len)
+    out = {"length_mm": L, "width_mm": W, "area_m2": A, "flux_Wm2": net_flux(T_rad, T_sink, emissivity, fin_eff)}
+    if thickness_mm is not None and density is not None:
+        out["mass_kg"] = n_panels * panel_mass(A, thickness_mm, density)
+    return out
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# Almacén columnar de resultados de barridos (10^5+ variantes).
+#
+# Un almacén es una carpeta:
+#   shards/<pid>-<n>-<rand>.npz|.parquet   bloques escritos por cada proceso
+#                                          (una columna por parámetro/resultado)
+#   columns-<rand>/<columna>.npy           columnas compactadas (se leen con memmap)
+#   columns.json                           carpeta de columnas vigente y bloques
+#                                          que ya contiene
+# Cada proceso escribe sus propios bloques (sin bloqueos entre procesos) con
+# escritura atómica; un bloque a medio escribir nunca es visible. La
+# compactación escribe una carpeta de columnas nueva y la activa con un solo
+# os.replace de columns.json: una compactación interrumpida no deja columnas
+# de distinta longitud ni filas repetidas. Las consultas solo cargan las
+# columnas pedidas.
+# La columna "key" (hash de los parámetros) permite reanudar un barrido: las
+# variantes con status "ok" ya guardadas no se repiten.
+#
+#   store = ResultsStore("barrido.store")
+#   rows = store.select(["RAD_LEN", "TotalGeomMass_kg"], where={"status": "ok", "RAD_LEN": (2000, 3000)})
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+SHARD_DIR = "shards"
+COLUMN_DIR = "columns"
+MANIFEST = "columns.json"
+FORMATS = ("npz", "parquet")
+
+def _canonical(value):
+    # Números como float (2000 y 2000.0 dan la misma clave); bool se conserva
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    return value
+
+def variant_key(params):
+    # Identificador estable de una variante (independiente del orden del barrido)
+    text = json.dumps(_canonical(params), sort_keys=True, default=float)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def _parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+def _column(values):
+    # Lista de valores -> array NumPy sin objetos (float, bool o texto).
+    # Un bool con huecos pasa a float (1.0 / 0.0 / NaN): False no es "sin dato"
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, (bool, np.bool_)) for v in present):
+        if len(present) == len(values):
+            return np.array(values, dtype=bool)
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+    if all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) for v in present):
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    return np.array(["" if v is None else str(v) for v in values], dtype=str)
+
+def _empty_like(arr, n):
+    if arr.dtype.kind in "fb":
+        return np.full(n, np.nan)
+    return np.full(n, "", dtype=arr.dtype)
+
+def _concat(parts, n_rows):
+    # Columnas de varios bloques; las que faltan en un bloque se rellenan (NaN / "").
+    # Una columna bool incompleta (o mezclada con float) pasa a float con NaN
+    ref = next(a for a in parts if a is not None)
+    arrays = [a if a is not None else _empty_like(ref, n) for a, n in zip(parts, n_rows)]
+    if any(a.dtype.kind == "b" for a in arrays) and any(a.dtype.kind == "f" for a in arrays):
+        arrays = [a.astype(float) if a.dtype.kind == "b" else a for a in arrays]
+    if any(a.dtype.kind in "US" for a in arrays) and any(a.dtype.kind not in "US" for a in arrays):
+        arrays = [a.astype(str) for a in arrays]
+    return np.concatenate(arrays) if len(arrays) > 1 else np.asarray(arrays[0])
+
+# -----------------------------
+# Escritura
+# -----------------------------
+class ShardWriter:
+    # Acumula filas y escribe un bloque cada flush_every filas (y en flush())
+    def __init__(self, root, flush_every=1000, fmt="npz"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt} (usa {', '.join(FORMATS)})")
+        if fmt == "parquet" and _parquet() is None:
+            fmt = "npz"   # sin pyarrow
+        self.dir = os.path.join(root, SHARD_DIR)
+        os.makedirs(self.dir, exist_ok=True)
+        self.flush_every = flush_every
+        self.fmt = fmt
+        self.rows = []
+        self.count = 0
+
+    def append(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return None
+        columns = []
+        for row in self.rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        data = {c: _column([row.get(c) for row in self.rows]) for c in columns}
+        name = f"{os.getpid()}-{self.count:05d}-{uuid.uuid4().hex[:8]}.{self.fmt}"
+        path = os.path.join(self.dir, name)
+        tmp = os.path.join(self.dir, f".{name}.tmp")
+        if self.fmt == "parquet":
+            pa = _parquet()
+            pa.parquet.write_table(pa.table(data), tmp)
+        else:
+            with open(tmp, "wb") as f:
+                np.savez(f, **data)
+        os.replace(tmp, path)
+        self.rows = []
+        self.count += 1
+        return path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+# -----------------------------
+# Lectura y consultas
+# -----------------------------
+class ResultsStore:
+    def __init__(self, root):
+        self.root = root
+
+    def writer(self, flush_every=1000, fmt="npz"):
+        return ShardWriter(self.root, flush_every, fmt)
+
+    def _manifest(self):
+        # {"dir": carpeta de columnas vigente, "shards": bloques ya compactados}
+        try:
+            with open(os.path.join(self.root, MANIFEST), encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {"dir": None, "shards": []}
+
+    def shards(self):
+        # Bloques pendientes; los que ya están en las columnas (compactación
+        # interrumpida antes de borrarlos) no se vuelven a leer
+        done = set(self._manifest()["shards"])
+        paths = (glob.glob(os.path.join(self.root, SHARD_DIR, "*.npz")) +
+                 glob.glob(os.path.join(self.root, SHARD_DIR, "*.parquet")))
+        return sorted(p for p in paths if os.path.basename(p) not in done)
+
+    def _compacted(self):
+        col_dir = self._manifest()["dir"]
+        if col_dir is None:
+            return {}
+        return {os.path.splitext(os.path.basename(p))[0]: p
+                for p in glob.glob(os.path.join(self.root, col_dir, "*.npy"))}
+
+    def _shard_columns(self, path, columns):
+        # {columna: array} de un bloque (solo las pedidas) y su número de filas
+        if path.endswith(".parquet"):
+            pq = _parquet().parquet
+            names = pq.read_schema(path).names
+            table = pq.read_table(path, columns=[c for c in names if columns is None or c in columns])
+            return {c: table.column(c).to_numpy(zero_copy_only=False) for c in table.column_names}, \
+                pq.read_metadata(path).num_rows
+        with np.load(path) as npz:
+            names = [c for c in npz.files if columns is None or c in columns]
+            out = {c: npz[c] for c in names}
+            n = len(npz[npz.files[0]]) if npz.files else 0
+        return out, n
+
+    def columns(self):
+        names = set(self._compacted())
+        for path in self.shards():
+            if path.endswith(".parquet"):
+                names.update(_parquet().parquet.read_schema(path).names)
+            else:
+                with np.load(path) as npz:
+                    names.update(npz.files)
+        return sorted(names)
+
+    def load(self, columns=None, shards=None):
+        # {columna: array}; las compactadas se abren con memmap (sin leer el fichero entero)
+        compacted = self._compacted()
+        blocks, sizes = [], []
+        if compacted:
+            wanted = [c for c in compacted if columns is None or c in columns]
+            base = {c: np.load(compacted[c], mmap_mode="r") for c in wanted}
+            n = len(np.load(next(iter(compacted.values())), mmap_mode="r"))
+            blocks.append(base)
+            sizes.append(n)
+        for path in self.shards() if shards is None else shards:
+            data, n = self._shard_columns(path, columns)
+            blocks.append(data)
+            sizes.append(n)
+        names = columns or sorted({c for b in blocks for c in b})
+        out = {}
+        for c in names:
+            parts = [b.get(c) for b in blocks]
+            if any(p is not None for p in parts):
+                out[c] = _concat(parts, sizes)
+        return out
+
+    def __len__(self):
+        cols = self.load(["status"]) or self.load()
+        return len(next(iter(cols.values()))) if cols else 0
+
+    def select(self, columns=None, where=None):
+        # where: {columna: valor | (mín, máx) | [valores]} o función(cols) -> máscara.
+        # Rangos cerrados; None en un extremo = abierto. Con una función se cargan
+        # todas las columnas
+        conds = where if isinstance(where, dict) else {}
+        need = None if columns is None or callable(where) else sorted(set(columns) | set(conds))
+        data = self.load(need)
+        if not data:
+            return {}
+        n = len(next(iter(data.values())))
+        mask = np.ones(n, dtype=bool)
+        if callable(where):
+            mask &= np.asarray(where(data), dtype=bool)
+        for col, cond in conds.items():
+            if col not in data:
+                return {c: v[:0] for c, v in data.items()}
+            x = data[col]
+            if isinstance(cond, tuple):
+                lo, hi = cond
+                if lo is not None:
+                    mask &= x >= lo
+                if hi is not None:
+                    mask &= x <= hi
+            elif isinstance(cond, (list, set, frozenset)):
+                mask &= np.isin(x, list(cond))
+            else:
+                mask &= x == cond
+        keep = columns or list(data)
+        return {c: np.asarray(data[c][mask]) for c in keep if c in data}
+
+    def done_keys(self, status="ok"):
+        # Claves de variantes ya terminadas (para reanudar)
+        data = self.select(["key"], where={"status": status})
+        return set(data.get("key", ()))
+
+    def compact(self):
+        # Une las columnas vigentes y los bloques pendientes en una carpeta de
+        # columnas nueva (legibles con memmap) y la activa con un solo
+        # os.replace del manifiesto; después borra los bloques y las columnas
+        # anteriores. Los bloques que se escriban mientras tanto quedan para la
+        # próxima compactación
+        old = self._manifest()
+        self._remove_stale(old["dir"])
+        for name in old["shards"]:   # ya en las columnas vigentes
+            path = os.path.join(self.root, SHARD_DIR, name)
+            if os.path.exists(path):
+                os.remove(path)
+        shards = self.shards()
+        data = self.load(shards=shards)
+        if not data:
+            return 0
+        name = f"{COLUMN_DIR}-{uuid.uuid4().hex[:8]}"
+        col_dir = os.path.join(self.root, name)
+        os.makedirs(col_dir)
+        for c, arr in data.items():
+            np.save(os.path.join(col_dir, f"{c}.npy"), np.asarray(arr))
+        tmp = os.path.join(self.root, f".{MANIFEST}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"dir": name, "shards": sorted(os.path.basename(p) for p in shards)}, fh)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+        for path in shards:
+            os.remove(path)
+        self._remove_stale(name)
+        return len(next(iter(data.values())))
+
+    def _remove_stale(self, current):
+        # Carpetas de columnas que no son la vigente (anteriores o de una
+        # compactación interrumpida antes del cambio de manifiesto)
+        for path in glob.glob(os.path.join(self.root, f"{COLUMN_DIR}-*")):
+            if os.path.basename(path) != current:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def to_rows(self, columns=None, where=None):
+        data = self.select(columns, where)
+        names = list(data)
+        return [dict(zip(names, (v.item() if hasattr(v, "item") else v for v in vals)))
+                for vals in zip(*(data[c] for c in names))]
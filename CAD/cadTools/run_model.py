@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Ejecución por lotes (sin GUI) de cualquiera de los modelos del repositorio.
+# Solo se importan FreeCAD/Part y el modelo pedido; FreeCADGui y TechDraw nunca
+# se cargan salvo que se pida la lámina (--techdraw). Los módulos de NumPy
+# (variantes, interferencias, campo, exportación por componentes) se importan
+# solo en la rama que los usa.
+#
+# Ejemplos:
+#   python run_model.py --list
+#   python run_model.py navefusion --set RAD_LEN=3500 -o nave.FCStd
+#   freecadcmd run_model.py cubesat2u --set variant=1U --set propulsion.tank_d=40 -o cubesat.step
+#   python run_model.py cubesat_pro --trace traza.json     # o traza.folded (flame graph)
+#   python run_model.py navefusion --export-dir out/nave -j 4   # un STEP por componente
+#   python run_model.py navefusion --check -j 4                 # interferencias y holguras (TOL)
+#   python run_model.py cubesat_pro -o pro.FCStd --field campo.npz  # campo de las bobinas (coil_field.py)
+#   python run_model.py cubesat2u --no-doc -o cubesat.step          # solo formas, sin documento (docless.py)
+#   python run_model.py navefusion --memory                         # RSS y pico por sección (memory.py)
+#   python run_model.py --variant design/variants/navefusion_radiador.toml#tanque_grande[0] -o nave.step
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+import fillets
+import headless
+import lod
+import memory
+import profiling
+from model_registry import MODELS, load_model, parse_overrides
+
+EXPORT_EXT = (".step", ".stp", ".brep", ".brp", ".iges", ".igs")
+MESH_EXT = (".stl", ".obj", ".ply")   # teselado según el LOD (lod.py)
+
+def list_models():
+    for name, (path, desc) in MODELS.items():
+        print(f"{name:<18} {desc}  [{path}]")
+
+def save(doc, objs, path):
+    # .FCStd guarda el documento; el resto exporta las formas de los componentes
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".fcstd":
+        if doc is None:
+            raise ValueError("Sin documento (--no-doc) no se puede guardar .FCStd")
+        doc.saveAs(path)
+    elif ext in EXPORT_EXT:
+        profiling.export(objs.values(), path)
+    elif ext in MESH_EXT:
+        profiling.timed_call("export", "export_mesh", lod.export_mesh, objs.values(), path)
+    else:
+        raise ValueError(f"Formato de salida no soportado: {ext}")
+    return path
+
+def run(name, params=None, out=None, freecad_lib=None, techdraw=False, trace=None,
+        export_dir=None, export_format="step", workers=None, force=False, check=False, field=None,
+        no_doc=False, track_memory=False, tables=None):
+    # tables: entradas de las tablas del modelo (TOL, MAT...) de un fichero de variantes
+    t0 = time.perf_counter()
+    App = headless.load_freecad(freecad_lib)
+    t_fc = time.perf_counter()
+    model = load_model(name)
+    t_mod = time.perf_counter()
+
+    # Lote: documento sin pila de deshacer
+    doc = None if no_doc else memory.batch_document(App, model.DOC_NAME)
+    fillets.reset_fallbacks()
+    if tables:
+        import variants
+        applied = variants.applied(model, tables)
+    else:
+        applied = contextlib.nullcontext()
+    with applied, \
+            (profiling.tracing() if trace else contextlib.nullcontext()) as tracer, \
+            (profiling.memory_tracking() if track_memory else contextlib.nullcontext()) as mem:
+        root, objs = model.build(doc, params)
+        if doc is not None:
+            profiling.recompute(doc)
+        if techdraw and doc is not None and hasattr(model, "add_techdraw_page"):
+            model.add_techdraw_page(doc, root)
+        t_build = time.perf_counter()
+        clash = None
+        if check:
+            import interference
+            clash = interference.check(objs, getattr(model, "TOL", None), mates=getattr(model, "MATES", ()),
+                                       workers=workers, freecad_lib=freecad_lib)
+        t_check = time.perf_counter()
+        # Campo de las bobinas: mapa/líneas en `field` y líneas en el documento
+        solved = None
+        if field and hasattr(model, "coils"):
+            import coil_field
+            solved = coil_field.solve(model.coils(model.resolve_params(params)), workers=workers)
+            coil_field.save(field, solved["map"], solved["lines"], solved["segments"])
+            if doc is not None:
+                coil_field.add_to_doc(doc, solved["lines"])
+        t_field = time.perf_counter()
+
+        path = save(doc, objs, out) if out else None
+        components = None
+        if export_dir:
+            from export_pipeline import export_components
+            components = export_components(objs, export_dir, export_format, workers, freecad_lib,
+                                           model=name, force=force)
+        t_out = time.perf_counter()
+    if trace:
+        tracer.write(trace)
+    return {
+        "model": name,
+        "objects": len(objs),
+        "freecad_s": t_fc - t0,
+        "import_s": t_mod - t_fc,
+        "build_s": t_build - t_mod,
+        "check_s": t_check - t_build,
+        "field_s": t_field - t_check,
+        "export_s": t_out - t_field,
+        "output": path,
+        "components": components,
+        "interference": clash,
+        "field": field if solved else None,
+        "trace": trace,
+        "memory": mem,
+        "fillet_fallbacks": fillets.fallback_report(),
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Construye un modelo sin GUI.")
+    ap.add_argument("model", nargs="?", help="nombre del modelo (ver --list)")
+    ap.add_argument("--list", action="store_true", help="lista los modelos disponibles")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VAL",
+                    help="sobrescribe un parámetro (repetible; 'a.b' para claves anidadas)")
+    ap.add_argument("--variant", metavar="FICHERO[#NOMBRE[i]]",
+                    help="variante de un fichero TOML/JSON (variants.py); --set se aplica encima")
+    ap.add_argument("-o", "--output", help="fichero de salida (.FCStd, .step, .brep, .iges, .stl)")
+    ap.add_argument("--export-dir", help="exporta cada componente por separado (manifiesto + assembly.json)")
+    ap.add_argument("--format", choices=("step", "brep"), default="step", help="formato de --export-dir")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="procesos para --export-dir y --check")
+    ap.add_argument("--force", action="store_true", help="reexporta aunque el manifiesto indique que no hay cambios")
+    ap.add_argument("--lod", choices=lod.LEVELS, default=None,
+                    help="nivel de detalle: full (exportación) o preview (rápido, teselado grueso)")
+    ap.add_argument("--fillet-mode", choices=fillets.MODES, default=None,
+                    help="redondeos: full, chamfer o none (borrador)")
+    ap.add_argument("--fillet-rule", default=None, metavar="RULE",
+                    help="aristas a redondear si el modelo tiene fillet_rule (por defecto all; "
+                         "outer, convex... o outer+axis; ver fillets.py)")
+    ap.add_argument("--check", action="store_true",
+                    help="comprueba colisiones y holguras entre piezas (sale con 1 si hay colisiones)")
+    ap.add_argument("--field", metavar="NPZ|CSV",
+                    help="campo Biot–Savart de las bobinas (mapa + líneas); las líneas se añaden al documento")
+    ap.add_argument("--no-doc", action="store_true",
+                    help="construye solo formas, sin documento FreeCAD (más rápido; no admite .FCStd)")
+    ap.add_argument("--memory", action="store_true", help="RSS de entrada/salida y pico por sección del modelo")
+    ap.add_argument("--techdraw", action="store_true", help="añade la lámina TechDraw si el modelo la tiene")
+    ap.add_argument("--trace", help="traza de operaciones OCC (.json Chrome/Perfetto, .folded flame graph)")
+    ap.add_argument("--freecad-lib", help="carpeta lib de FreeCAD (o variable FREECAD_LIB)")
+    args = ap.parse_args(argv)
+
+    params, tables = {}, None
+    if args.variant:
+        import variants
+        try:
+            chosen = variants.load(args.variant)
+        except variants.VariantError as exc:
+            ap.error(f"fichero de variantes no válido:\n{exc}")
+        if len(chosen) != 1:
+            ap.error(f"{args.variant} define {len(chosen)} variantes; elige una con FICHERO#NOMBRE[i] "
+                     f"o usa param_sweep.py")
+        if args.model and args.model != chosen[0].model:
+            ap.error(f"la variante es de {chosen[0].model}, no de {args.model}")
+        args.model, params, tables = chosen[0].model, dict(chosen[0].params), chosen[0].tables
+    params.update(parse_overrides(args.set))
+
+    if args.list or not args.model:
+        list_models()
+        return 0
+    if args.fillet_rule:
+        if "fillet_rule" not in load_model(args.model).P:
+            ap.error(f"{args.model} no tiene fillet_rule")
+        params["fillet_rule"] = args.fillet_rule   # la opción explícita manda sobre la variante
+    if args.fillet_mode:
+        fillets.set_mode(args.fillet_mode)
+    if args.lod:
+        lod.set_level(args.lod)
+
+    info = run(args.model, params, args.output, args.freecad_lib, args.techdraw, args.trace,
+               args.export_dir, args.format, args.workers, args.force, args.check, args.field,
+               args.no_doc, args.memory, tables)
+    print(f"{info['model']}: {info['objects']} objetos | arranque FreeCAD {info['freecad_s']:.2f} s, "
+          f"import modelo {info['import_s']:.2f} s, construcción {info['build_s']:.2f} s")
+    if info["output"]:
+        print(f"Guardado en {info['output']} ({info['export_s']:.2f} s)")
+    comp = info["components"]
+    if comp:
+        print(f"Componentes en {args.export_dir}: {comp['written']} escritos, {comp['skipped']} sin cambios, "
+              f"{comp['instances']} instancias ({comp['wall_s']:.2f} s)")
+    if info["field"]:
+        print(f"Campo de las bobinas en {info['field']} ({info['field_s']:.2f} s)")
+    elif args.field:
+        print(f"{info['model']}: el modelo no define bobinas (coils), no se calcula el campo")
+    if info["trace"]:
+        print(f"Traza en {info['trace']}")
+    if info["memory"]:
+        print(info["memory"].report())
+    if info["fillet_fallbacks"]:
+        print(info["fillet_fallbacks"])
+    clash = info["interference"]
+    if clash:
+        import interference
+        print(interference.format_report(clash))
+        if any(r["kind"] == "collision" for r in clash["issues"]):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
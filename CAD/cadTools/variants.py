@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+# Ficheros de variantes de diseño (TOML o JSON).
+#
+# Una variante es un fichero pequeño con solo lo que cambia respecto al modelo
+# (P y, en NaveFusion, las tablas TOL/MAT/MAT_MAP/EXTRA_MASS). Puede heredar
+# de otro fichero (base), definir varias variantes con nombre y un barrido:
+#
+#   model = "navefusion"
+#   base = "navefusion_base.toml"          # relativo a este fichero
+#   [params]
+#   RAD_LEN = "3.2 m"                      # número (unidad del modelo) o "valor unidad"
+#   [tables.MAT_MAP]
+#   Reactor = ["W", 0.65]
+#   [variants.tanque_grande.params]
+#   TANK_D = "1.2 m"
+#   [sweep]
+#   RAD_W = [600, 800, 1000]               # o {start = "2 m", stop = "4 m", num = 5}
+#
+# El esquema de cada modelo sale de su P (tipo de cada clave) más UNITS,
+# CHOICES y TABLES. La carga valida todos los ficheros de la cadena, convierte
+# las unidades una sola vez y devuelve Variant(name, model, params, tables)
+# solo con las diferencias respecto al modelo: objetos pequeños que los
+# procesos de trabajo reciben sin volver a ejecutar ninguna macro.
+#
+#   python variants.py design/variants/navefusion_radiador.toml      # valida y lista
+#   python run_model.py --variant design/variants/navefusion_radiador.toml#tanque_grande[0] -o nave.step
+#   python param_sweep.py --variants design/variants/navefusion_radiador.toml -j 8
+
+import argparse
+import functools
+import itertools
+import json
+import os
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+
+import radiator_sizing
+from model_registry import MODELS, load_model
+
+try:
+    import tomllib           # Python >= 3.11
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None       # solo JSON
+
+Variant = namedtuple("Variant", "name model params tables")
+
+class VariantError(ValueError):
+    # Todos los errores de validación de una carga (uno por línea)
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("\n".join(self.errors))
+
+# -----------------------------
+# Unidades
+# -----------------------------
+# unidad -> (magnitud, factor a la unidad de referencia de la magnitud)
+UNIT_FACTORS = {
+    "mm": ("length", 1.0), "cm": ("length", 10.0), "m": ("length", 1000.0),
+    "um": ("length", 1e-3), "in": ("length", 25.4),
+    "kg": ("mass", 1.0), "g": ("mass", 1e-3), "t": ("mass", 1000.0),
+    "W": ("power", 1.0), "kW": ("power", 1e3), "MW": ("power", 1e6),
+    "V": ("voltage", 1.0), "kV": ("voltage", 1e3),
+    "A": ("current", 1.0), "mA": ("current", 1e-3), "kA": ("current", 1e3),
+    "kg/m^3": ("density", 1.0), "g/cm^3": ("density", 1000.0),
+    "K": ("temperature", 1.0), "degC": ("temperature", 1.0),
+    "": ("ratio", 1.0), "%": ("ratio", 0.01),
+}
+OFFSETS = {"degC": 273.15}   # unidades con origen desplazado (a K)
+
+# -----------------------------
+# Esquema por modelo
+# -----------------------------
+# Unidad de las claves numéricas que no son longitudes en mm ("" = adimensional);
+# una clave "a" vale también para las anidadas "a.b"
+UNITS = {
+    "navefusion": {"RAD_WASTE_KW": "kW", "RAD_TEMP_K": "K", "RAD_SINK_K": "K",
+                   "RAD_EMISSIVITY": "", "RAD_FIN_EFF": ""},
+    "cubesat_pro": {"grid_opening": "", "rad_L_frac": "", "nozzle_eps": "", "nozzle_throat_frac": "",
+                    "rad_waste_W": "W", "rad_temp_K": "K", "rad_sink_K": "K", "rad_emissivity": "",
+                    "rad_fin_eff": "", "coil_NI": "A", "ion_beam_V": "V", "ion_beam_A": "A",
+                    "ion_accel_ratio": ""},
+    "cubesat_hall": {"coil_NI": "A"},
+    "cubesat2u": {"materials": "kg/m^3", "propulsion": "mm"},
+    "fusion_propulsion": {},
+}
+
+# Valores admitidos de las claves de texto
+CHOICES = {
+    "cubesat_pro": {"thruster_mode": ("ion", "hall"), "grid_pattern": ("single", "hex", "rect"),
+                    "nozzle_contour": ("legacy", "conical", "bell"), "coil_axis": ("X", "Y", "Z"),
+                    "fillet_rule": ("all", "outer", "convex", "axis", "region"),
+                    "ion_propellant": ("Xe", "Kr", "Ar", "I", "Bi"),
+                    "rad_material": tuple(radiator_sizing.CONDUCTIVITY)},
+    "cubesat_hall": {"coil_axis": ("X", "Y", "Z"),
+                     "fillet_rule": ("all", "outer", "convex", "axis", "region")},
+    "cubesat2u": {"instancing": ("off", "shared", "link"), "propulsion.type": ("resistojet",)},
+}
+
+# Tablas del módulo que una variante puede cambiar: nombre -> (unidad, admite claves nuevas).
+# Unidad None: MAT_MAP, entradas [material, factor] con un material de MAT
+# (del modelo o añadido por el fichero o su cadena de bases)
+TABLES = {
+    "navefusion": {"TOL": ("mm", False), "MAT": ("kg/m^3", True),
+                   "MAT_MAP": (None, False), "EXTRA_MASS": ("kg", False)},
+}
+
+SECTIONS = ("model", "base", "name", "description", "params", "tables", "variants", "sweep")
+
+def _flatten(defaults, prefix=""):
+    out = {}
+    for key, value in defaults.items():
+        if isinstance(value, dict):
+            out.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            out[prefix + key] = value
+    return out
+
+@functools.lru_cache(maxsize=None)
+def schema(model):
+    # {clave plana: (valor por defecto, unidad o None, valores admitidos o None)}
+    if model not in MODELS:
+        raise VariantError([f"modelo desconocido: {model} (disponibles: {', '.join(MODELS)})"])
+    units, choices = UNITS.get(model, {}), CHOICES.get(model, {})
+    out = {}
+    for key, default in _flatten(load_model(model).P).items():
+        unit = units.get(key, units.get(key.split(".")[0]))
+        # None por defecto = número opcional (p. ej. derivado si falta)
+        number = default is None or (isinstance(default, (int, float)) and not isinstance(default, bool)) or (
+            isinstance(default, (list, tuple)) and all(isinstance(v, (int, float)) for v in default))
+        if unit is None:
+            # Sin unidad declarada: float/None/listas son mm; los enteros, recuentos
+            number = number and not isinstance(default, int)
+            unit = "mm"
+        out[key] = (default, unit if number else None, choices.get(key))
+    return out
+
+# -----------------------------
+# Normalización
+# -----------------------------
+def to_unit(value, unit):
+    # Número en `unit`, o texto "valor unidad" convertido a `unit`
+    if isinstance(value, bool):
+        raise ValueError(f"se esperaba un número, no {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"se esperaba un número, no {value!r}")
+    text = value.strip()
+    number, _, given = text.partition(" ")
+    given = given.strip().replace("°C", "degC")
+    try:
+        number = float(number)
+    except ValueError:
+        raise ValueError(f"valor no numérico: {value!r}") from None
+    if not given:
+        return number
+    if given not in UNIT_FACTORS:
+        raise ValueError(f"unidad desconocida {given!r} en {value!r}")
+    kind, factor = UNIT_FACTORS[given]
+    if kind != UNIT_FACTORS[unit][0]:
+        raise ValueError(f"{value!r}: se esperaba {UNIT_FACTORS[unit][0]} ({unit or 'adimensional'})")
+    base = number * factor + OFFSETS.get(given, 0.0)
+    return (base - OFFSETS.get(unit, 0.0)) / UNIT_FACTORS[unit][1]
+
+def normalize(key, value, entry):
+    # Valor de un fichero -> tipo y unidad de la clave en P
+    default, unit, choices = entry
+    if unit is not None:
+        if isinstance(default, (list, tuple)):
+            if not isinstance(value, (list, tuple)):
+                raise ValueError(f"se esperaba una lista, no {value!r}")
+            return [to_unit(v, unit) for v in value]
+        if value is None or (isinstance(value, str) and value.strip().lower() == "none"):
+            if default is None:
+                return None
+            raise ValueError("no admite None")
+        return to_unit(value, unit)
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"se esperaba true/false, no {value!r}")
+        return value
+    if isinstance(default, int):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+            raise ValueError(f"se esperaba un entero, no {value!r}")
+        return int(value)
+    if isinstance(default, str):
+        if not isinstance(value, str):
+            raise ValueError(f"se esperaba texto, no {value!r}")
+        if choices and value not in choices:
+            raise ValueError(f"{value!r} no es uno de {', '.join(choices)}")
+        return value
+    if isinstance(default, (list, tuple)):
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"se esperaba una lista, no {value!r}")
+        return list(value)
+    return value
+
+def _plain(params, scheme, prefix=""):
+    # Tablas anidadas ([params.propulsion]) -> claves "propulsion.tank_d"
+    out = {}
+    for key, value in params.items():
+        if isinstance(value, dict) and f"{prefix}{key}" not in scheme:
+            out.update(_plain(value, scheme, f"{prefix}{key}."))
+        else:
+            out[prefix + key] = value
+    return out
+
+def _params(raw, scheme, where, errors):
+    out = {}
+    for key, value in _plain(raw or {}, scheme).items():
+        if key not in scheme:
+            errors.append(f"{where}: clave desconocida {key}")
+            continue
+        try:
+            out[key] = normalize(key, value, scheme[key])
+        except ValueError as exc:
+            errors.append(f"{where}: {key}: {exc}")
+    return out
+
+def _tables(raw, model, where, errors, materials=()):
+    # materials: claves de MAT añadidas antes (base o diseño) que MAT_MAP puede usar
+    allowed = TABLES.get(model, {})
+    module = load_model(model) if raw else None
+    known = set(getattr(module, "MAT", ())) | set(materials)
+    if isinstance((raw or {}).get("MAT"), dict):
+        known |= set(raw["MAT"])
+    out = {}
+    for name, entries in (raw or {}).items():
+        if name not in allowed or not isinstance(entries, dict):
+            errors.append(f"{where}: tabla no modificable en {model}: {name}")
+            continue
+        unit, extensible = allowed[name]
+        current = getattr(module, name)
+        table = out.setdefault(name, {})
+        for key, value in entries.items():
+            if key not in current and not extensible:
+                errors.append(f"{where}: {name}.{key}: entrada desconocida")
+                continue
+            try:
+                if unit is not None:
+                    table[key] = to_unit(value, unit)
+                elif not (isinstance(value, (list, tuple)) and len(value) == 2 and isinstance(value[0], str)):
+                    raise ValueError(f"se esperaba [material, factor], no {value!r}")
+                elif value[0] not in known:
+                    raise ValueError(f"material desconocido {value[0]!r} (MAT: {', '.join(sorted(known))})")
+                else:
+                    table[key] = (value[0], to_unit(value[1], ""))
+            except ValueError as exc:
+                errors.append(f"{where}: {name}.{key}: {exc}")
+    return out
+
+def _merge_tables(base, over):
+    out = {name: dict(entries) for name, entries in base.items()}
+    for name, entries in over.items():
+        out.setdefault(name, {}).update(entries)
+    return out
+
+def _sweep(raw, scheme, where, errors):
+    # {clave: [valores normalizados]}; admite lista o {start, stop, num}
+    out = {}
+    for key, spec in (raw or {}).items():
+        if key not in scheme:
+            errors.append(f"{where}: sweep: clave desconocida {key}")
+            continue
+        try:
+            if isinstance(spec, dict):
+                num = int(spec["num"])
+                start, stop = (normalize(key, spec[k], scheme[key]) for k in ("start", "stop"))
+                step = (stop - start) / (num - 1) if num > 1 else 0.0
+                out[key] = [start + i * step for i in range(num)]
+            elif isinstance(spec, (list, tuple)) and spec:
+                out[key] = [normalize(key, v, scheme[key]) for v in spec]
+            else:
+                raise ValueError("se esperaba una lista o {start, stop, num}")
+        except (KeyError, TypeError, ValueError) as exc:
+            errors.append(f"{where}: sweep: {key}: {exc}")
+    return out
+
+# -----------------------------
+# Carga
+# -----------------------------
+def read(path):
+    # Fichero TOML o JSON -> dict (sin validar)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    if ext == ".toml":
+        if tomllib is None:
+            raise VariantError([f"{path}: TOML necesita Python >= 3.11 o el paquete tomli"])
+        with open(path, "rb") as fh:
+            return tomllib.load(fh)
+    raise VariantError([f"{path}: formato no soportado ({ext or 'sin extensión'}); use .toml o .json"])
+
+_designs = {}   # ruta -> diseño normalizado (con las marcas de tiempo de su cadena)
+
+def _stamp(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _design(path, chain=()):
+    # Fichero + su cadena de bases, validado y normalizado una vez por versión:
+    # la entrada se invalida si cambia el fichero o cualquiera de sus bases
+    cached = _designs.get(path)
+    if cached is not None and all(_stamp(f) == t for f, t in cached["files"]):
+        return cached
+    files = ((path, _stamp(path)),)
+    raw = read(path)
+    where = os.path.basename(path)
+    errors = [f"{where}: sección desconocida {k}" for k in raw if k not in SECTIONS]
+    base = {"model": None, "params": {}, "tables": {}, "files": ()}
+    if raw.get("base"):
+        base_path = os.path.normpath(os.path.join(os.path.dirname(path), raw["base"]))
+        if base_path in chain + (path,):
+            raise VariantError([f"{where}: herencia circular con {raw['base']}"])
+        if not os.path.exists(base_path):
+            raise VariantError([f"{where}: no existe la base {raw['base']}"])
+        base = _design(base_path, chain + (path,))
+    model = raw.get("model") or base["model"]
+    if not model:
+        raise VariantError(errors + [f"{where}: falta model (o una base que lo defina)"])
+    if base["model"] and model != base["model"]:
+        errors.append(f"{where}: model {model} distinto del de la base ({base['model']})")
+    try:
+        scheme = schema(model)
+    except VariantError as exc:
+        raise VariantError(errors + [f"{where}: {e}" for e in exc.errors]) from None
+
+    design = {
+        "model": model,
+        "name": raw.get("name") or os.path.splitext(where)[0],
+        "params": dict(base["params"], **_params(raw.get("params"), scheme, where, errors)),
+        "tables": _merge_tables(base["tables"], _tables(raw.get("tables"), model, where, errors,
+                                                        base["tables"].get("MAT", {}))),
+        "variants": {},
+        "sweep": _sweep(raw.get("sweep"), scheme, where, errors),
+        "files": files + base["files"],
+    }
+    for vname, entry in (raw.get("variants") or {}).items():
+        vwhere = f"{where}[{vname}]"
+        if not isinstance(entry, dict):
+            errors.append(f"{vwhere}: se esperaba una tabla")
+            continue
+        unknown = [k for k in entry if k not in ("params", "tables")]
+        errors += [f"{vwhere}: sección desconocida {k}" for k in unknown]
+        design["variants"][vname] = (_params(entry.get("params"), scheme, vwhere, errors),
+                                     _tables(entry.get("tables"), model, vwhere, errors,
+                                             design["tables"].get("MAT", {})))
+    if errors:
+        raise VariantError(errors)
+    _designs[path] = design
+    return design
+
+def _compact(params, scheme):
+    # Solo lo que difiere de P
+    return {k: v for k, v in params.items() if v != scheme[k][0]}
+
+def expand(variants, sweep):
+    # Producto de cada variante por un barrido {clave: [valores]}
+    if not sweep:
+        return list(variants)
+    keys = list(sweep)
+    out = []
+    for v in variants:
+        for i, combo in enumerate(itertools.product(*(sweep[k] for k in keys))):
+            out.append(Variant(f"{v.name}[{i}]", v.model, dict(v.params, **dict(zip(keys, combo))), v.tables))
+    return out
+
+def load(path, name=None):
+    # Lista de Variant del fichero; name elige una de sus variantes y
+    # "nombre[i]" (o "[i]") un punto de su barrido.
+    # "fichero.toml#nombre" equivale a name="nombre"
+    if name is None and "#" in path:
+        path, name = path.rsplit("#", 1)
+    index = None
+    if name and name.endswith("]") and name[:-1].rpartition("[")[2].isdigit():
+        name, _, index = name[:-1].rpartition("[")
+        index, name = int(index), name or None
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        raise VariantError([f"no existe el fichero de variantes: {path}"])
+    design = _design(path)
+    scheme = schema(design["model"])
+    entries = design["variants"] or {None: ({}, {})}
+    if name is not None:
+        if name not in design["variants"]:
+            raise VariantError([f"{os.path.basename(path)}: no hay variante {name} "
+                                f"(disponibles: {', '.join(design['variants']) or 'ninguna'})"])
+        entries = {name: design["variants"][name]}
+    out = []
+    for vname, (params, tables) in entries.items():
+        full = f"{design['name']}/{vname}" if vname else design["name"]
+        out.append(Variant(full, design["model"],
+                           _compact(dict(design["params"], **params), scheme),
+                           _merge_tables(design["tables"], tables)))
+    out = expand(out, design["sweep"])
+    if index is not None:
+        if not 0 <= index < len(out):
+            raise VariantError([f"{os.path.basename(path)}: índice [{index}] fuera del barrido ({len(out)} puntos)"])
+        out = [out[index]]
+    return out
+
+def flat(variant):
+    # Parámetros + entradas de tabla ("MAT.W") en un dict plano (filas, claves)
+    out = dict(variant.params)
+    for name, entries in variant.tables.items():
+        for key, value in entries.items():
+            out[f"{name}.{key}"] = f"{value[0]}:{value[1]:g}" if isinstance(value, tuple) else value
+    return out
+
+@contextmanager
+def applied(model, tables):
+    # Aplica las tablas de una variante al módulo del modelo y las restaura al salir
+    saved = []
+    missing = object()
+    try:
+        for name, entries in (tables or {}).items():
+            table = getattr(model, name)
+            for key, value in entries.items():
+                saved.append((table, key, table.get(key, missing)))
+                table[key] = value
+        yield model
+    finally:
+        for table, key, value in reversed(saved):
+            if value is missing:
+                del table[key]
+            else:
+                table[key] = value
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Valida un fichero de variantes y lista sus variantes")
+    ap.add_argument("path", help="fichero .toml/.json (fichero#nombre para una sola variante)")
+    ap.add_argument("--json", action="store_true", help="imprime las variantes normalizadas en JSON")
+    args = ap.parse_args(argv)
+    try:
+        vs = load(args.path)
+    except VariantError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps([v._asdict() for v in vs], indent=2, ensure_ascii=False))
+    else:
+        for v in vs:
+            print(f"{v.name:<40} {v.model:<18} {len(flat(v))} cambios")
+        print(f"{len(vs)} variantes válidas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
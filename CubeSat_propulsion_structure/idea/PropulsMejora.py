@@ -3,118 +3,202 @@
 # Autor: Víctor + Copilot
 # Unidad: mm
 
-import FreeCAD as App
-import FreeCADGui as Gui
-import Part
-import math
+import os
+import sys
+
+# CAD/cadTools (utilidades compartidas) en el path
+_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "CAD", "cadTools"))
+if _TOOLS_DIR not in sys.path:
+    sys.path.insert(0, _TOOLS_DIR)
+
+import aperture_array as aa
+import coil_field
+import docless
+import fillets
+import headless
+import lod
+import nozzle_contour
+import radiator_sizing
+import profiling as prof
+from boolean_fuse import fuse_all
+from brep_cache import cached_builder, default_cache
+from model_registry import resolve
 
-DOC_NAME = "CubeSat_2U_Thruster_Pro"
+try:
+    import FreeCAD as App
+    import Part
+except ImportError:
+    App = Part = None  # solo parámetros (P) sin FreeCAD
 
-# --------------------------------------------------------------------
-# 0) Documento
-# --------------------------------------------------------------------
-doc = App.ActiveDocument
-if doc is None or doc.Label != DOC_NAME:
-    doc = App.newDocument(DOC_NAME)
+DOC_NAME = "CubeSat_2U_Thruster_Pro"
 
 # --------------------------------------------------------------------
 # 1) Parámetros
 # --------------------------------------------------------------------
-bus_W, bus_H, bus_L = 100.0, 100.0, 227.0
-wall, fillet = 1.6, 2.0
-
-bulk_thk, bulk_z_offset = 3.0, 16.0
-feed_pcd, feed_holes, feed_diam = 24.0, 4, 6.0
-
-use_central_tube = True
-tube_OD, tube_wall, tube_L = 70.0, 1.2, 160.0
-
-thruster_mode = "ion"
-chamber_OD, chamber_L = 60.0, 50.0
-flange_OD, flange_thk, pcd, pcd_n, bolt_d = 78.0, 3.0, 66.0, 6, 3.0
-cbore_d, cbore_depth = 6.0, 1.5
-
-grid_screen_thk, grid_accel_thk, grid_gap, grid_opening = 1.2, 1.2, 1.5, 0.65
-hall_channel_OD, hall_channel_ID, hall_channel_len, hall_lip = 72.0, 52.0, 12.0, 2.0
-
-use_nozzle = True
-nozzle_len = 32.0
-nozzle_inlet_d = chamber_OD * 0.95
-nozzle_throat_d = chamber_OD * 0.55
-nozzle_exit_d = 14.0
-
-coil_R, coil_r, coil_offset = 34.0, 4.0, chamber_L * 0.45
-
-strut_w, strut_t, strut_clear = 6.0, 3.0, 6.0
-eps = 0.2
-cx, cy = bus_W / 2.0, bus_H / 2.0
+P = {
+    "bus_W": 100.0, "bus_H": 100.0, "bus_L": 227.0,
+    "wall": 1.6, "fillet": 2.0,
+    "fillet_rule": "all",      # aristas a redondear (ver fillets.py); "outer"... = opcional
+
+    "bulk_thk": 3.0, "bulk_z_offset": 16.0,
+    "feed_pcd": 24.0, "feed_holes": 4, "feed_diam": 6.0,
+
+    "use_central_tube": True,
+    "tube_OD": 70.0, "tube_wall": 1.2, "tube_L": 160.0,
+
+    "thruster_mode": "ion",
+    "chamber_OD": 60.0, "chamber_L": 50.0,
+    "flange_OD": 78.0, "flange_thk": 3.0, "pcd": 66.0, "pcd_n": 6, "bolt_d": 3.0,
+    "cbore_d": 6.0, "cbore_depth": 1.5,
+
+    "grid_screen_thk": 1.2, "grid_accel_thk": 1.2, "grid_gap": 1.5, "grid_opening": 0.65,
+    # Aperturas de rejilla: "single" (una abertura de chamber_OD*grid_opening),
+    # "hex" o "rect" (matriz de agujeros dentro de esa misma zona activa)
+    "grid_pattern": "single",
+    "grid_hole_d": 1.9, "grid_pitch": 2.4, "grid_web": 0.3,
+    "grid_accel_hole_d": 1.1, "grid_accel_dx": 0.0, "grid_accel_dy": 0.0,
+    # Punto de operación del haz (ion_optics.py): propelente, tensión [V],
+    # corriente [A] y R = V_haz / V_total
+    "ion_propellant": "Xe", "ion_beam_V": 1000.0, "ion_beam_A": 0.012, "ion_accel_ratio": 0.8,
+    "hall_channel_OD": 72.0, "hall_channel_ID": 52.0, "hall_channel_len": 12.0, "hall_lip": 2.0,
+
+    "use_nozzle": True,
+    "nozzle_len": 32.0,
+    "nozzle_inlet_d": None,    # None -> chamber_OD * 0.95
+    "nozzle_throat_d": None,   # None -> chamber_OD * 0.55
+    "nozzle_exit_d": 14.0,
+    # Contorno (nozzle_contour.py): "legacy" (perfil original de 5 puntos),
+    # "conical" o "bell" (Rao); nozzle_eps fija d_exit por relación de áreas
+    "nozzle_contour": "legacy",
+    "nozzle_eps": None,        # None -> se usa nozzle_exit_d
+    "nozzle_throat_frac": 0.35,
+
+    "coil_R": 34.0, "coil_r": 4.0,
+    "coil_offset": None,       # None -> chamber_L * 0.45
+    # Campo de la bobina (coil_field.py): amperios-vuelta y eje del toro
+    # ("X" como el modelo original; "Z" = coaxial con el propulsor)
+    "coil_NI": 1000.0, "coil_axis": "X",
+
+    "strut_w": 6.0, "strut_t": 3.0, "strut_clear": 6.0,
+    "eps": 0.2,
+
+    # 7) Rebajes paneles solares
+    "add_panel_recess": True,
+    "panel_recess_depth": 0.8, "rail_keep": 8.5, "end_keep": 8.0,
+
+    # 8) Radiador lateral -Y
+    "add_radiator": True,
+    "rad_thk": 2.0,
+    "rad_L_frac": 0.6,         # rad_L = bus_L * rad_L_frac
+    # Con rad_waste_W > 0 el largo sale del calor residual (radiator_sizing.py,
+    # una cara) y se limita al panel disponible (bus_L - 2*end_keep); lo que no
+    # se puede evacuar queda en rad_heat_deficit_W
+    "rad_waste_W": 0.0,
+    "rad_temp_K": 320.0, "rad_sink_K": 250.0, "rad_emissivity": 0.85,
+    # Eficiencia de aleta: None = de rad_thk y la conductividad de rad_material
+    "rad_material": "Al", "rad_fin_eff": None,
+    "standoff_d": 6.0, "standoff_hole_d": 3.0, "standoff_margin": 10.0,
+}
+
+def resolve_params(params=None):
+    p = resolve(P, params, DOC_NAME)
+    # Derivados
+    if p["nozzle_inlet_d"] is None:
+        p["nozzle_inlet_d"] = p["chamber_OD"] * 0.95
+    if p["nozzle_throat_d"] is None:
+        p["nozzle_throat_d"] = p["chamber_OD"] * 0.55
+    if p["nozzle_eps"] is not None:
+        p["nozzle_exit_d"] = float(nozzle_contour.exit_diameter(p["nozzle_throat_d"], p["nozzle_eps"]))
+    if p["coil_offset"] is None:
+        p["coil_offset"] = p["chamber_L"] * 0.45
+    p["cx"], p["cy"] = p["bus_W"] / 2.0, p["bus_H"] / 2.0
+    p["rad_L"] = p["bus_L"] * p["rad_L_frac"]
+    rad_w = p["bus_W"] - 2 * p["rail_keep"]
+    if p["rad_fin_eff"] is None:
+        # Calor entrando por el eje del panel: aleta de semiancho rad_w/2, una cara
+        k = radiator_sizing.material_conductivity(p["rad_material"])
+        p["rad_fin_eff"] = float(radiator_sizing.fin_efficiency(p["rad_thk"], rad_w / 2.0, p["rad_temp_K"],
+                                                                p["rad_emissivity"], k, sides=1))
+    p["rad_heat_deficit_W"] = 0.0
+    if p["rad_waste_W"] > 0:
+        r = radiator_sizing.size(p["rad_waste_W"], p["rad_temp_K"], rad_w, p["rad_sink_K"],
+                                 p["rad_emissivity"], p["rad_fin_eff"], sides=1)
+        p["rad_L"] = min(float(r["length_mm"]), p["bus_L"] - 2 * p["end_keep"])
+        # El ancho lo fija el bus: si el largo se recorta, el calor sobrante queda registrado
+        reject = radiator_sizing.rejection(rad_w * p["rad_L"] / 1e6, p["rad_temp_K"], p["rad_sink_K"],
+                                           p["rad_emissivity"], p["rad_fin_eff"], sides=1)
+        p["rad_heat_deficit_W"] = max(p["rad_waste_W"] - float(reject), 0.0)
+    return p
 
 # --------------------------------------------------------------------
 # 2) Utilidades
 # --------------------------------------------------------------------
 def vec(x, y, z): return App.Vector(x, y, z)
-def add_part(shape, name):
-    obj = doc.addObject("Part::Feature", name)
-    obj.Shape = shape
-    return obj
+def add_part(doc, shape, name):
+    # Part::Feature con documento; Component (docless.py) sin él
+    return docless.add(doc, shape, name)
 
-def make_hollow_box(outer_w, outer_h, outer_l, t):
+@cached_builder
+def make_hollow_box(outer_w, outer_h, outer_l, t, fillet_r=0.0, fillet_rule="all", fillet_mode="full"):
+    # Caché por dimensiones, pared, radio, regla y modo de redondeo
     outer = Part.makeBox(outer_w, outer_h, outer_l, vec(0,0,0))
     inner = Part.makeBox(outer_w - 2*t, outer_h - 2*t, outer_l - 2*t, vec(t,t,t))
-    return outer.cut(inner)
+    shell = prof.cut(outer, inner)
+    return fillets.fillet(shell, fillet_r, fillet_rule, fillet_mode)
 
+@cached_builder
 def make_hollow_cylinder(OD, L, t, base_vec):
     outer = Part.makeCylinder(OD/2.0, L, base_vec)
     inner = Part.makeCylinder(OD/2.0 - t, L, base_vec)
-    return outer.cut(inner)
-
-def make_pcd_holes(z0, through, n, dia, pcd_diam, cbore_diam=None, cbore_depth_val=0.0, extra=0.0):
-    holes = []
-    for i in range(n):
-        ang = 2.0 * math.pi * i / n
-        x = cx + (pcd_diam/2.0) * math.cos(ang)
-        y = cy + (pcd_diam/2.0) * math.sin(ang)
-        h = Part.makeCylinder(dia/2.0, through + extra, vec(x, y, z0 - extra/2.0))
-        holes.append(h)
-        if cbore_diam and cbore_depth_val > 0:
-            cb = Part.makeCylinder(cbore_diam/2.0, cbore_depth_val + eps, vec(x, y, z0 - (cbore_depth_val + eps)))
-            holes.append(cb)
-    return Part.makeCompound(holes)
-
-def make_nozzle_revolve(z0, L, d_inlet, d_throat, d_exit):
-    r_in, r_th, r_ex = d_inlet/2.0, d_throat/2.0, d_exit/2.0
+    return prof.cut(outer, inner)
+
+def make_pcd_holes(z0, through, n, dia, pcd_diam, cbore_diam=None, cbore_depth_val=0.0, extra=0.0,
+                   center=(50.0, 50.0), eps=0.2):
+    # None si el nivel de detalle omite todos los agujeros
+    pts = aa.pcd_points(n, pcd_diam, center)
+    tools = []
+    if not lod.skip_hole(dia):
+        tools.append(aa.cylinders(pts, dia, z0 - extra/2.0, through + extra))
+    if cbore_diam and cbore_depth_val > 0 and not lod.skip_hole(cbore_diam):
+        tools.append(aa.cylinders(pts, cbore_diam, z0 - (cbore_depth_val + eps), cbore_depth_val + eps))
+    return Part.makeCompound(tools) if tools else None
+
+@cached_builder
+def make_nozzle_revolve(z0, L, d_inlet, d_throat, d_exit, contour="legacy", throat_frac=0.35):
+    if lod.is_preview():
+        return lod.nozzle_cones(z0, L, d_inlet, d_throat, d_exit, throat_frac)
+    # El contorno se calcula sin OCC (memorizado); aquí solo se revoluciona
+    profile = nozzle_contour.profile(contour, d_inlet, d_throat, d_exit, L, throat_frac)
+    pts = [vec(float(r), 0, z0 + float(z)) for r, z in profile]
+    r_in, r_ex = pts[0].x, pts[-1].x
     z1 = z0 + L
-    pts = [
-        vec(r_in, 0, z0),
-        vec((r_in+r_th)*0.6, 0, z0 + 0.22*L),
-        vec(r_th, 0, z0 + 0.35*L),
-        vec((r_th+r_ex)*0.5, 0, z0 + 0.70*L),
-        vec(r_ex, 0, z1)
-    ]
-    spline = Part.BSplineCurve()
-    spline.interpolate(pts)
-    e1 = Part.Edge(spline)
+    if contour == "conical":
+        wall = Part.makePolygon(pts).Edges
+    else:
+        spline = Part.BSplineCurve()
+        spline.interpolate(pts)
+        wall = [Part.Edge(spline)]
     e2 = Part.makeLine(vec(r_ex,0,z1), vec(0,0,z1))
     e3 = Part.makeLine(vec(0,0,z1), vec(0,0,z0))
     e4 = Part.makeLine(vec(0,0,z0), vec(r_in,0,z0))
-    wire = Part.Wire([e1,e2,e3,e4])
+    wire = Part.Wire(wall + [e2,e3,e4])
     face = Part.Face(wire)
-    return face.revolve(vec(0,0,0), vec(0,0,1), 360.0)
-
-def grid_points(x_plane):
-    pts = []
-    width_y = bus_H - 2*side_margin_y
-    height_z = bus_L - 2*side_margin_z
-    for r in range(grid_rows):
-        z = side_margin_z + (height_z * (r/(grid_rows-1) if grid_rows>1 else 0))
-        for c in range(grid_cols):
-            y = side_margin_y + (width_y * (c/(grid_cols-1) if grid_cols>1 else 0))
-            pts.append((y,z))
-    return pts
-
-def get_export_dir():
+    return prof.revolve(face, vec(0,0,0), vec(0,0,1), 360.0)
+
+def grid_apertures(p, radius, center):
+    # Centros de las aperturas de la rejilla pantalla (screen) y aceleradora (accel)
+    if p["grid_pattern"] == "hex":
+        screen = aa.hex_points(radius, p["grid_pitch"], p["grid_hole_d"], p["grid_web"], center)
+    elif p["grid_pattern"] == "rect":
+        screen = aa.rect_points(2*radius, 2*radius, p["grid_pitch"], hole_d=p["grid_hole_d"],
+                                margin=p["grid_web"], center=center, radius=radius)
+    else:
+        raise ValueError(f"grid_pattern desconocido: {p['grid_pattern']}")
+    accel = screen + (p["grid_accel_dx"], p["grid_accel_dy"])
+    return screen, accel
+
+def get_export_dir(doc):
     if doc.FileName:
-        import os
         return os.path.dirname(doc.FileName)
     import tempfile
     return tempfile.gettempdir()
@@ -122,121 +206,125 @@ def get_export_dir():
 # --------------------------------------------------------------------
 # 3) Bus, bulkhead y tubo central
 # --------------------------------------------------------------------
-bus_shell = make_hollow_box(bus_W, bus_H, bus_L, wall)
-bus_shell = bus_shell.makeFillet(fillet, bus_shell.Edges)
-bus_obj = add_part(bus_shell, "BusShell")
-
-front_inner_z = bus_L - wall
-bulk_w, bulk_h = bus_W - 2*wall, bus_H - 2*wall
-bulk_z = front_inner_z - bulk_z_offset - bulk_thk
-bulk_plate = Part.makeBox(bulk_w, bulk_h, bulk_thk, vec(wall, wall, bulk_z))
-
-# Feedthroughs
-feedholes = []
-for i in range(feed_holes):
-    ang = 2.0 * math.pi * i / feed_holes
-    x = cx + (feed_pcd/2.0)*math.cos(ang)
-    y = cy + (feed_pcd/2.0)*math.sin(ang)
-    h = Part.makeCylinder(feed_diam/2.0, bulk_thk+eps, vec(x,y,bulk_z-eps/2))
-    feedholes.append(h)
-bulk_plate = bulk_plate.cut(Part.makeCompound(feedholes))
-bulk_obj = add_part(bulk_plate, "BulkheadInner")
-
-# Tubo central
-tube_obj = None
-if use_central_tube:
-    tube_base_z = front_inner_z - bulk_z_offset - tube_L
-    tube = make_hollow_cylinder(tube_OD, tube_L, tube_wall, vec(cx, cy, tube_base_z))
-    tube_obj = add_part(tube, "CentralTube")
+def build_bus(p):
+    bus_W, bus_H, bus_L, wall, eps = p["bus_W"], p["bus_H"], p["bus_L"], p["wall"], p["eps"]
+    cx, cy = p["cx"], p["cy"]
 
-# --------------------------------------------------------------------
-# 4) Propulsor
-# --------------------------------------------------------------------
-chamber_base_z = bus_L
-chamber = Part.makeCylinder(chamber_OD/2.0, chamber_L, vec(cx, cy, chamber_base_z))
-flange_z0 = front_inner_z - flange_thk
-flange = Part.makeCylinder(flange_OD/2.0, flange_thk+eps, vec(cx, cy, flange_z0))
-pcd_holes = make_pcd_holes(front_inner_z, flange_thk + eps*2, pcd_n, bolt_d, pcd, cbore_d, cbore_depth, extra=eps)
-flange = flange.cut(pcd_holes)
-thruster_parts = [chamber, flange]
-
-if thruster_mode.lower() == "ion":
-    grid_free_d = chamber_OD*grid_opening
-    z_grid_screen = chamber_base_z + chamber_L - grid_screen_thk
-    z_grid_accel = z_grid_screen + grid_screen_thk + grid_gap
-
-    screen = Part.makeCylinder(chamber_OD/2.0, grid_screen_thk, vec(cx,cy,z_grid_screen))
-    screen = screen.cut(Part.makeCylinder(grid_free_d/2.0, grid_screen_thk+eps, vec(cx,cy,z_grid_screen-eps/2)))
-    accel = Part.makeCylinder(chamber_OD/2.0, grid_accel_thk, vec(cx,cy,z_grid_accel))
-    accel = accel.cut(Part.makeCylinder((grid_free_d*0.9)/2.0, grid_accel_thk+eps, vec(cx,cy,z_grid_accel-eps/2)))
-    thruster_parts += [screen, accel]
-
-elif thruster_mode.lower() == "hall":
-    ch_z = chamber_base_z + chamber_L - hall_channel_len
-    anulus_outer = Part.makeCylinder(hall_channel_OD/2.0, hall_channel_len, vec(cx,cy,ch_z))
-    anulus_inner = Part.makeCylinder(hall_channel_ID/2.0, hall_channel_len+eps, vec(cx,cy,ch_z-eps/2))
-    channel = anulus_outer.cut(anulus_inner)
-    lip = Part.makeCylinder(hall_channel_OD/2.0, hall_lip, vec(cx,cy,chamber_base_z+chamber_L))
-    lip = lip.cut(Part.makeCylinder((hall_channel_ID*0.95)/2.0, hall_lip+eps, vec(cx,cy,chamber_base_z+chamber_L-eps/2)))
-    thruster_parts += [channel, lip]
-
-coil = Part.makeTorus(coil_R, coil_r, vec(cx,cy,chamber_base_z+coil_offset), App.Vector(1,0,0))
-thruster_parts.append(coil)
-
-if use_nozzle:
-    noz = make_nozzle_revolve(chamber_base_z+chamber_L, nozzle_len, nozzle_inlet_d, nozzle_throat_d, nozzle_exit_d)
-    noz.translate(vec(cx,cy,0))
-    thruster_parts.append(noz)
-
-thruster = thruster_parts[0]
-for shp in thruster_parts[1:]:
-    thruster = thruster.fuse(shp)
-thruster_obj = add_part(thruster, "ThrusterAssembly")
+    bus_shell = make_hollow_box(bus_W, bus_H, bus_L, wall, p["fillet"], p["fillet_rule"], fillets.get_mode())
 
-# --------------------------------------------------------------------
-# 5) Soportes
-# --------------------------------------------------------------------
-struts = []
-inner_x0, inner_y0 = wall + strut_clear, wall + strut_clear
-inner_x1, inner_y1 = bus_W - wall - strut_clear - strut_w, bus_H - wall - strut_clear - strut_w
-strut_z0 = bulk_z + bulk_thk
-strut_len = (front_inner_z - strut_z0) - 0.5
+    front_inner_z = bus_L - wall
+    bulk_w, bulk_h = bus_W - 2*wall, bus_H - 2*wall
+    bulk_z = front_inner_z - p["bulk_z_offset"] - p["bulk_thk"]
+    bulk_plate = Part.makeBox(bulk_w, bulk_h, p["bulk_thk"], vec(wall, wall, bulk_z))
 
-for x in (inner_x0, inner_x1):
-    for y in (inner_y0, inner_y1):
-        s = Part.makeBox(strut_w, strut_t, strut_len, vec(x,y,strut_z0))
-        struts.append(s)
+    # Feedthroughs
+    feed_pts = aa.pcd_points(p["feed_holes"], p["feed_pcd"], (cx, cy))
+    bulk_plate = aa.cut_holes(bulk_plate, feed_pts, p["feed_diam"], bulk_z-eps/2, p["bulk_thk"]+eps)
 
-sL = Part.makeBox(strut_t, strut_w, strut_len, vec(cx-18, wall+strut_clear, strut_z0))
-sR = Part.makeBox(strut_t, strut_w, strut_len, vec(cx+18-strut_t, bus_H-wall-strut_clear-strut_w, strut_z0))
-struts += [sL, sR]
-
-struts_comp = Part.makeCompound(struts)
-struts_obj = add_part(struts_comp, "ThrusterStruts")
+    # Tubo central
+    tube = None
+    if p["use_central_tube"]:
+        tube_base_z = front_inner_z - p["bulk_z_offset"] - p["tube_L"]
+        tube = make_hollow_cylinder(p["tube_OD"], p["tube_L"], p["tube_wall"], vec(cx, cy, tube_base_z))
+    return bus_shell, bulk_plate, tube
 
 # --------------------------------------------------------------------
-# 6) Agrupación y visual
+# 4) Propulsor
 # --------------------------------------------------------------------
-group = doc.addObject("App::DocumentObjectGroup", "CubeSat_2U_Pro")
-for o in (bus_obj, bulk_obj, tube_obj, thruster_obj, struts_obj):
-    if o: group.addObject(o)
+def coils(p):
+    # Bobinas para coil_field.py (mismas cotas que el toro del CAD)
+    return [coil_field.coil((p["cx"], p["cy"], p["bus_L"] + p["coil_offset"]), p["coil_axis"],
+                            p["coil_R"], p["coil_r"], p["coil_NI"])]
+
+def build_thruster(p):
+    cx, cy, eps = p["cx"], p["cy"], p["eps"]
+    chamber_OD, chamber_L = p["chamber_OD"], p["chamber_L"]
+    front_inner_z = p["bus_L"] - p["wall"]
+
+    chamber_base_z = p["bus_L"]
+    chamber = Part.makeCylinder(chamber_OD/2.0, chamber_L, vec(cx, cy, chamber_base_z))
+    flange_z0 = front_inner_z - p["flange_thk"]
+    flange = Part.makeCylinder(p["flange_OD"]/2.0, p["flange_thk"]+eps, vec(cx, cy, flange_z0))
+    pcd_holes = make_pcd_holes(front_inner_z, p["flange_thk"] + eps*2, p["pcd_n"], p["bolt_d"], p["pcd"],
+                               p["cbore_d"], p["cbore_depth"], extra=eps, center=(cx, cy), eps=eps)
+    if pcd_holes is not None:
+        flange = prof.cut(flange, pcd_holes)
+    thruster_parts = [chamber, flange]
+
+    if p["thruster_mode"].lower() == "ion":
+        grid_screen_thk, grid_accel_thk = p["grid_screen_thk"], p["grid_accel_thk"]
+        grid_free_d = chamber_OD*p["grid_opening"]
+        z_grid_screen = chamber_base_z + chamber_L - grid_screen_thk
+        z_grid_accel = z_grid_screen + grid_screen_thk + p["grid_gap"]
+
+        if p["grid_pattern"] == "single" or lod.is_preview():
+            screen = Part.makeCylinder(chamber_OD/2.0, grid_screen_thk, vec(cx,cy,z_grid_screen))
+            screen = prof.cut(screen, Part.makeCylinder(grid_free_d/2.0, grid_screen_thk+eps, vec(cx,cy,z_grid_screen-eps/2)))
+            accel = Part.makeCylinder(chamber_OD/2.0, grid_accel_thk, vec(cx,cy,z_grid_accel))
+            accel = prof.cut(accel, Part.makeCylinder((grid_free_d*0.9)/2.0, grid_accel_thk+eps, vec(cx,cy,z_grid_accel-eps/2)))
+        else:
+            # Matriz de aperturas: cada rejilla es una cara perforada extruida una vez
+            screen_pts, accel_pts = grid_apertures(p, grid_free_d/2.0, (cx, cy))
+            screen = aa.perforated_disc(chamber_OD, grid_screen_thk, screen_pts, p["grid_hole_d"], (cx, cy), z_grid_screen)
+            accel = aa.perforated_disc(chamber_OD, grid_accel_thk, accel_pts, p["grid_accel_hole_d"], (cx, cy), z_grid_accel)
+        thruster_parts += [screen, accel]
+
+    elif p["thruster_mode"].lower() == "hall":
+        hall_channel_OD, hall_channel_ID = p["hall_channel_OD"], p["hall_channel_ID"]
+        hall_channel_len, hall_lip = p["hall_channel_len"], p["hall_lip"]
+        ch_z = chamber_base_z + chamber_L - hall_channel_len
+        anulus_outer = Part.makeCylinder(hall_channel_OD/2.0, hall_channel_len, vec(cx,cy,ch_z))
+        anulus_inner = Part.makeCylinder(hall_channel_ID/2.0, hall_channel_len+eps, vec(cx,cy,ch_z-eps/2))
+        channel = prof.cut(anulus_outer, anulus_inner)
+        lip = Part.makeCylinder(hall_channel_OD/2.0, hall_lip, vec(cx,cy,chamber_base_z+chamber_L))
+        lip = prof.cut(lip, Part.makeCylinder((hall_channel_ID*0.95)/2.0, hall_lip+eps, vec(cx,cy,chamber_base_z+chamber_L-eps/2)))
+        thruster_parts += [channel, lip]
+
+    coil = lod.torus(p["coil_R"], p["coil_r"], vec(cx,cy,chamber_base_z+p["coil_offset"]),
+                     App.Vector(*coil_field.axis_vector(p["coil_axis"])))
+    thruster_parts.append(coil)
+
+    if p["use_nozzle"]:
+        noz = make_nozzle_revolve(chamber_base_z+chamber_L, p["nozzle_len"], p["nozzle_inlet_d"], p["nozzle_throat_d"], p["nozzle_exit_d"],
+                                  p["nozzle_contour"], p["nozzle_throat_frac"])
+        noz.translate(vec(cx,cy,0))
+        thruster_parts.append(noz)
+
+    return fuse_all(thruster_parts)
 
-doc.recompute()
-try:
-    bus_obj.ViewObject.ShapeColor = (0.75,0.75,0.78)
-    bulk_obj.ViewObject.ShapeColor = (0.55,0.55,0.6)
-    if tube_obj: tube_obj.ViewObject.ShapeColor = (0.6,0.6,0.65)
-    thruster_obj.ViewObject.ShapeColor = (0.8,0.8,0.85)
-    struts_obj.ViewObject.ShapeColor = (0.4,0.4,0.45)
-    Gui.ActiveDocument.ActiveView.fitAll()
-except Exception: pass
+# --------------------------------------------------------------------
+# 5) Soportes
+# --------------------------------------------------------------------
+def build_struts(p):
+    bus_W, bus_H, wall = p["bus_W"], p["bus_H"], p["wall"]
+    strut_w, strut_t, strut_clear = p["strut_w"], p["strut_t"], p["strut_clear"]
+    cx = p["cx"]
+    front_inner_z = p["bus_L"] - wall
+    bulk_z = front_inner_z - p["bulk_z_offset"] - p["bulk_thk"]
+
+    struts = []
+    inner_x0, inner_y0 = wall + strut_clear, wall + strut_clear
+    inner_x1, inner_y1 = bus_W - wall - strut_clear - strut_w, bus_H - wall - strut_clear - strut_w
+    strut_z0 = bulk_z + p["bulk_thk"]
+    strut_len = (front_inner_z - strut_z0) - 0.5
+
+    for x in (inner_x0, inner_x1):
+        for y in (inner_y0, inner_y1):
+            s = Part.makeBox(strut_w, strut_t, strut_len, vec(x,y,strut_z0))
+            struts.append(s)
+
+    sL = Part.makeBox(strut_t, strut_w, strut_len, vec(cx-18, wall+strut_clear, strut_z0))
+    sR = Part.makeBox(strut_t, strut_w, strut_len, vec(cx+18-strut_t, bus_H-wall-strut_clear-strut_w, strut_z0))
+    struts += [sL, sR]
+
+    return Part.makeCompound(struts)
 
 # --------------------------------------------------------------------
 # 7) Rebajes paneles solares
 # --------------------------------------------------------------------
-add_panel_recess = True
-panel_recess_depth, rail_keep, end_keep = 0.8, 8.5, 8.0
-if add_panel_recess and bus_obj:
+def add_solar_recess(bus_shell, p):
+    bus_W, bus_H, bus_L = p["bus_W"], p["bus_H"], p["bus_L"]
+    panel_recess_depth, rail_keep, end_keep = p["panel_recess_depth"], p["rail_keep"], p["end_keep"]
     recesses = [
         Part.makeBox(panel_recess_depth, bus_H-2*rail_keep, bus_L-2*end_keep, vec(bus_W-panel_recess_depth, rail_keep, end_keep)),
         Part.makeBox(panel_recess_depth, bus_H-2*rail_keep, bus_L-2*end_keep, vec(0, rail_keep, end_keep)),
@@ -244,37 +332,85 @@ if add_panel_recess and bus_obj:
         Part.makeBox(bus_W-2*rail_keep, panel_recess_depth, bus_L-2*end_keep, vec(rail_keep,0,end_keep))
     ]
     recess_comp = Part.makeCompound(recesses)
-    bus_obj.Shape = bus_obj.Shape.cut(recess_comp)
-    bus_obj.Label = "BusShell (Solar recess)"
-    try: bus_obj.ViewObject.ShapeColor = (0.75,0.75,0.78)
-    except Exception: pass
-
-doc.recompute()
+    return prof.cut(bus_shell, recess_comp)
 
 # --------------------------------------------------------------------
 # 8) Radiador lateral -Y
 # --------------------------------------------------------------------
-add_radiator = True
-if add_radiator:
-    rad_thk, rad_w, rad_L = 2.0, bus_W-2*rail_keep, bus_L*0.6
-    rad_z0 = (bus_L - rad_L)/2.0
+def build_radiator(p):
+    wall, rail_keep = p["wall"], p["rail_keep"]
+    rad_thk, rad_w, rad_L = p["rad_thk"], p["bus_W"]-2*rail_keep, p["rad_L"]
+    rad_z0 = (p["bus_L"] - rad_L)/2.0
     rad_x0 = rail_keep
-    standoff_d, standoff_h, standoff_hole_d, standoff_margin = 6.0, rad_thk+wall+1.0, 3.0, 10.0
+    standoff_d, standoff_h = p["standoff_d"], rad_thk+wall+1.0
+    standoff_hole_d, standoff_margin = p["standoff_hole_d"], p["standoff_margin"]
 
     radiator = Part.makeBox(rad_w, rad_thk, rad_L, vec(rad_x0,-rad_thk,rad_z0))
-    standoffs = [Part.makeCylinder(standoff_d/2.0, standoff_h, vec(rad_x0+dx,0-(standoff_h-wall),rad_z0+dz))
-                 for dx in (standoff_margin, rad_w-standoff_margin)
-                 for dz in (standoff_margin, rad_L-standoff_margin)]
-    standoffs_comp = Part.makeCompound(standoffs)
-
-    holes = [Part.makeCylinder(standoff_hole_d/2.0, rad_thk+wall+2.0, vec(rad_x0+dx,-rad_thk-1.0,rad_z0+dz))
-             for dx in (standoff_margin, rad_w-standoff_margin)
-             for dz in (standoff_margin, rad_L-standoff_margin)]
-    holes_comp = Part.makeCompound(holes)
-
-    radiator = radiator.fuse(standoffs_comp).cut(holes_comp)
-    rad_obj = add_part(radiator, "RadiatorY-")
-    try: rad_obj.ViewObject.ShapeColor = (0.2,0.3,0.7)
-    except Exception: pass
-
-doc.recompute()
+    # Standoffs y taladros normales al radiador (eje Y), en las 4 esquinas (x, z)
+    corners = aa.corner_points(rad_x0+standoff_margin, rad_x0+rad_w-standoff_margin,
+                               rad_z0+standoff_margin, rad_z0+rad_L-standoff_margin)
+    standoffs_comp = aa.cylinders(corners, standoff_d, -(standoff_h-wall), standoff_h, axis="Y")
+    radiator = prof.fuse(radiator, standoffs_comp)
+    return aa.cut_holes(radiator, corners, standoff_hole_d, -rad_thk-1.0, rad_thk+wall+2.0, axis="Y")
+
+# --------------------------------------------------------------------
+# 6) Agrupación
+# --------------------------------------------------------------------
+COLORS = {
+    "BusShell": (0.75,0.75,0.78),
+    "BulkheadInner": (0.55,0.55,0.6),
+    "CentralTube": (0.6,0.6,0.65),
+    "ThrusterAssembly": (0.8,0.8,0.85),
+    "ThrusterStruts": (0.4,0.4,0.45),
+    "RadiatorY-": (0.2,0.3,0.7),
+}
+
+def build(doc=None, params=None):
+    # Sin documento (doc=None) devuelve Component con formas (docless.py)
+    p = resolve_params(params)
+    with prof.section("3) Bus, bulkhead y tubo central"):
+        bus, bulk, tube = build_bus(p)
+    with prof.section("4) Propulsor"):
+        thruster = build_thruster(p)
+    with prof.section("5) Soportes"):
+        struts = build_struts(p)
+    if p["add_panel_recess"]:
+        with prof.section("7) Rebajes paneles solares"):
+            bus = add_solar_recess(bus, p)
+    shapes = {"BusShell": bus, "BulkheadInner": bulk, "CentralTube": tube,
+              "ThrusterAssembly": thruster, "ThrusterStruts": struts}
+    if p["add_radiator"]:
+        with prof.section("8) Radiador lateral -Y"):
+            shapes["RadiatorY-"] = build_radiator(p)
+
+    # Objetos del documento solo para los componentes finales
+    objs = {name: add_part(doc, s, name) for name, s in shapes.items() if s is not None}
+    if p["add_panel_recess"]:
+        objs["BusShell"].Label = "BusShell (Solar recess)"
+    group = docless.group(doc, "App::DocumentObjectGroup", "CubeSat_2U_Pro")
+    for name in ("BusShell", "BulkheadInner", "CentralTube", "ThrusterAssembly", "ThrusterStruts"):
+        if name in objs:
+            group.addObject(objs[name])
+    return group, objs
+
+def main():
+    doc = App.ActiveDocument
+    if doc is None or doc.Label != DOC_NAME:
+        doc = App.newDocument(DOC_NAME)
+    group, objs = build(doc)
+    prof.recompute(doc)
+
+    Gui = headless.gui()
+    if Gui:
+        for name, o in objs.items():
+            try: o.ViewObject.ShapeColor = COLORS[name]
+            except Exception: pass
+        lod.apply_view(objs.values())
+        Gui.ActiveDocument.ActiveView.fitAll()
+    deficit = resolve_params()["rad_heat_deficit_W"]
+    if deficit > 0:
+        print(f"Aviso: el radiador no cabe en el bus; faltan {deficit:.1f} W por evacuar")
+    print(default_cache().report())
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,33 @@
 # Macro FreeCAD: CubeSat 1U/2U corregido y estable
 # Autor: Víctor + Copilot
 # Requiere FreeCAD 0.20+
-import FreeCAD as App
-import Part
 import math
 import os
+import sys
+
+# CAD/cadTools (utilidades compartidas) en el path
+_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "CAD", "cadTools"))
+if _TOOLS_DIR not in sys.path:
+    sys.path.insert(0, _TOOLS_DIR)
+
+import docless
+import profiling as prof
+from model_registry import resolve
+
+try:
+    import FreeCAD as App
+    import Part
+except ImportError:
+    App = Part = None  # solo parámetros (CFG) sin FreeCAD
+
+DOC_NAME = "CubeSat2U"
 
 # -------------------------
 # CONFIG
 # -------------------------
 CFG = {
-    "variant":"2U",
+    "variant":"2U",            # "1U", "2U", "3U"... (Z = Z_1U * N salvo 2U)
+    "instancing":"shared",     # "off" | "shared" | "link" (ver PartFactory)
     "X":100.0, "Y":100.0, "Z_1U":113.5, "Z_2U":227.0,
     "panel_thk":1.6, "rail_w":8.0, "rail_h":2.0,
     "pcb_size":95.0, "pcb_thk":1.6, "n_pcbs":7, "gap_z":12.0,
@@ -22,124 +39,203 @@ CFG = {
     "fasteners":{"bcd":80.0,"hole_d":3.2,"depth":4.0},
     "materials":{"Al6061":2700,"Al7075":2810,"FR4":1900,"LiIon":2200,"Steel":7850,"Cell":2600}
 }
+P = CFG  # interfaz común de modelos (model_registry)
+
+MM=1.0
+
+def resolve_params(params=None):
+    return resolve(CFG, params, DOC_NAME)
 
 # -------------------------
-# DOC
+# Instancias (geometría compartida)
 # -------------------------
-doc = App.newDocument("CubeSat2U")
-App.setActiveDocument("CubeSat2U")
-MM=1.0
+# "off":    una forma propia por pieza (comportamiento original)
+# "shared": un prototipo por pieza única; cada Part::Feature lo reutiliza
+#           con su Placement (OCC comparte la geometría en memoria)
+# "link":   prototipos ocultos + App::Link por instancia (el documento solo
+#           guarda la geometría de las piezas únicas)
+# Sin documento (build(None)) cada pieza es una forma colocada (docless.py)
+# y "link" equivale a "shared".
+INSTANCING_MODES = ("off", "shared", "link")
+
+class PartFactory:
+    def __init__(self, doc, mode="shared"):
+        if mode not in INSTANCING_MODES:
+            raise ValueError(f"instancing debe ser uno de {INSTANCING_MODES}: {mode}")
+        if doc is None and mode == "link":
+            mode = "shared"
+        self.doc, self.mode = doc, mode
+        self.shapes = {}   # clave -> forma prototipo
+        self.protos = {}   # clave -> objeto prototipo (modo link)
+        self.group = None
+
+    def _shape(self, key, make):
+        if self.mode == "off":
+            return make()
+        if key not in self.shapes:
+            self.shapes[key] = make()
+        return self.shapes[key]
+
+    def _proto(self, key, make):
+        if key not in self.protos:
+            if self.group is None:
+                self.group = self.doc.addObject("App::DocumentObjectGroup", "Prototypes")
+            proto = prof.add_feature(self.doc, self._shape(key, make), f"Proto_{len(self.protos)+1}")
+            self.group.addObject(proto)
+            if getattr(proto, "ViewObject", None) is not None:
+                proto.ViewObject.Visibility = False
+            self.protos[key] = proto
+        return self.protos[key]
+
+    def place(self, key, make, placement, name):
+        if self.doc is None:
+            return docless.Component(name, docless.placed(self._shape(key, make), placement))
+        if self.mode == "link":
+            obj = self.doc.addObject("App::Link", name)
+            obj.setLink(self._proto(key, make))
+        else:
+            obj = prof.add_feature(self.doc, self._shape(key, make), name)
+        obj.Placement = placement
+        return obj
+
+def shape_of(obj):
+    # Forma global de un Part::Feature, un App::Link o un Component
+    return Part.getShape(obj) if obj.TypeId == "App::Link" else obj.Shape
+
+def _key(*values):
+    return tuple(round(float(v), 9) if isinstance(v, (int, float)) else v for v in values)
 
-def cube(X,Y,Z,cx=0,cy=0,cz=0,name="Cube"):
-    box=Part.makeBox(X,Y,Z)
-    obj=doc.addObject("Part::Feature",name)
-    obj.Shape=box
-    obj.Placement.Base=App.Vector(cx-X/2,cy-Y/2,cz-Z/2)
-    return obj
+def cube(parts,X,Y,Z,cx=0,cy=0,cz=0,name="Cube"):
+    pl=App.Placement(App.Vector(cx-X/2,cy-Y/2,cz-Z/2),App.Rotation())
+    return parts.place(_key("box",X,Y,Z),lambda: Part.makeBox(X,Y,Z),pl,name)
 
-def cylinder(d,h,axis="Z",cx=0,cy=0,cz=0,name="Cyl"):
+def cylinder(parts,d,h,axis="Z",cx=0,cy=0,cz=0,name="Cyl"):
     r=d/2
-    cyl=Part.makeCylinder(r,h)
-    obj=doc.addObject("Part::Feature",name)
-    obj.Shape=cyl
     if axis=="Z":
-        obj.Placement.Base=App.Vector(cx,cy,cz-h/2)
+        pl=App.Placement(App.Vector(cx,cy,cz-h/2),App.Rotation())
     elif axis=="Y":
-        obj.Placement.Rotation=App.Rotation(App.Vector(1,0,0),90)
-        obj.Placement.Base=App.Vector(cx,cy-h/2,cz)
+        pl=App.Placement(App.Vector(cx,cy-h/2,cz),App.Rotation(App.Vector(1,0,0),90))
     elif axis=="X":
-        obj.Placement.Rotation=App.Rotation(App.Vector(0,1,0),90)
-        obj.Placement.Base=App.Vector(cx-h/2,cy,cz)
-    return obj
+        pl=App.Placement(App.Vector(cx-h/2,cy,cz),App.Rotation(App.Vector(0,1,0),90))
+    return parts.place(_key("cyl",r,h),lambda: Part.makeCylinder(r,h),pl,name)
 
-# -------------------------
-# Raíles
-# -------------------------
-rails=[]
-rail_pos=[(CFG["X"]/2-CFG["rail_w"]/2,CFG["Y"]/2-CFG["rail_w"]/2),
-          (-CFG["X"]/2+CFG["rail_w"]/2,CFG["Y"]/2-CFG["rail_w"]/2),
-          (CFG["X"]/2-CFG["rail_w"]/2,-CFG["Y"]/2+CFG["rail_w"]/2),
-          (-CFG["X"]/2+CFG["rail_w"]/2,-CFG["Y"]/2+CFG["rail_w"]/2)]
-for i,(cx,cy) in enumerate(rail_pos):
-    r=cube(CFG["rail_w"],CFG["rail_w"],CFG["Z_2U"],cx=cx,cy=cy,cz=0,name=f"Rail_{i+1}")
-    rails.append(r)
-
-# Paneles
-panels=[]
-inX=CFG["X"]-2*CFG["rail_w"]
-inY=CFG["Y"]-2*CFG["rail_w"]
-panels.append(cube(CFG["panel_thk"],inY,CFG["Z_2U"],cx=+CFG["X"]/2-CFG["rail_w"]-CFG["panel_thk"]/2))
-panels.append(cube(CFG["panel_thk"],inY,CFG["Z_2U"],cx=-CFG["X"]/2+CFG["rail_w"]+CFG["panel_thk"]/2))
-panels.append(cube(inX,CFG["panel_thk"],CFG["Z_2U"],cy=+CFG["Y"]/2-CFG["rail_w"]-CFG["panel_thk"]/2))
-panels.append(cube(inX,CFG["panel_thk"],CFG["Z_2U"],cy=-CFG["Y"]/2+CFG["rail_w"]+CFG["panel_thk"]/2))
-panels.append(cube(inX,inY,CFG["panel_thk"],cz=+CFG["Z_2U"]/2-CFG["panel_thk"]/2))
-panels.append(cube(inX,inY,CFG["panel_thk"],cz=-CFG["Z_2U"]/2+CFG["panel_thk"]/2))
-
-# PCBs
-pcbs=[]
-z0=-CFG["Z_2U"]/2+12
-for i in range(CFG["n_pcbs"]):
-    pcb=cube(CFG["pcb_size"],CFG["pcb_size"],CFG["pcb_thk"],cz=z0+i*CFG["gap_z"],name=f"PCB_{i+1}")
-    pcbs.append(pcb)
-
-# Standoffs
-standoffs=[]
-offset=CFG["pcb_size"]/2-5
-for sx in (+offset,-offset):
-    for sy in (+offset,-offset):
-        s=cylinder(CFG["standoff_d"],CFG["standoff_h"]+(CFG["n_pcbs"]-1)*CFG["gap_z"],cz=z0+(CFG["standoff_h"]+(CFG["n_pcbs"]-1)*CFG["gap_z"])/2)
-        standoffs.append(s)
-
-# Batería
-bx,by,bz=CFG["battery_size"]
-battery=cube(bx,by,bz,cz=z0-4,name="Battery")
-
-# Propulsión
-prop_objs=[]
-tank=cylinder(CFG["propulsion"]["tank_d"],CFG["propulsion"]["tank_L"],cz=-CFG["Z_2U"]/2+CFG["panel_thk"]+CFG["propulsion"]["tank_L"]/2,name="Tank")
-prop_objs.append(tank)
-nzL=CFG["propulsion"]["nozzle_L"]
-throat=CFG["propulsion"]["nozzle_throat"]
-noz1=cylinder(throat,nzL*0.4,cz=-CFG["Z_2U"]/2-nzL*0.3)
-noz2=cylinder(throat*3,nzL*0.6,cz=-CFG["Z_2U"]/2-nzL*0.8)
-prop_objs.append(noz1)
-prop_objs.append(noz2)
-
-# Antenas
-ants=[]
-for i,L in enumerate(CFG["antennas"]):
-    ax=(-CFG["X"]/2+CFG["rail_w"]+10) if i==0 else (+CFG["X"]/2-CFG["rail_w"]-10)
-    ant=cylinder(1.2,L,axis="Y",cx=ax,cz=+CFG["Z_2U"]/2+2)
-    ants.append(ant)
+def build(doc, params=None):
+    cfg = resolve_params(params)
+    units = int(cfg["variant"].upper().rstrip("U"))
+    Z = cfg["Z_2U"] if units == 2 else cfg["Z_1U"]*units
+    parts = PartFactory(doc, cfg["instancing"])
 
-# -------------------------
-# Unión final
-# -------------------------
-all_parts=rails+panels+pcbs+standoffs+[battery]+prop_objs+ants
-assembly=Part.makeCompound([p.Shape for p in all_parts])
-obj_assembly=doc.addObject("Part::Feature","CubeSat2U")
-obj_assembly.Shape=assembly
-doc.recompute()
+    # -------------------------
+    # Raíles
+    # -------------------------
+    with prof.section("Raíles"):
+        rails=[]
+        rail_pos=[(cfg["X"]/2-cfg["rail_w"]/2,cfg["Y"]/2-cfg["rail_w"]/2),
+                  (-cfg["X"]/2+cfg["rail_w"]/2,cfg["Y"]/2-cfg["rail_w"]/2),
+                  (cfg["X"]/2-cfg["rail_w"]/2,-cfg["Y"]/2+cfg["rail_w"]/2),
+                  (-cfg["X"]/2+cfg["rail_w"]/2,-cfg["Y"]/2+cfg["rail_w"]/2)]
+        for i,(cx,cy) in enumerate(rail_pos):
+            r=cube(parts,cfg["rail_w"],cfg["rail_w"],Z,cx=cx,cy=cy,cz=0,name=f"Rail_{i+1}")
+            rails.append(r)
+
+    # Paneles
+    with prof.section("Paneles"):
+        panels=[]
+        inX=cfg["X"]-2*cfg["rail_w"]
+        inY=cfg["Y"]-2*cfg["rail_w"]
+        panels.append(cube(parts,cfg["panel_thk"],inY,Z,cx=+cfg["X"]/2-cfg["rail_w"]-cfg["panel_thk"]/2,name="Panel_XP"))
+        panels.append(cube(parts,cfg["panel_thk"],inY,Z,cx=-cfg["X"]/2+cfg["rail_w"]+cfg["panel_thk"]/2,name="Panel_XN"))
+        panels.append(cube(parts,inX,cfg["panel_thk"],Z,cy=+cfg["Y"]/2-cfg["rail_w"]-cfg["panel_thk"]/2,name="Panel_YP"))
+        panels.append(cube(parts,inX,cfg["panel_thk"],Z,cy=-cfg["Y"]/2+cfg["rail_w"]+cfg["panel_thk"]/2,name="Panel_YN"))
+        panels.append(cube(parts,inX,inY,cfg["panel_thk"],cz=+Z/2-cfg["panel_thk"]/2,name="Panel_ZP"))
+        panels.append(cube(parts,inX,inY,cfg["panel_thk"],cz=-Z/2+cfg["panel_thk"]/2,name="Panel_ZN"))
+
+    # PCBs
+    with prof.section("PCBs"):
+        pcbs=[]
+        z0=-Z/2+12
+        for i in range(cfg["n_pcbs"]):
+            pcb=cube(parts,cfg["pcb_size"],cfg["pcb_size"],cfg["pcb_thk"],cz=z0+i*cfg["gap_z"],name=f"PCB_{i+1}")
+            pcbs.append(pcb)
+
+    # Standoffs
+    with prof.section("Standoffs"):
+        standoffs=[]
+        offset=cfg["pcb_size"]/2-5
+        for sx in (+offset,-offset):
+            for sy in (+offset,-offset):
+                s=cylinder(parts,cfg["standoff_d"],cfg["standoff_h"]+(cfg["n_pcbs"]-1)*cfg["gap_z"],cx=sx,cy=sy,cz=z0+(cfg["standoff_h"]+(cfg["n_pcbs"]-1)*cfg["gap_z"])/2,name=f"Standoff_{len(standoffs)+1}")
+                standoffs.append(s)
+
+    # Batería
+    with prof.section("Batería"):
+        bx,by,bz=cfg["battery_size"]
+        battery=cube(parts,bx,by,bz,cz=z0-4,name="Battery")
+
+    # Propulsión
+    with prof.section("Propulsión"):
+        prop_objs=[]
+        tank=cylinder(parts,cfg["propulsion"]["tank_d"],cfg["propulsion"]["tank_L"],cz=-Z/2+cfg["panel_thk"]+cfg["propulsion"]["tank_L"]/2,name="Tank")
+        prop_objs.append(tank)
+        nzL=cfg["propulsion"]["nozzle_L"]
+        throat=cfg["propulsion"]["nozzle_throat"]
+        noz1=cylinder(parts,throat,nzL*0.4,cz=-Z/2-nzL*0.3,name="Nozzle_Throat")
+        noz2=cylinder(parts,throat*3,nzL*0.6,cz=-Z/2-nzL*0.8,name="Nozzle_Exit")
+        prop_objs.append(noz1)
+        prop_objs.append(noz2)
+
+    # Antenas
+    with prof.section("Antenas"):
+        ants=[]
+        for i,L in enumerate(cfg["antennas"]):
+            ax=(-cfg["X"]/2+cfg["rail_w"]+10) if i==0 else (+cfg["X"]/2-cfg["rail_w"]-10)
+            ant=cylinder(parts,1.2,L,axis="Y",cx=ax,cz=+Z/2+2,name=f"Antenna_{i+1}")
+            ants.append(ant)
+
+    # -------------------------
+    # Unión final
+    # -------------------------
+    with prof.section("Unión final"):
+        all_parts=rails+panels+pcbs+standoffs+[battery]+prop_objs+ants
+        assembly=Part.makeCompound([shape_of(p) for p in all_parts])
+        obj_assembly=docless.add(doc,assembly,"CubeSat2U")
+    if doc is not None:
+        prof.recompute(doc)
+    # Componentes individuales (exportación por pieza); el compound es la raíz
+    return obj_assembly, {o.Name: o for o in all_parts}
 
 # -------------------------
-# TechDraw opcional
+# TechDraw opcional (import perezoso)
 # -------------------------
-try:
-    import TechDraw
-    page=doc.addObject('TechDraw::DrawPage','Page')
-    template=doc.addObject('TechDraw::DrawSVGTemplate','Template')
-    template.Template=App.getResourceDir()+'Mod/TechDraw/Templates/A4_LandscapeTD.svg'
-    page.Template=template
-    view=doc.addObject('TechDraw::DrawViewPart','View')
-    view.Source=obj_assembly
-    page.addView(view)
-except:
-    print("TechDraw no disponible")
+def add_techdraw_page(doc, obj_assembly):
+    try:
+        import TechDraw  # noqa: F401
+        page=doc.addObject('TechDraw::DrawPage','Page')
+        template=doc.addObject('TechDraw::DrawSVGTemplate','Template')
+        template.Template=App.getResourceDir()+'Mod/TechDraw/Templates/A4_LandscapeTD.svg'
+        page.Template=template
+        view=doc.addObject('TechDraw::DrawViewPart','View')
+        view.Source=obj_assembly
+        page.addView(view)
+    except Exception:
+        print("TechDraw no disponible")
 
 # -------------------------
 # Export STEP
 # -------------------------
-out_dir=os.path.join(App.getUserAppDataDir(),"CubeSat_exports")
-if not os.path.exists(out_dir): os.makedirs(out_dir)
-Part.export([obj_assembly],os.path.join(out_dir,"CubeSat2U.step"))
-print("Macro ejecutada correctamente")
+def export_step(obj_assembly, out_dir=None):
+    out_dir=out_dir or os.path.join(App.getUserAppDataDir(),"CubeSat_exports")
+    if not os.path.exists(out_dir): os.makedirs(out_dir)
+    path=os.path.join(out_dir,"CubeSat2U.step")
+    return prof.export([obj_assembly],path)
+
+def main():
+    doc = App.newDocument(DOC_NAME)
+    App.setActiveDocument(doc.Name)
+    obj_assembly, _ = build(doc)
+    add_techdraw_page(doc, obj_assembly)
+    export_step(obj_assembly)
+    print("Macro ejecutada correctamente")
+
+if __name__ == "__main__":
+    main()
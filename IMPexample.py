@@ -1,58 +1,103 @@
-import FreeCAD as App
-import Part
+import os
+import sys
 
-doc = App.newDocument("FusionPropulsion")
+# CAD/cadTools (utilidades compartidas) en el path
+_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "CAD", "cadTools"))
+if _TOOLS_DIR not in sys.path:
+    sys.path.insert(0, _TOOLS_DIR)
+
+import docless
+import profiling as prof
+from boolean_fuse import fuse_all
+from model_registry import resolve
+
+try:
+    import FreeCAD as App
+    import Part
+except ImportError:
+    App = Part = None  # solo parámetros (P) sin FreeCAD
+
+DOC_NAME = "FusionPropulsion"
 
 # --- Parámetros ---
-bus_size = 1200   # mm
-reactor_diam = 810
-reactor_length = 1200
+P = {
+    "bus_size": 1200.0,   # mm
+    "reactor_diam": 810.0,
+    "reactor_length": 1200.0,
 
-shield_diam = 1200
-shield_thickness = 50
+    "shield_diam": 1200.0,
+    "shield_thickness": 50.0,
 
-truss_length1 = 4000
-truss_length2 = 8000
-truss_diam = 200
+    "truss_length1": 4000.0,
+    "truss_length2": 8000.0,
+    "truss_diam": 200.0,
 
-nozzle_length = 8000
-nozzle_exit_diam = 2000
-nozzle_throat_diam = 400
+    "nozzle_length": 8000.0,
+    "nozzle_exit_diam": 2000.0,
+    "nozzle_throat_diam": 400.0,
 
-tank_diam = 1200
-tank_length = 5000
+    "tank_diam": 1200.0,
+    "tank_length": 5000.0,
+    "tank_offset_x": 700.0,   # separación lateral de cada tanque respecto al eje
+}
 
-# --- Bus ---
-bus = Part.makeBox(bus_size, bus_size, bus_size)
+def resolve_params(params=None):
+    return resolve(P, params, DOC_NAME)
 
-# --- Reactor ---
-reactor = Part.makeCylinder(reactor_diam/2, reactor_length)
-reactor.translate(App.Vector(bus_size/2, bus_size/2, 0))
+def make_parts(p):
+    bus_size = p["bus_size"]
+    c = bus_size/2
 
-# --- Blindaje ---
-shield = Part.makeCylinder(shield_diam/2, shield_thickness)
-shield.translate(App.Vector(bus_size/2, bus_size/2, bus_size))
+    # --- Bus ---
+    bus = Part.makeBox(bus_size, bus_size, bus_size)
 
-# --- Truss ---
-truss1 = Part.makeCylinder(truss_diam/2, truss_length1)
-truss1.translate(App.Vector(bus_size/2, bus_size/2, bus_size+shield_thickness))
+    # --- Reactor ---
+    reactor = Part.makeCylinder(p["reactor_diam"]/2, p["reactor_length"])
+    reactor.translate(App.Vector(c, c, 0))
 
-truss2 = Part.makeCylinder(truss_diam/2, truss_length2)
-truss2.translate(App.Vector(bus_size/2, bus_size/2, bus_size+shield_thickness+truss_length1))
+    # --- Blindaje ---
+    shield = Part.makeCylinder(p["shield_diam"]/2, p["shield_thickness"])
+    shield.translate(App.Vector(c, c, bus_size))
 
-# --- Tobera magnética ---
-nozzle = Part.makeCone(nozzle_throat_diam/2, nozzle_exit_diam/2, nozzle_length)
-nozzle.translate(App.Vector(bus_size/2, bus_size/2, bus_size+truss_length1+truss_length2))
+    # --- Truss ---
+    truss1 = Part.makeCylinder(p["truss_diam"]/2, p["truss_length1"])
+    truss1.translate(App.Vector(c, c, bus_size+p["shield_thickness"]))
 
-# --- Tanques ---
-tank1 = Part.makeCylinder(tank_diam/2, tank_length)
-tank1.translate(App.Vector(bus_size/2 - 700, bus_size/2, bus_size+truss_length1))
+    truss2 = Part.makeCylinder(p["truss_diam"]/2, p["truss_length2"])
+    truss2.translate(App.Vector(c, c, bus_size+p["shield_thickness"]+p["truss_length1"]))
 
-tank2 = Part.makeCylinder(tank_diam/2, tank_length)
-tank2.translate(App.Vector(bus_size/2 + 700, bus_size/2, bus_size+truss_length1))
+    # --- Tobera magnética ---
+    nozzle = Part.makeCone(p["nozzle_throat_diam"]/2, p["nozzle_exit_diam"]/2, p["nozzle_length"])
+    nozzle.translate(App.Vector(c, c, bus_size+p["truss_length1"]+p["truss_length2"]))
 
-# --- Ensamblado ---
-assembly = bus.fuse([reactor, shield, truss1, truss2, nozzle, tank1, tank2])
+    # --- Tanques ---
+    tank1 = Part.makeCylinder(p["tank_diam"]/2, p["tank_length"])
+    tank1.translate(App.Vector(c - p["tank_offset_x"], c, bus_size+p["truss_length1"]))
 
-Part.show(assembly)
-doc.recompute()
+    tank2 = Part.makeCylinder(p["tank_diam"]/2, p["tank_length"])
+    tank2.translate(App.Vector(c + p["tank_offset_x"], c, bus_size+p["truss_length1"]))
+
+    return {
+        "Bus": bus, "Reactor": reactor, "Shield": shield,
+        "Truss1": truss1, "Truss2": truss2, "Nozzle": nozzle,
+        "Tank1": tank1, "Tank2": tank2,
+    }
+
+# --- Ensamblado ---
+def build(doc, params=None):
+    p = resolve_params(params)
+    with prof.section("Piezas"):
+        parts = list(make_parts(p).values())
+    with prof.section("Ensamblado"):
+        assembly = fuse_all(parts)
+        del parts   # las piezas sueltas no sobreviven a la fusión
+    obj = docless.add(doc, assembly, "FusionPropulsion")
+    return obj, {obj.Name: obj}
+
+def main():
+    doc = App.newDocument(DOC_NAME)
+    build(doc)
+    prof.recompute(doc)
+
+if __name__ == "__main__":
+    main()
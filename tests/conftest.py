@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Pruebas de los módulos NumPy de CAD/cadTools (sin FreeCAD).
+#
+#   python -m pytest -q tests
+
+import os
+import sys
+
+TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "CAD", "cadTools"))
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import importlib
+import sys
+
+import pytest
+
+import brep_cache
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    # Dos módulos "de cadTools": el constructor llama a un ayudante a través del módulo
+    (tmp_path / "ayudante.py").write_text("def perfil(x):\n    return x * 2\n")
+    (tmp_path / "constructor.py").write_text(
+        "import ayudante\n\ndef pieza(x):\n    return ayudante.perfil(x)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(brep_cache, "ROOTS", (str(tmp_path),))
+    monkeypatch.setattr(brep_cache, "_sources", {})
+    yield tmp_path
+    for name in ("ayudante", "constructor"):
+        sys.modules.pop(name, None)
+
+def test_canonical_merges_int_and_float():
+    assert brep_cache.canonical([100, {"a": 2}]) == brep_cache.canonical((100.0, {"a": 2.0}))
+
+def test_key_depends_on_arguments(tools):
+    pieza = importlib.import_module("constructor").pieza
+    assert brep_cache.make_key(pieza, (1.0,), {}) != brep_cache.make_key(pieza, (2.0,), {})
+    assert brep_cache.make_key(pieza, (1,), {}) == brep_cache.make_key(pieza, (1.0,), {})
+
+def test_editing_a_helper_module_invalidates_the_key(tools):
+    pieza = importlib.import_module("constructor").pieza
+    before = brep_cache.make_key(pieza, (1.0,), {})
+    (tools / "ayudante.py").write_text("def perfil(x):\n    return x * 3.0\n")
+    assert brep_cache.make_key(pieza, (1.0,), {}) != before
+
+def test_modules_outside_the_roots_are_not_hashed(tools, monkeypatch):
+    pieza = importlib.import_module("constructor").pieza
+    monkeypatch.setattr(brep_cache, "ROOTS", ("/nonexistent",))
+    before = brep_cache.make_key(pieza, (1.0,), {})
+    (tools / "ayudante.py").write_text("def perfil(x):\n    return x * 3.0\n")
+    assert brep_cache.make_key(pieza, (1.0,), {}) == before
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import coil_field as cf
+
+@pytest.mark.parametrize("axis", ["X", "Y", "Z", (1.0, 1.0, 0.0)])
+def test_thin_loop_matches_on_axis(axis):
+    c = cf.coil((10.0, -5.0, 3.0), axis, 35.0, 0.0, 1000.0)
+    segs = cf.segments([c], n_seg=360)
+    a = cf.axis_vector(axis)
+    z = np.array([0.0, 10.0, 35.0, 100.0, -60.0])
+    B = cf.field(np.asarray(c["center"]) + z[:, None] * a, segs)
+    np.testing.assert_allclose(B @ a, cf.on_axis(c, z), rtol=1e-3)
+    # En el eje el campo es axial
+    np.testing.assert_allclose(np.linalg.norm(B - np.outer(B @ a, a), axis=1), 0.0, atol=1e-9)
+
+def test_current_sense_follows_axis():
+    up = cf.segments([cf.coil((0, 0, 0), "Z", 20.0, 0.0, 500.0)])
+    down = cf.segments([cf.coil((0, 0, 0), (0, 0, -1), 20.0, 0.0, 500.0)])
+    b_up = cf.field(np.zeros((1, 3)), up)[0]
+    b_down = cf.field(np.zeros((1, 3)), down)[0]
+    assert b_up[2] > 0.0
+    np.testing.assert_allclose(b_down, -b_up, atol=1e-12)
+
+def test_thick_coil_center_close_to_thin():
+    thin = cf.coil((0, 0, 0), "Z", 35.0, 0.0, 1000.0)
+    thick = cf.coil((0, 0, 0), "Z", 35.0, 5.0, 1000.0)
+    b = cf.field(np.zeros((1, 3)), cf.segments([thick], n_seg=180))[0, 2]
+    assert b == pytest.approx(cf.on_axis(thin, 0.0), rel=0.02)
+
+def test_field_serial_and_chunked_agree(monkeypatch):
+    segs = cf.segments([cf.coil((0, 0, 0), "Z", 20.0, 3.0, 800.0)], n_seg=36)
+    pts = np.random.default_rng(0).uniform(-50.0, 50.0, size=(200, 3))
+    full = cf.field(pts, segs)
+    monkeypatch.setattr(cf, "CHUNK_ELEMS", 100)
+    np.testing.assert_allclose(cf.field(pts, segs), full)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import dispersion
+import param_sweep
+
+def test_verify_compares_analytic_mass_with_the_occ_mass(monkeypatch):
+    model = dispersion._get_model()
+    analytic = float(np.asarray(model.analytic_mass({})["dry"]["mass_kg"]))
+
+    def fake_sweep(variants, **kwargs):
+        return [{"status": "ok", "TotalGeomMass_kg": analytic, "TotalOccMass_kg": 1.02 * analytic}
+                for _ in variants]
+
+    monkeypatch.setattr(param_sweep, "run_sweep", fake_sweep)
+    out = dispersion.verify([{"wet_kg": 0.0}])[0]
+    assert out["occ_dry_kg"] == pytest.approx(1.02 * analytic)
+    assert out["analytic_err"] == pytest.approx(1.0 / 1.02 - 1.0)
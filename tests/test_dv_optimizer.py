@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import dv_optimizer
+import param_sweep
+
+def test_verify_compares_the_surrogate_with_the_occ_mass(monkeypatch):
+    # TotalGeomMass_kg de una construcción es el propio sustituto analítico
+    def fake_sweep(variants, **kwargs):
+        return [{"status": "ok", "TotalGeomMass_kg": 1000.0, "TotalOccMass_kg": 1250.0} for _ in variants]
+
+    monkeypatch.setattr(param_sweep, "run_sweep", fake_sweep)
+    row = {n: lo for n, (lo, _, _) in dv_optimizer.BOUNDS.items()}
+    row["dry_kg"] = 1000.0
+    out = dv_optimizer.verify([row])[0]
+    assert out["occ_dry_kg"] == 1250.0
+    assert out["surrogate_err"] == pytest.approx(1000.0 / 1250.0 - 1.0)
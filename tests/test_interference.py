@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from interference import candidate_pairs
+
+def brute_force(boxes, margin):
+    lo = boxes[:, :3] - margin[:, None]
+    hi = boxes[:, 3:] + margin[:, None]
+    out = set()
+    for i in range(len(boxes)):
+        for j in range(i + 1, len(boxes)):
+            if np.all(lo[j] <= hi[i]) and np.all(lo[i] <= hi[j]):
+                out.add((i, j))
+    return out
+
+def random_boxes(rng, n):
+    lo = rng.uniform(0.0, 100.0, size=(n, 3))
+    return np.hstack([lo, lo + rng.uniform(0.5, 15.0, size=(n, 3))])
+
+def test_candidate_pairs_match_brute_force():
+    rng = np.random.default_rng(1)
+    for n in (2, 5, 40, 150):
+        boxes = random_boxes(rng, n)
+        margin = rng.uniform(0.0, 3.0, size=n)
+        got = {tuple(p) for p in candidate_pairs(boxes, margin)}
+        assert got == brute_force(boxes, margin)
+
+def test_candidate_pairs_without_margin_and_touching():
+    boxes = np.array([[0, 0, 0, 1, 1, 1], [1, 0, 0, 2, 1, 1], [3, 0, 0, 4, 1, 1]], dtype=float)
+    assert {tuple(p) for p in candidate_pairs(boxes)} == {(0, 1)}
+    assert {tuple(p) for p in candidate_pairs(boxes, [0.0, 0.5, 0.6])} == {(0, 1), (1, 2)}
+
+def test_candidate_pairs_degenerate():
+    assert candidate_pairs(np.empty((0, 6))).shape == (0, 2)
+    assert candidate_pairs(np.zeros((1, 6))).shape == (0, 2)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import ion_optics as io
+
+def test_unknown_propellant():
+    with pytest.raises(KeyError):
+        io.constants("He")
+
+def test_operating_at_margin():
+    res = io.evaluate(1.0, 0.65, 1.2, 1000.0)
+    assert res["perveance_margin"] == pytest.approx(io.BEAM["min_margin"])
+    assert bool(res["feasible"])
+    assert res["I_beam_A"] == pytest.approx((1.0 - io.BEAM["min_margin"]) * res["I_grid_max_A"])
+
+def test_thrust_and_isp_closed_form():
+    V, I = 1200.0, 0.02
+    res = io.evaluate(1.0, 0.65, 1.2, V, "Xe", beam_A=I)
+    M = io.constants("Xe")["mass_kg"]
+    thrust = io.BEAM["thrust_factor"] * I * np.sqrt(2.0 * M * V / io.Q_E)
+    assert res["thrust_mN"] == pytest.approx(thrust * 1e3)
+    isp = io.BEAM["thrust_factor"] * io.BEAM["mass_util"] * np.sqrt(2.0 * io.Q_E * V / M) / io.G0
+    assert res["isp_s"] == pytest.approx(isp)
+    assert res["beam_power_W"] == pytest.approx(I * V)
+
+def test_perveance_scales_with_gap():
+    gaps = np.array([0.5, 1.0, 2.0])
+    res = io.evaluate(gaps, 0.65, 1.2, 1000.0)
+    assert np.all(np.diff(res["I_grid_max_A"]) < 0.0)
+    assert np.all(np.diff(res["field_kV_mm"]) < 0.0)
+
+def test_no_apertures_is_infeasible():
+    res = io.evaluate(1.0, 0.01, 1.2, 1000.0, beam_A=0.01)
+    assert res["apertures"] == 0.0
+    assert not bool(res["feasible"])
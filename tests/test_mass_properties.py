@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import mass_properties as mp
+
+def test_box_closed_form():
+    p = mp.box(10.0, 20.0, 30.0, base=(1.0, 2.0, 3.0))
+    assert p.vol == pytest.approx(6000.0)
+    np.testing.assert_allclose(p.cg, [6.0, 12.0, 18.0])
+    np.testing.assert_allclose(np.diag(p.J), 6000.0 / 12.0 * np.array([20**2 + 30**2, 10**2 + 30**2, 10**2 + 20**2]))
+    np.testing.assert_allclose(p.J - np.diag(np.diag(p.J)), 0.0)
+
+@pytest.mark.parametrize("axis", ["x", "y", "z"])
+def test_cylinder_closed_form(axis):
+    r, L = 5.0, 40.0
+    p = mp.cylinder(r, L, axis=axis)
+    vol = np.pi * r**2 * L
+    k = mp.AXES[axis]
+    assert p.vol == pytest.approx(vol)
+    cg = np.zeros(3)
+    cg[k] = L / 2.0
+    np.testing.assert_allclose(p.cg, cg, atol=1e-12)
+    expected = np.full(3, vol * (3 * r**2 + L**2) / 12.0)
+    expected[k] = vol * r**2 / 2.0
+    np.testing.assert_allclose(np.diag(p.J), expected)
+
+def test_cone_closed_form():
+    r, h = 6.0, 12.0
+    p = mp.cone(r, 0.0, h)
+    vol = np.pi * r**2 * h / 3.0
+    assert p.vol == pytest.approx(vol)
+    assert p.cg[2] == pytest.approx(h / 4.0)
+    # Cono macizo respecto a su CG: axial 3/10·m·r², transversal 3/80·m·(4r² + h²)
+    np.testing.assert_allclose(np.diag(p.J), [3.0 / 80.0 * vol * (4 * r**2 + h**2)] * 2 + [0.3 * vol * r**2])
+
+def test_annulus_is_difference_of_cylinders():
+    ro, ri, L = 10.0, 8.0, 50.0
+    p = mp.annulus(ro, ri, L)
+    vol = np.pi * (ro**2 - ri**2) * L
+    assert p.vol == pytest.approx(vol)
+    assert p.J[2, 2] == pytest.approx(vol * (ro**2 + ri**2) / 2.0)
+
+def test_combine_two_halves_equals_whole():
+    whole = mp.box(20.0, 10.0, 10.0)
+    halves = mp.combine([mp.box(10.0, 10.0, 10.0), mp.box(10.0, 10.0, 10.0, base=(10.0, 0.0, 0.0))])
+    assert halves.vol == pytest.approx(whole.vol)
+    np.testing.assert_allclose(halves.cg, whole.cg)
+    np.testing.assert_allclose(halves.J, whole.J)
+
+def test_rollup_mass_cg_inertia():
+    rho = 2700.0
+    parts = [mp.box(10.0, 10.0, 10.0), mp.box(10.0, 10.0, 10.0, base=(10.0, 0.0, 0.0))]
+    res = mp.rollup(parts, [rho, rho])
+    whole = mp.box(20.0, 10.0, 10.0)
+    assert res["mass_kg"] == pytest.approx(rho * whole.vol * 1e-9)
+    np.testing.assert_allclose(res["cg_mm"], whole.cg)
+    np.testing.assert_allclose(res["inertia_kgm2"], rho * 1e-9 * whole.J * 1e-6)
+
+def test_rollup_broadcasts_variants():
+    lengths = np.array([10.0, 20.0, 30.0])
+    parts = [mp.box(lengths, 10.0, 10.0), mp.cylinder(5.0, 10.0)]
+    res = mp.rollup(parts, [1000.0, 8000.0], inertia=False)
+    assert res["mass_kg"].shape == (3,)
+    for i, L in enumerate(lengths):
+        single = mp.rollup([mp.box(L, 10.0, 10.0), mp.cylinder(5.0, 10.0)], [1000.0, 8000.0])
+        assert res["mass_kg"][i] == pytest.approx(single["mass_kg"])
+        np.testing.assert_allclose(res["cg_mm"][i], single["cg_mm"])
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import mission
+import param_sweep
+
+@pytest.fixture(scope="module")
+def grid():
+    # La rejilla de la revisión: con frenado anticipado todas "llegaban" a miles de km
+    designs = param_sweep.expand_grid(param_sweep.parse_spec(["REACTOR_LEN=1500:3500:3", "RAD_LEN=2000:4000:3"]))
+    params = mission.stack(designs)
+    return mission.simulate(mission._get_model(), params)
+
+def test_arrivals_are_at_the_target(grid):
+    ok = grid["arrived"]
+    assert ok.any()
+    assert np.all(np.abs(grid["miss_km"][ok]) <= mission.MISSION["arrive_tol_km"])
+    assert np.all(np.abs(grid["arrival_v_ms"][ok]) <= mission.MISSION["arrive_tol_ms"])
+    assert np.all(np.isfinite(grid["transfer_days"][ok]))
+
+def test_misses_have_no_transfer_time(grid):
+    miss = ~grid["arrived"]
+    assert np.all(np.isnan(grid["transfer_days"][miss]))
+
+def test_early_braking_is_corrected_with_new_legs():
+    # brake_margin frena antes de tiempo; los tramos siguientes cubren lo que falta
+    model = mission._get_model()
+    params = mission.stack([{}], keys=["REACTOR_LEN"])
+    out = mission.simulate(model, params)
+    assert out["arrived"][0]
+    assert abs(out["miss_km"][0]) <= mission.MISSION["arrive_tol_km"]
+
+def test_stopping_short_without_budget_is_a_miss():
+    model = mission._get_model()
+    params = mission.stack([{}], keys=["REACTOR_LEN"])
+    out = mission.simulate(model, params, {"brake_margin": 1.5})
+    assert not out["arrived"][0]
+    assert out["miss_km"][0] > mission.MISSION["arrive_tol_km"]
+    assert np.isnan(out["transfer_days"][0])
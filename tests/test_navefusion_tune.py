@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import types
+
+import pytest
+
+from model_registry import load_model
+
+@pytest.fixture
+def session(monkeypatch):
+    # tune() sin FreeCAD: rebuild solo resuelve los parámetros que recibe
+    model = load_model("navefusion")
+    seen = []
+
+    def fake_rebuild(assembly, objs, graph, params):
+        seen.append(model.resolve_params(params))
+        return []
+
+    monkeypatch.setattr(model, "rebuild", fake_rebuild)
+    monkeypatch.setattr(model, "SESSION", {
+        "doc": types.SimpleNamespace(recompute=lambda: None),
+        "assembly": types.SimpleNamespace(TotalGeomMass_kg=0.0),
+        "objs": {}, "graph": None, "overrides": {}})
+    return model, seen
+
+def test_tune_rederives_fin_efficiency(session):
+    model, seen = session
+    model.tune(RAD_T=5.0)
+    model.tune(RAD_PIPE_PITCH=200.0)
+    assert model.SESSION["overrides"] == {"RAD_T": 5.0, "RAD_PIPE_PITCH": 200.0}
+    assert seen[-1]["RAD_FIN_EFF"] == pytest.approx(model.radiator_fin_eff(dict(model.P, RAD_T=5.0,
+                                                                                  RAD_PIPE_PITCH=200.0)))
+    assert seen[-1]["RAD_FIN_EFF"] < seen[0]["RAD_FIN_EFF"] < model.resolve_params()["RAD_FIN_EFF"]
+
+def test_tune_shrinks_radiators_when_waste_heat_drops(session):
+    model, seen = session
+    model.tune(RAD_WASTE_KW=4000.0)
+    model.tune(RAD_WASTE_KW=500.0)
+    big, small = seen
+    assert small["RAD_LEN"] * small["RAD_W"] < big["RAD_LEN"] * big["RAD_W"]
+    assert small == pytest.approx(model.resolve_params({"RAD_WASTE_KW": 500.0}))
+    model.tune(RAD_WASTE_KW=None)
+    assert model.SESSION["overrides"] == {}
+    assert seen[-1]["RAD_W"] == model.P["RAD_W"]
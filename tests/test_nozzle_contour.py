@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import nozzle_contour as nc
+
+@pytest.mark.parametrize("kind", nc.KINDS)
+def test_end_points(kind):
+    z, r = nc.contours(kind, 57.0, 33.0, 52.0, 120.0)
+    np.testing.assert_allclose(z[:, [0, -1]], [[0.0, 120.0]])
+    np.testing.assert_allclose(r[:, [0, -1]], [[28.5, 26.0]])
+
+@pytest.mark.parametrize("kind", ["conical", "bell"])
+def test_throat_is_minimum(kind):
+    z, r = nc.contours(kind, 57.0, 33.0, 52.0, 120.0, throat_frac=0.35)
+    assert r.min() == pytest.approx(16.5)
+    assert z[0, np.argmin(r[0])] == pytest.approx(0.35 * 120.0, abs=1e-6)
+
+def test_batch_matches_single():
+    d_exit = np.array([40.0, 52.0, 80.0])
+    z, r = nc.contours("bell", 57.0, 33.0, d_exit, 120.0)
+    for i, d in enumerate(d_exit):
+        zi, ri = nc.contours("bell", 57.0, 33.0, d, 120.0)
+        np.testing.assert_allclose(z[i], zi[0])
+        np.testing.assert_allclose(r[i], ri[0])
+
+def test_profile_is_memoized_and_read_only():
+    a = nc.profile("bell", 57, 33, 52, 120)
+    assert nc.profile("bell", 57.0, 33.0, 52.0, 120.0) is a
+    with pytest.raises(ValueError):
+        a[0, 0] = 1.0
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        nc.contours("spike", 57.0, 33.0, 52.0, 120.0)
+
+def test_exit_diameter_round_trip():
+    assert nc.exit_diameter(33.0, nc.area_ratio(33.0, 52.0)) == pytest.approx(52.0)
+
+def test_converging_short_section_is_monotonic_and_tangent():
+    # Valores por defecto de PropulsMejora: convergente más corto que el arco 1.5*Rt
+    z, r = nc.converging(28.5, 16.5, 11.2, 12)
+    assert np.all(np.diff(z[0]) > 0.0)
+    assert np.all(np.diff(r[0]) < 0.0)
+    np.testing.assert_allclose([z[0, 0], r[0, 0], z[0, -1], r[0, -1]], [-11.2, 28.5, 0.0, 16.5], atol=1e-12)
+    # Recta tangente al arco: la pendiente de la recta es la del arco en el punto de unión
+    n_line = 12 // 3 - 1                   # primer punto del arco
+    slope_line = (r[0, n_line] - r[0, 0]) / (z[0, n_line] - z[0, 0])
+    Ru = 0.5 * 11.2
+    zj, rj = z[0, n_line], r[0, n_line]
+    slope_arc = -zj / (rj - 16.5 - Ru)     # normal al círculo de centro (0, Rt + Ru)
+    assert slope_line == pytest.approx(slope_arc, rel=1e-9)
+
+def test_contours_z_strictly_increasing():
+    rng = np.random.default_rng(2)
+    d_th = rng.uniform(5.0, 40.0, 500)
+    d_in = d_th * rng.uniform(1.0, 4.0, 500)
+    d_ex = d_th * rng.uniform(1.0, 8.0, 500)
+    L = rng.uniform(10.0, 300.0, 500)
+    frac = rng.uniform(0.05, 0.6, 500)
+    for kind in ("conical", "bell"):
+        z, r = nc.contours(kind, d_in, d_th, d_ex, L, frac)
+        assert np.all(np.diff(z, axis=1) > 0.0), kind
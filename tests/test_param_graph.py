@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from param_graph import DependencyGraph, TrackingParams
+
+def test_tracking_params_records_reads():
+    tp = TrackingParams({"a": 1, "b": 2, "c": 3})
+    assert tp["a"] + tp.get("c") == 4
+    assert tp.reads == {"a", "c"}
+
+def test_dirty_components():
+    g = DependencyGraph()
+    p = {"L": 10.0, "W": 2.0, "D": 5.0}
+    g.run("box", lambda q: q["L"] * q["W"], p)
+    g.run("cyl", lambda q: q["D"] * q["L"], p)
+    assert g.changed_keys(p) == set()
+    new = dict(p, W=3.0)
+    assert g.changed_keys(new) == {"W"}
+    assert g.dirty(g.changed_keys(new)) == ["box"]
+    assert sorted(g.dirty({"L"})) == ["box", "cyl"]
+    assert g.readers("D") == ["cyl"]
+
+def test_array_values_compare_by_identity():
+    g = DependencyGraph()
+    arr = np.arange(3.0)
+    g.run("a", lambda q: q["v"].sum(), {"v": arr})
+    assert g.changed_keys({"v": arr}) == set()
+    assert g.changed_keys({"v": arr.copy()}) == {"v"}
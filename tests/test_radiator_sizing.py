@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import radiator_sizing as rs
+
+def test_net_flux_black_body():
+    assert rs.net_flux(1000.0, 0.0, 1.0) == pytest.approx(rs.SIGMA * 1e12)
+    assert rs.net_flux(300.0, 300.0) == pytest.approx(0.0)
+
+def test_area_and_rejection_are_inverse():
+    Q = np.array([1e3, 5e4, 2e6])
+    T = np.array([500.0, 700.0, 900.0])
+    A = rs.area(Q, T, 4.0, 0.85, 0.9)
+    np.testing.assert_allclose(rs.rejection(A, T, 4.0, 0.85, 0.9), Q)
+
+def test_area_infinite_when_sink_is_hotter():
+    assert np.isinf(rs.area(100.0, 300.0, 400.0))
+
+def test_panel_dims_widen_past_max_len():
+    L, W = rs.panel_dims(np.array([1e6, 4e6]), 1000.0, max_len=2000.0)
+    np.testing.assert_allclose(L, [1000.0, 2000.0])
+    np.testing.assert_allclose(W, [1000.0, 2000.0])
+    np.testing.assert_allclose(L * W, [1e6, 4e6])
+
+def test_size_splits_heat_between_panels():
+    out = rs.size(2e6, 900.0, 800.0, n_panels=2, thickness_mm=5.0, density=2700.0)
+    np.testing.assert_allclose(2 * rs.rejection(out["area_m2"], 900.0), 2e6)
+    assert out["length_mm"] * out["width_mm"] == pytest.approx(out["area_m2"] * 1e6)
+    assert out["mass_kg"] == pytest.approx(2 * out["area_m2"] * 5e-3 * 2700.0)
+
+def test_fin_efficiency_limits():
+    assert rs.fin_efficiency(5.0, 0.0, 900.0) == pytest.approx(1.0)
+    thin = rs.fin_efficiency(0.5, 200.0, 900.0)
+    thick = rs.fin_efficiency(5.0, 200.0, 900.0)
+    assert 0.0 < thin < thick < 1.0
+
+def test_fin_efficiency_one_side_is_higher():
+    assert rs.fin_efficiency(2.0, 40.0, 900.0, sides=1) > rs.fin_efficiency(2.0, 40.0, 900.0, sides=2)
+
+def test_material_conductivity():
+    assert rs.material_conductivity("Ti") == rs.CONDUCTIVITY["Ti"]
+    with pytest.raises(KeyError):
+        rs.material_conductivity("Unobtainium")
+
+def test_models_derive_fin_efficiency():
+    from model_registry import load_model
+    nave = load_model("navefusion")
+    p = nave.resolve_params()
+    k = rs.material_conductivity(nave.MAT_MAP["Radiador_L"][0])
+    assert p["RAD_FIN_EFF"] == pytest.approx(rs.fin_efficiency(p["RAD_T"], p["RAD_PIPE_PITCH"] / 2.0,
+                                                               p["RAD_TEMP_K"], p["RAD_EMISSIVITY"], k))
+    assert nave.resolve_params({"RAD_FIN_EFF": 0.7})["RAD_FIN_EFF"] == 0.7
+    thin = nave.resolve_params({"RAD_T": 2.0})["RAD_FIN_EFF"]
+    assert 0.0 < thin < p["RAD_FIN_EFF"]
+
+def test_clipped_radiator_records_heat_deficit():
+    from model_registry import load_model
+    pro = load_model("cubesat_pro")
+    fits = pro.resolve_params({"rad_waste_W": 2.0})
+    assert fits["rad_heat_deficit_W"] == 0.0
+    assert fits["rad_L"] < fits["bus_L"] - 2 * fits["end_keep"]
+    clipped = pro.resolve_params({"rad_waste_W": 20.0})
+    assert clipped["rad_L"] == pytest.approx(clipped["bus_L"] - 2 * clipped["end_keep"])
+    rad_w = clipped["bus_W"] - 2 * clipped["rail_keep"]
+    reject = rs.rejection(rad_w * clipped["rad_L"] / 1e6, clipped["rad_temp_K"], clipped["rad_sink_K"],
+                          clipped["rad_emissivity"], clipped["rad_fin_eff"], sides=1)
+    assert clipped["rad_heat_deficit_W"] == pytest.approx(20.0 - reject)
+    assert clipped["rad_heat_deficit_W"] > 0.0
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import glob
+import os
+
+import numpy as np
+
+from results_store import ResultsStore, variant_key
+
+def rows(n, start=0):
+    return [{"key": variant_key({"L": float(i)}), "L": float(i), "status": "ok" if i % 3 else "error",
+             "mass": 10.0 * i, "valid": i % 2 == 0} for i in range(start, start + n)]
+
+def test_variant_key_ignores_order():
+    assert variant_key({"a": 1.0, "b": "x"}) == variant_key({"b": "x", "a": 1.0})
+    assert variant_key({"a": 1.0}) != variant_key({"a": 2.0})
+
+def test_round_trip_and_select(tmp_path):
+    store = ResultsStore(str(tmp_path / "s"))
+    with store.writer(flush_every=4) as w:
+        for row in rows(10):
+            w.append(row)
+    assert len(store.shards()) == 3
+    assert len(store) == 10
+    data = store.load(["L", "mass"])
+    np.testing.assert_allclose(np.sort(data["L"]), np.arange(10.0))
+    sel = store.select(["L"], where={"status": "ok", "L": (2.0, 7.0)})
+    assert sorted(sel["L"]) == [2.0, 4.0, 5.0, 7.0]
+    sel = store.select(["L"], where=lambda c: c["mass"] > 75.0)
+    assert sorted(sel["L"]) == [8.0, 9.0]
+    assert store.done_keys() == {variant_key({"L": float(i)}) for i in range(10) if i % 3}
+
+def test_compact_keeps_rows(tmp_path):
+    store = ResultsStore(str(tmp_path / "s"))
+    with store.writer(flush_every=5) as w:
+        for row in rows(10):
+            w.append(row)
+    assert store.compact() == 10
+    assert store.shards() == []
+    with store.writer() as w:
+        for row in rows(2, start=10):
+            w.append(row)
+    assert len(store) == 12
+    assert sorted(store.to_rows(["L"], where={"L": (None, 1.0)}), key=lambda r: r["L"]) == [{"L": 0.0}, {"L": 1.0}]
+
+def test_missing_columns_are_filled(tmp_path):
+    store = ResultsStore(str(tmp_path / "s"))
+    with store.writer() as w:
+        w.append({"L": 1.0, "status": "ok"})
+    with store.writer() as w:
+        w.append({"L": 2.0, "status": "ok", "mass": 3.0, "note": "x"})
+    data = store.load()
+    order = np.argsort(data["L"])
+    assert np.isnan(data["mass"][order][0])
+    assert list(data["note"][order]) == ["", "x"]
+
+def test_variant_key_normalizes_numbers():
+    assert variant_key({"RAD_LEN": 2000}) == variant_key({"RAD_LEN": 2000.0})
+    assert variant_key({"RAD_LEN": np.int64(2000)}) == variant_key({"RAD_LEN": np.float32(2000.0)})
+    assert variant_key({"v": [1, 2]}) == variant_key({"v": (1.0, 2.0)})
+    assert variant_key({"flag": True}) != variant_key({"flag": 1.0})
+
+def test_missing_bool_is_not_false(tmp_path):
+    store = ResultsStore(str(tmp_path / "s"))
+    with store.writer() as w:
+        w.append({"L": 1.0})
+    with store.writer() as w:
+        w.append({"L": 2.0, "valid": False})
+        w.append({"L": 3.0, "valid": True})
+    with store.writer() as w:
+        w.append({"L": 4.0, "valid": None})
+        w.append({"L": 5.0, "valid": True})
+    data = store.load(["L", "valid"])
+    valid = data["valid"][np.argsort(data["L"])]
+    assert valid.dtype.kind == "f"
+    np.testing.assert_array_equal(valid, [np.nan, 0.0, 1.0, np.nan, 1.0])
+    assert sorted(store.select(["L"], where={"valid": True})["L"]) == [3.0, 5.0]
+    store.compact()
+    np.testing.assert_array_equal(np.isnan(store.load(["valid"])["valid"]).sum(), 2)
+
+def test_complete_bool_column_stays_bool(tmp_path):
+    store = ResultsStore(str(tmp_path / "s"))
+    with store.writer() as w:
+        w.append({"L": 1.0, "valid": True})
+    with store.writer() as w:
+        w.append({"L": 2.0, "valid": False})
+    assert store.load(["valid"])["valid"].dtype == bool
+
+def test_interrupted_compaction_keeps_store_consistent(tmp_path, monkeypatch):
+    store = ResultsStore(str(tmp_path / "s"))
+    with store.writer(flush_every=4) as w:
+        for row in rows(10):
+            w.append(row)
+    store.compact()
+    with store.writer(flush_every=2) as w:
+        for row in rows(4, start=10):
+            w.append(row)
+
+    # Fallo a mitad de escribir las columnas: nada cambia
+    real_save = np.save
+    calls = []
+    def failing_save(path, arr):
+        calls.append(path)
+        if len(calls) == 3:
+            raise OSError("disco lleno")
+        real_save(path, arr)
+    monkeypatch.setattr(np, "save", failing_save)
+    try:
+        store.compact()
+    except OSError:
+        pass
+    monkeypatch.setattr(np, "save", real_save)
+    assert len(store) == 14
+    assert len(store.shards()) == 2
+
+    # Fallo tras activar las columnas nuevas, antes de borrar los bloques: sin filas repetidas
+    real_remove = os.remove
+    def failing_remove(path):
+        raise OSError("interrumpido")
+    monkeypatch.setattr(os, "remove", failing_remove)
+    try:
+        store.compact()
+    except OSError:
+        pass
+    monkeypatch.setattr(os, "remove", real_remove)
+    assert len(store) == 14
+    assert store.shards() == []
+    np.testing.assert_allclose(np.sort(store.load(["L"])["L"]), np.arange(14.0))
+
+    with store.writer() as w:
+        w.append(rows(1, start=14)[0])
+    assert store.compact() == 15
+    assert os.listdir(os.path.join(store.root, "shards")) == []
+    assert len(glob.glob(os.path.join(store.root, "columns-*"))) == 1
+    np.testing.assert_allclose(np.sort(store.load(["L"])["L"]), np.arange(15.0))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import json
+import subprocess
+import sys
+
+import run_model
+from conftest import TOOLS_DIR
+
+def test_plain_import_skips_numpy_modules():
+    code = ("import sys; import run_model; "
+            "print(sorted(m for m in ('numpy', 'variants', 'interference', 'coil_field', 'export_pipeline') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=TOOLS_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_fillet_rule_flag_overrides_the_variant(tmp_path, monkeypatch):
+    path = tmp_path / "v.json"
+    path.write_text(json.dumps({"model": "cubesat_pro", "params": {"fillet_rule": "outer"}}))
+    seen = {}
+
+    def fake_run(name, params=None, *args, **kwargs):
+        seen.update(params)
+        raise SystemExit(0)
+
+    monkeypatch.setattr(run_model, "run", fake_run)
+    try:
+        run_model.main(["--variant", str(path), "--fillet-rule", "convex"])
+    except SystemExit:
+        pass
+    assert seen["fillet_rule"] == "convex"
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import pytest
+
+import variants
+from variants import VariantError
+
+EXAMPLES = os.path.join(variants.__file__.rsplit(os.sep, 1)[0], "design", "variants")
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+@pytest.mark.parametrize("value, unit, expected", [
+    (3.0, "mm", 3.0), ("3.2 m", "mm", 3200.0), ("2 MW", "kW", 2000.0),
+    ("600 degC", "K", 873.15), ("50 %", "", 0.5), ("1.85 g/cm^3", "kg/m^3", 1850.0),
+])
+def test_to_unit(value, unit, expected):
+    assert variants.to_unit(value, unit) == pytest.approx(expected)
+
+@pytest.mark.parametrize("value", ["3 kg", "3 furlong", "abc m", True, [1]])
+def test_to_unit_rejects(value):
+    with pytest.raises(ValueError):
+        variants.to_unit(value, "mm")
+
+def test_examples_load():
+    base = variants.load(os.path.join(EXAMPLES, "navefusion_base.toml"))
+    assert len(base) == 1
+    v = base[0]
+    assert v.model == "navefusion"
+    assert v.params["RAD_WASTE_KW"] == 2000.0
+    assert "RAD_W" not in v.params      # igual al valor de P: no es un cambio
+    assert v.tables["MAT_MAP"]["Reactor"] == ("W", 0.65)
+    assert v.tables["EXTRA_MASS"]["Tanque_Propelente_kg"] == 1500.0
+
+    swept = variants.load(os.path.join(EXAMPLES, "navefusion_radiador.toml"))
+    assert len(swept) == 3 * 4
+    temps = sorted({v.params["RAD_TEMP_K"] for v in swept})
+    assert temps == pytest.approx([873.15, 973.15, 1073.15, 1173.15])
+    one = variants.load(os.path.join(EXAMPLES, "navefusion_radiador.toml#tanque_grande[1]"))
+    assert len(one) == 1 and one[0].params["TANK_D"] == 1200.0
+    # Heredado de la base
+    assert one[0].params["RAD_WASTE_KW"] == 2000.0
+
+    cube = variants.load(os.path.join(EXAMPLES, "cubesat2u_1u.json"))[0]
+    assert cube.params["propulsion.tank_d"] == 40.0
+    assert cube.params["materials.FR4"] == 1850.0
+
+def test_json_round_trip(tmp_path):
+    path = write(tmp_path, "v.json", {"model": "navefusion", "params": {"RAD_LEN": "3.5 m"}})
+    v = variants.load(path)[0]
+    again = write(tmp_path, "w.json", {"model": v.model, "params": v.params})
+    assert variants.load(again)[0].params == v.params == {"RAD_LEN": 3500.0}
+
+def test_errors_are_collected(tmp_path):
+    path = write(tmp_path, "bad.json", {
+        "model": "navefusion", "extra": 1,
+        "params": {"RAD_LEN": "3 kg", "NOPE": 1.0},
+        "tables": {"TOL": {"Fantasma": 1.0}, "P": {}},
+    })
+    with pytest.raises(VariantError) as exc:
+        variants.load(path)
+    text = str(exc.value)
+    assert len(exc.value.errors) == 5
+    for fragment in ("sección desconocida extra", "RAD_LEN", "clave desconocida NOPE", "TOL.Fantasma", "tabla no modificable"):
+        assert fragment in text
+
+def test_unknown_model_and_variant(tmp_path):
+    with pytest.raises(VariantError):
+        variants.load(write(tmp_path, "m.json", {"model": "warp_drive"}))
+    path = write(tmp_path, "v.json", {"model": "navefusion", "variants": {"a": {}}})
+    with pytest.raises(VariantError):
+        variants.load(path + "#b")
+
+def test_circular_base(tmp_path):
+    write(tmp_path, "a.json", {"model": "navefusion", "base": "b.json"})
+    write(tmp_path, "b.json", {"model": "navefusion", "base": "a.json"})
+    with pytest.raises(VariantError):
+        variants.load(str(tmp_path / "a.json"))
+
+def test_applied_restores_tables():
+    model = variants.load_model("navefusion")
+    before = {name: dict(getattr(model, name)) for name in ("MAT", "MAT_MAP")}
+    with variants.applied(model, {"MAT": {"Nuevo": 1234.0}, "MAT_MAP": {"Reactor": ("Ti", 0.5)}}):
+        assert model.MAT["Nuevo"] == 1234.0
+        assert model.MAT_MAP["Reactor"] == ("Ti", 0.5)
+    assert {name: dict(getattr(model, name)) for name in ("MAT", "MAT_MAP")} == before
+
+def test_mat_map_material_must_exist(tmp_path):
+    path = write(tmp_path, "typo.json", {"model": "navefusion", "tables": {"MAT_MAP": {"Reactor": ["Tii", 0.5]}}})
+    with pytest.raises(VariantError) as exc:
+        variants.load(path)
+    assert "material desconocido 'Tii'" in str(exc.value)
+    path = write(tmp_path, "nuevo.json", {"model": "navefusion", "tables": {
+        "MAT": {"Hafnio": "13.3 g/cm^3"}, "MAT_MAP": {"Reactor": ["Hafnio", 0.8]}}})
+    assert variants.load(path)[0].tables["MAT_MAP"]["Reactor"] == ("Hafnio", 0.8)
+
+def test_mat_map_sees_materials_of_base_and_design(tmp_path):
+    write(tmp_path, "base.json", {"model": "navefusion", "tables": {"MAT": {"Hafnio": 13300.0}}})
+    path = write(tmp_path, "hijo.json", {"base": "base.json", "variants": {
+        "a": {"tables": {"MAT_MAP": {"Domo": ["Hafnio", 1.0]}}},
+        "b": {"tables": {"MAT_MAP": {"Domo": ["Osmio", 1.0]}}}}})
+    with pytest.raises(VariantError) as exc:
+        variants.load(path)
+    assert len(exc.value.errors) == 1 and "Osmio" in exc.value.errors[0]
+
+def test_editing_base_invalidates_child(tmp_path):
+    base = write(tmp_path, "base.json", {"model": "navefusion", "params": {"RAD_LEN": 3500.0}})
+    child = write(tmp_path, "hijo.json", {"base": "base.json", "params": {"TANK_D": 1100.0}})
+    assert variants.load(child)[0].params["RAD_LEN"] == 3500.0
+    stamp = os.stat(child).st_mtime_ns
+    write(tmp_path, "base.json", {"model": "navefusion", "params": {"RAD_LEN": 3600.0}})
+    os.utime(base, ns=(stamp + 10**9, stamp + 10**9))
+    os.utime(child, ns=(stamp, stamp))      # el hijo no cambia
+    assert variants.load(child)[0].params["RAD_LEN"] == 3600.0
+
+@pytest.mark.parametrize("model, key", [("navefusion", "RAD_FIN_EFF"), ("cubesat_pro", "nozzle_eps"),
+                                        ("cubesat_pro", "rad_fin_eff")])
+def test_optional_numbers_keep_their_unit(tmp_path, model, key):
+    assert variants.schema(model)[key][1] == ""
+    for i, bad in enumerate(("banana", "3 m")):
+        with pytest.raises(VariantError) as exc:
+            variants.load(write(tmp_path, f"bad{i}.json", {"model": model, "params": {key: bad}}))
+        assert key in str(exc.value)
+    good = variants.load(write(tmp_path, "ok.json", {"model": model, "params": {key: "80 %"}}))[0]
+    assert good.params[key] == pytest.approx(0.8)